@@ -12,13 +12,13 @@ import astrbot.api.message_components as Comp
 from astrbot.api.event import AstrMessageEvent
 
 from .. import SONGS_PER_PAGE, UUID, log, public_addr
-from ..command.mai_base import convert_message_segment_to_chain
-from ..libraries.image import image_to_base64, text_to_image
+from ..command.mai_base import convert_message_segment_to_chain, image_component
 from ..libraries.maimaidx_api_data import maiApi
 from ..libraries.maimaidx_error import ServerError
 from ..libraries.maimaidx_model import Alias, PushAliasStatus
 from ..libraries.maimaidx_music import alias, delete_local_alias, mai, update_local_alias
 from ..libraries.maimaidx_music_info import draw_music_info
+from ..libraries.maimaidx_render import text_to_base64
 
 
 async def convert_chain_to_onebot_format(chain: List[Any]):
@@ -284,17 +284,8 @@ async def alias_status_handler(event: AstrMessageEvent):
                     ''').strip()
                 )
         result.append(f'第「{page}」页，共「{len(status) // SONGS_PER_PAGE + 1}」页')
-        img = text_to_image('\n'.join(result))
-        img_base64 = image_to_base64(img)
-        import tempfile
-        import base64
-        if img_base64.startswith('base64://'):
-            img_base64 = img_base64[9:]
-        img_data = base64.b64decode(img_base64)
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-            temp_file.write(img_data)
-            temp_file_path = temp_file.name
-        chain = [Comp.Image.fromFileSystem(temp_file_path)]
+        img_base64 = await text_to_base64('\n'.join(result))
+        chain = [image_component(img_base64)]
         yield event.chain_result(chain)
     except (ServerError, ValueError) as e:
         log.error(traceback.format_exc())
@@ -457,8 +448,12 @@ async def push_alias(push: PushAliasStatus, context=None):
             log.error(f'发送别名拒绝消息失败: {e}')
         return
     
+    if push.Type == 'End' and music:
+        # 新别名已生效，增量写入别名索引，无需整库重新拉取
+        mai.total_alias_list.add_alias(song_id, alias_name, music.title)
+        mai.fuzzy_index.add(int(song_id), 'alias', alias_name)
+    
     if not maiApi.config.maimaidxaliaspush:
-        await mai.get_music_alias()
         return
     
     # 获取群组列表
@@ -8,8 +8,7 @@ import astrbot.api.message_components as Comp
 from astrbot.api.event import AstrMessageEvent
 
 from .. import MessageSegment, loga
-from ..command.mai_base import convert_message_segment_to_chain
-from ..libraries.image import image_to_base64, text_to_image
+from ..command.mai_base import convert_message_segment_to_chain, image_component
 from ..libraries.maimaidx_arcade import (
     arcade,
     subscribe,
@@ -17,6 +16,7 @@ from ..libraries.maimaidx_arcade import (
     update_person,
     updata_arcade,
 )
+from ..libraries.maimaidx_render import text_to_base64
 
 
 sv_help = """排卡指令如下：
@@ -61,17 +61,8 @@ def is_superuser(event: AstrMessageEvent, superusers: list = None) -> bool:
 
 async def dx_arcade_help_handler(event: AstrMessageEvent):
     """帮助maimaiDX排卡"""
-    img = text_to_image(sv_help)
-    img_base64 = image_to_base64(img)
-    import tempfile
-    import base64
-    if img_base64.startswith('base64://'):
-        img_base64 = img_base64[9:]
-    img_data = base64.b64decode(img_base64)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-        temp_file.write(img_data)
-        temp_file_path = temp_file.name
-    chain = [Comp.Image.fromFileSystem(temp_file_path)]
+    img_base64 = await text_to_base64(sv_help)
+    chain = [image_component(img_base64)]
     yield event.chain_result(chain)
 
 
@@ -289,17 +280,8 @@ async def search_arcade_handler(event: AstrMessageEvent):
         if len(arcade_list) < 5:
             yield event.plain_result('\n==========\n'.join(result))
         else:
-            img = text_to_image('\n'.join(result))
-            img_base64 = image_to_base64(img)
-            import tempfile
-            import base64
-            if img_base64.startswith('base64://'):
-                img_base64 = img_base64[9:]
-            img_data = base64.b64decode(img_base64)
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-                temp_file.write(img_data)
-                temp_file_path = temp_file.name
-            chain = [Comp.Image.fromFileSystem(temp_file_path)]
+            img_base64 = await text_to_base64('\n'.join(result))
+            chain = [image_component(img_base64)]
             yield event.chain_result(chain)
     else:
         yield event.plain_result('没有这样的机厅哦')
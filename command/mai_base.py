@@ -9,10 +9,16 @@ from astrbot.api.event import AstrMessageEvent
 from .. import Root, log, get_botname
 from ..libraries.image import image_to_base64, music_picture
 from ..libraries.maimaidx_api_data import maiApi
+from ..libraries.maimaidx_cache import response_cache
+from ..libraries.maimaidx_covers import covers
+from ..libraries.maimaidx_encoding import encoder
 from ..libraries.maimaidx_error import *
 from ..libraries.maimaidx_music import mai
 from ..libraries.maimaidx_music_info import draw_music_info
 from ..libraries.maimaidx_player_score import rating_ranking_data
+from ..libraries.maimaidx_render import render_pool
+from ..libraries.maimaidx_render_cache import render_cache
+from ..libraries.maimaidx_tiles import score_tiles
 from ..libraries.tool import qqhash
 
 
@@ -58,6 +64,20 @@ TIP_THEME_SOURCE = (
 )
 
 
+def image_component(file: str) -> Comp.Image:
+    """
+    将 `base64://`、URL 或本地路径转为图片组件
+
+    base64 图片直接交给 `Comp.Image`，不再解码后写入临时文件；
+    需要本地文件的平台由 AstrBot 在其临时目录中统一生成与清理。
+    """
+    if file.startswith('base64://'):
+        return Comp.Image.fromBase64(file[len('base64://'):])
+    if file.startswith('http://') or file.startswith('https://'):
+        return Comp.Image.fromURL(file)
+    return Comp.Image.fromFileSystem(file)
+
+
 def convert_message_segment_to_chain(msg):
     """将 MessageSegment 转换为 astrbot 的 MessageChain"""
     if isinstance(msg, str):
@@ -68,23 +88,7 @@ def convert_message_segment_to_chain(msg):
     # 如果是 MessageSegment 对象
     if hasattr(msg, 'type') and hasattr(msg, 'data'):
         if msg.type == 'image':
-            # 处理图片
-            file_data = msg.data.get('file', '')
-            if file_data.startswith('base64://'):
-                # base64 图片，需要保存到临时文件
-                import base64
-                import tempfile
-                base64_data = file_data.replace('base64://', '')
-                img_data = base64.b64decode(base64_data)
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-                temp_file.write(img_data)
-                temp_file.close()
-                return [Comp.Image.fromFileSystem(temp_file.name)]
-            elif file_data.startswith('http://') or file_data.startswith('https://'):
-                return [Comp.Image.fromURL(file_data)]
-            else:
-                # 文件路径
-                return [Comp.Image.fromFileSystem(file_data)]
+            return [image_component(msg.data.get('file', ''))]
         elif msg.type == 'text':
             return [Comp.Plain(msg.data.get('text', ''))]
     
@@ -120,6 +124,65 @@ async def update_data_handler(event: AstrMessageEvent, superusers: list = None):
     yield event.plain_result('maimai数据更新完成')
 
 
+async def refresh_score_cache_handler(event: AstrMessageEvent, superusers: list = None):
+    """刷新成绩 清除自己的成绩缓存；清空成绩缓存 清除全部（管理员）"""
+    sender_id = event.get_sender_id()
+    if event.message_str.strip().lstrip('/') == '清空成绩缓存':
+        if superusers and str(sender_id) not in superusers:
+            yield event.plain_result('仅允许管理员执行此操作')
+            return
+        count = response_cache.invalidate()
+        yield event.plain_result(f'已清空全部成绩缓存，共 {count} 条')
+        return
+    response_cache.invalidate(user=sender_id)
+    yield event.plain_result('已清除你的成绩缓存，下次查询将获取最新成绩')
+
+
+async def cover_sync_handler(event: AstrMessageEvent, superusers: list = None):
+    """同步曲绘 补全缺失与损坏的曲绘；同步曲绘 全部 同时检查 CDN 上的更新（管理员）"""
+    if superusers and str(event.get_sender_id()) not in superusers:
+        yield event.plain_result('仅允许管理员执行此操作')
+        return
+    if not covers.online():
+        yield event.plain_result('未开启在线素材（assets_online），无法同步曲绘')
+        return
+    if not hasattr(mai, 'total_list') or not mai.total_list:
+        yield event.plain_result('曲目数据未加载，请先更新maimai数据')
+        return
+    full = event.message_str.strip().endswith('全部')
+    running = covers.syncing
+    if running is None:
+        yield event.plain_result(f'开始同步 {len(mai.total_list)} 首曲目的曲绘，完成后通知')
+    elif full and running == 'incremental':
+        yield event.plain_result('已有曲绘同步进行中，结束后将开始全部校验，完成后通知')
+    else:
+        yield event.plain_result('已有曲绘同步进行中，完成后通知结果')
+    report = await covers.sync((music.id for music in mai.total_list), full=full)
+    yield event.plain_result(report.summary())
+
+
+async def render_status_handler(event: AstrMessageEvent, superusers: list = None):
+    """渲染状态 查看绘图线程池的排队与耗时（管理员）"""
+    if superusers and str(event.get_sender_id()) not in superusers:
+        yield event.plain_result('仅允许管理员执行此操作')
+        return
+    stats = render_pool.stats()
+    msg = (
+        f'绘图线程：{stats["workers"]}\n'
+        f'排队 / 绘制中：{stats["queued"]} / {stats["running"]}\n'
+        f'已完成：{stats["completed"]}，失败：{stats["failed"]}\n'
+        f'平均排队：{stats["avg_wait"] * 1000:.0f} ms，平均绘制：{stats["avg_run"] * 1000:.0f} ms\n'
+        f'最长耗时：{stats["max_latency"]:.2f} s\n'
+        f'绘图缓存：{len(render_cache)} 张，命中 {render_cache.hits + render_cache.disk_hits}'
+        f'（磁盘 {render_cache.disk_hits}），未命中 {render_cache.misses}\n'
+        f'成绩格缓存：{len(score_tiles)} 格，命中 {score_tiles.hits + score_tiles.disk_hits}'
+        f'（磁盘 {score_tiles.disk_hits}），未命中 {score_tiles.misses}，命中率 {score_tiles.hit_rate:.0%}'
+    )
+    for kind, s in encoder.stats().items():
+        msg += f'\n编码 {kind}（{s["format"]}）：{s["count"]} 张，平均 {s["avg_ms"]:.0f} ms / {s["avg_kb"]:.0f} KB'
+    yield event.plain_result(msg)
+
+
 async def maimaidxhelp_handler(event: AstrMessageEvent):
     """帮助maimaiDX"""
     help_image_path = Root / 'maimaidxhelp.png'
@@ -177,6 +240,7 @@ async def mai_today_handler(event: AstrMessageEvent):
     chain = [Comp.Plain(msg)]
     
     # 添加图片
+    await covers.ensure([music.id])
     music_img_path = music_picture(music.id)
     if music_img_path.exists():
         chain.append(Comp.Image.fromFileSystem(str(music_img_path)))
@@ -446,6 +510,7 @@ async def authcode_handler(event: AstrMessageEvent):
     try:
         api = LxnsAPI(qqid=int(qqid))
         token = await api.oauth_fetch_token(code)
+        response_cache.invalidate(user=qqid, service='lxns')
         api.access_token = token.access_token
         player = await api.player_personal()
         await userstore.update(
@@ -1,6 +1,4 @@
 import asyncio
-import base64
-import tempfile
 from textwrap import dedent
 from typing import Any, List
 
@@ -9,7 +7,7 @@ from astrbot.api.event import AstrMessageEvent
 from astrbot.core.star.filter.event_message_type import EventMessageType
 
 from .. import log
-from ..command.mai_base import convert_message_segment_to_chain
+from ..command.mai_base import convert_message_segment_to_chain, image_component
 from ..libraries.maimaidx_music import guess
 from ..libraries.maimaidx_music_info import draw_music_info
 
@@ -102,7 +100,7 @@ async def guess_music_handler(event: AstrMessageEvent):
     
     # 开始猜歌
     try:
-        guess.start(gid)
+        await guess.start(gid)
     except Exception as e:
         log.error(f'开始猜歌失败: {e}')
         import traceback
@@ -148,19 +146,8 @@ async def guess_music_handler(event: AstrMessageEvent):
                 img_data = guess.Group[gid].img
                 chain: List[Any] = [Comp.Plain('7/7 这首歌封面的一部分是：\n')]
                 
-                # 处理 base64 图片
                 if isinstance(img_data, str) and img_data.startswith('base64://'):
-                    try:
-                        # 如果失败，尝试保存为临时文件
-                        base64_data = img_data[9:]  # 移除 'base64://' 前缀
-                        img_bytes = base64.b64decode(base64_data)
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-                            temp_file.write(img_bytes)
-                            temp_file_path = temp_file.name
-                        chain.append(Comp.Image.fromFileSystem(temp_file_path))
-                    except Exception as e:
-                        log.error(f'处理猜歌图片失败: {e}')
-                        chain.append(Comp.Plain('[图片加载失败]'))
+                    chain.append(image_component(img_data))
                 else:
                     chain.append(Comp.Plain(str(img_data)))
                 
@@ -230,7 +217,7 @@ async def guess_pic_handler(event: AstrMessageEvent):
     
     # 开始猜曲绘
     try:
-        guess.startpic(gid)
+        await guess.startpic(gid)
     except Exception as e:
         log.error(f'开始猜曲绘失败: {e}')
         import traceback
@@ -242,18 +229,8 @@ async def guess_pic_handler(event: AstrMessageEvent):
     img_data = guess.Group[gid].img
     chain: List[Any] = [Comp.Plain('以下裁切图片是哪首谱面的曲绘：\n')]
     
-    # 处理 base64 图片
     if isinstance(img_data, str) and img_data.startswith('base64://'):
-        try:
-            base64_data = img_data[9:]  # 移除 'base64://' 前缀
-            img_bytes = base64.b64decode(base64_data)
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-                temp_file.write(img_bytes)
-                temp_file_path = temp_file.name
-            chain.append(Comp.Image.fromFileSystem(temp_file_path))
-        except Exception as e:
-            log.error(f'处理猜曲绘图片失败: {e}')
-            chain.append(Comp.Plain('[图片加载失败]'))
+        chain.append(image_component(img_data))
     else:
         chain.append(Comp.Plain(str(img_data)))
     
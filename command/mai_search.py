@@ -8,13 +8,18 @@ import astrbot.api.message_components as Comp
 from astrbot.api.event import AstrMessageEvent
 
 from .. import SONGS_PER_PAGE, diffs, log, is_reply_enabled
-from ..command.mai_base import append_theme_source_tip, convert_message_segment_to_chain
-from ..libraries.image import image_to_base64, text_to_image
+from ..command.mai_base import append_theme_source_tip, convert_message_segment_to_chain, image_component
 from ..libraries.maimaidx_api_data import maiApi
 from ..libraries.maimaidx_error import *
+from ..libraries.maimaidx_fuzzy import FuzzyMatch
 from ..libraries.maimaidx_model import AliasStatus
 from ..libraries.maimaidx_music import guess, mai
 from ..libraries.maimaidx_music_info import draw_music_info
+from ..libraries.maimaidx_render import text_to_base64
+
+
+FUZZY_CONFIDENT_SCORE = 0.9
+"""模糊匹配得分不低于该值时视为命中，直接返回结果"""
 
 
 def song_level(ds1: float, ds2: float) -> List[Tuple[str, str, float, str]]:
@@ -37,6 +42,25 @@ def song_level(ds1: float, ds2: float) -> List[Tuple[str, str, float, str]]:
     return result
 
 
+def fuzzy_suggestion_message(name: str, matches: List[FuzzyMatch]) -> str:
+    """
+    模糊搜索结果提示
+    
+    Params:
+        `name`: 查询的名称
+        `matches`: 模糊搜索结果
+    Return:
+        `msg`: 提示消息
+    """
+    msg = f'未找到别名为「{name}」的歌曲，您要找的可能是：\n'
+    for match in matches:
+        music = mai.total_list.by_id(match.song_id)
+        title = music.title if music else match.text
+        msg += f'{f"「{match.song_id}」":<7} {title}\n'
+    msg += '请使用「id xxxxx」查询指定曲目。'
+    return msg
+
+
 async def search_music_handler(event: AstrMessageEvent):
     """查歌/search 命令处理"""
     # 检查数据是否加载
@@ -81,17 +105,8 @@ async def search_music_handler(event: AstrMessageEvent):
         f'共「{len(result) // SONGS_PER_PAGE + 1}」页。'
         '请使用「id xxxxx」查询指定曲目。'
     )
-    img = text_to_image(search_result)
-    img_base64 = image_to_base64(img)
-    import tempfile
-    import base64
-    if img_base64.startswith('base64://'):
-        img_base64 = img_base64[9:]
-    img_data = base64.b64decode(img_base64)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-        temp_file.write(img_data)
-        temp_file_path = temp_file.name
-    chain = [Comp.Image.fromFileSystem(temp_file_path)]
+    img_base64 = await text_to_base64(search_result)
+    chain = [image_component(img_base64)]
     if is_reply_enabled():
         chain.insert(0, Comp.Reply(id=event.message_obj.message_id))
     yield event.chain_result(chain)
@@ -157,17 +172,8 @@ async def search_base_handler(event: AstrMessageEvent):
         f'共「{len(result) // SONGS_PER_PAGE + 1}」页。'
         '请使用「id xxxxx」查询指定曲目。'
     )
-    img = text_to_image(search_result)
-    img_base64 = image_to_base64(img)
-    import tempfile
-    import base64
-    if img_base64.startswith('base64://'):
-        img_base64 = img_base64[9:]
-    img_data = base64.b64decode(img_base64)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-        temp_file.write(img_data)
-        temp_file_path = temp_file.name
-    chain = [Comp.Image.fromFileSystem(temp_file_path)]
+    img_base64 = await text_to_base64(search_result)
+    chain = [image_component(img_base64)]
     if is_reply_enabled():
         chain.insert(0, Comp.Reply(id=event.message_obj.message_id))
     yield event.chain_result(chain)
@@ -228,17 +234,8 @@ async def search_bpm_handler(event: AstrMessageEvent):
         f'共「{len(result) // SONGS_PER_PAGE + 1}」页。'
         '请使用「id xxxxx」查询指定曲目。'
     )
-    img = text_to_image(search_result)
-    img_base64 = image_to_base64(img)
-    import tempfile
-    import base64
-    if img_base64.startswith('base64://'):
-        img_base64 = img_base64[9:]
-    img_data = base64.b64decode(img_base64)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-        temp_file.write(img_data)
-        temp_file_path = temp_file.name
-    chain = [Comp.Image.fromFileSystem(temp_file_path)]
+    img_base64 = await text_to_base64(search_result)
+    chain = [image_component(img_base64)]
     if is_reply_enabled():
         chain.insert(0, Comp.Reply(id=event.message_obj.message_id))
     yield event.chain_result(chain)
@@ -296,17 +293,8 @@ async def search_artist_handler(event: AstrMessageEvent):
         f'共「{len(result) // SONGS_PER_PAGE + 1}」页。'
         '请使用「id xxxxx」查询指定曲目。'
     )
-    img = text_to_image(search_result)
-    img_base64 = image_to_base64(img)
-    import tempfile
-    import base64
-    if img_base64.startswith('base64://'):
-        img_base64 = img_base64[9:]
-    img_data = base64.b64decode(img_base64)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-        temp_file.write(img_data)
-        temp_file_path = temp_file.name
-    chain = [Comp.Image.fromFileSystem(temp_file_path)]
+    img_base64 = await text_to_base64(search_result)
+    chain = [image_component(img_base64)]
     if is_reply_enabled():
         chain.insert(0, Comp.Reply(id=event.message_obj.message_id))
     yield event.chain_result(chain)
@@ -371,17 +359,8 @@ async def search_charter_handler(event: AstrMessageEvent):
         f'共「{len(result) // SONGS_PER_PAGE + 1}」页。'
         '请使用「id xxxxx」查询指定曲目。'
     )
-    img = text_to_image(search_result)
-    img_base64 = image_to_base64(img)
-    import tempfile
-    import base64
-    if img_base64.startswith('base64://'):
-        img_base64 = img_base64[9:]
-    img_data = base64.b64decode(img_base64)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-        temp_file.write(img_data)
-        temp_file_path = temp_file.name
-    chain = [Comp.Image.fromFileSystem(temp_file_path)]
+    img_base64 = await text_to_base64(search_result)
+    chain = [image_component(img_base64)]
     if is_reply_enabled():
         chain.insert(0, Comp.Reply(id=event.message_obj.message_id))
     yield event.chain_result(chain)
@@ -415,6 +394,21 @@ async def search_alias_song_handler(event: AstrMessageEvent):
     else:
         alias_data = mai.total_alias_list.by_alias(name)
     
+    # 本地模糊匹配：置信度足够高时直接给出结果，不再请求别名服务器
+    if not alias_data and not name.isdigit():
+        matches = mai.fuzzy_index.search(name, limit=5, min_score=FUZZY_CONFIDENT_SCORE)
+        if len(matches) == 1 and (music := mai.total_list.by_id(matches[0].song_id)):
+            pic = await draw_music_info(music, event.get_sender_id())
+            chain = convert_message_segment_to_chain(pic)
+            chain.insert(0, Comp.Plain('您要找的是不是：'))
+            if is_reply_enabled():
+                chain.insert(0, Comp.Reply(id=event.message_obj.message_id))
+            yield event.chain_result(chain)
+            return
+        elif len(matches) > 1:
+            yield event.plain_result(fuzzy_suggestion_message(name, matches))
+            return
+    
     if not alias_data:
         try:
             obj = await maiApi.get_songs(name)
@@ -477,7 +471,10 @@ async def search_alias_song_handler(event: AstrMessageEvent):
     # 标题
     result = mai.total_list.filter(title_search=name)
     if len(result) == 0:
-        yield event.plain_result(error_msg)
+        if matches := mai.fuzzy_index.search(name, limit=5):
+            yield event.plain_result(fuzzy_suggestion_message(name, matches))
+        else:
+            yield event.plain_result(error_msg)
         return
     elif len(result) == 1:
         pic = await draw_music_info(result.random(), event.get_sender_id())
@@ -14,6 +14,7 @@ from ..libraries.maimaidx_music_info import (
 )
 from ..libraries.maimaidx_player_score import (
     level_achievement_list_data,
+    level_achievement_list_pages,
     level_process_data,
     player_plate_data,
     rise_score_data,
@@ -28,7 +29,8 @@ async def update_table_handler(event: AstrMessageEvent, superusers: list = None)
         yield event.plain_result('仅允许管理员执行此操作')
         return
     
-    result = await update_rating_table()
+    # 「更新定数表 全部」忽略指纹全部重新生成
+    result = await update_rating_table(force=event.message_str.strip().endswith('全部'))
     chain = convert_message_segment_to_chain(result)
     yield event.chain_result(chain)
 
@@ -40,7 +42,7 @@ async def update_plate_handler(event: AstrMessageEvent, superusers: list = None)
         yield event.plain_result('仅允许管理员执行此操作')
         return
     
-    result = await update_plate_table()
+    result = await update_plate_table(force=event.message_str.strip().endswith('全部'))
     chain = convert_message_segment_to_chain(result)
     yield event.chain_result(chain)
 
@@ -58,7 +60,7 @@ async def rating_table_handler(event: AstrMessageEvent):
         return
     elif args in levelList[6:]:
         path = ratingdir / f'{args}.png'
-        pic = draw_rating(args, path)
+        pic = await draw_rating(args, path)
         chain = convert_message_segment_to_chain(pic)
         if is_reply_enabled():
             chain.insert(0, Comp.Reply(id=event.message_obj.message_id))
@@ -278,7 +280,7 @@ async def level_achievement_list_handler(event: AstrMessageEvent):
         qqid = at_qqid
     
     # 匹配正则表达式
-    match = re.match(r'^([0-9]+\.?[0-9]?\+?)分数列表\s?([0-9]+)?\s?(.+)?', message_str)
+    match = re.match(r'^([0-9]+\.?[0-9]?\+?)分数列表\s?([0-9]+|全部)?\s?(.+)?', message_str)
     if not match:
         return  # 不匹配则不处理
     
@@ -302,6 +304,17 @@ async def level_achievement_list_handler(event: AstrMessageEvent):
     if username:
         qqid = None
 
+    if page == '全部':
+        # 逐页绘制并发送，每页发出后再绘制下一页
+        first = True
+        async for data in level_achievement_list_pages(qqid, username, rating):
+            chain = convert_message_segment_to_chain(data)
+            if first and is_reply_enabled():
+                chain.insert(0, Comp.Reply(id=event.message_obj.message_id))
+            first = False
+            yield event.chain_result(chain)
+        return
+
     data = await level_achievement_list_data(qqid, username, rating, int(page) if page else 1)
     chain = convert_message_segment_to_chain(data)
     if is_reply_enabled():
@@ -1,15 +1,69 @@
 import base64
+import threading
+from functools import lru_cache
 from io import BytesIO
-from typing import List, Optional, Set, Tuple, Union
-from urllib.request import Request, urlopen
+from typing import List, Tuple, Union
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
 
-from .. import SHANGGUMONO, Path, coverdir, log
+from .. import SHANGGUMONO, Path, coverdir
 
-# 记录在线下载失败（如 CDN 无此封面）的 ID，避免重复请求
-_missing_covers: Set[int] = set()
+_font_pool = threading.local()
+
+
+def get_font(font: Union[str, Path], size: int) -> ImageFont.FreeTypeFont:
+    """
+    获取字体对象，按 (路径, 字号) 复用，避免每段文字重新打开字体文件
+
+    FreeType 字体对象不能在多个线程中同时使用，因此每个绘图线程各持一份。
+    """
+    fonts = getattr(_font_pool, 'fonts', None)
+    if fonts is None:
+        fonts = _font_pool.fonts = {}
+    key = (str(font), size)
+    obj = fonts.get(key)
+    if obj is None:
+        obj = fonts[key] = ImageFont.truetype(*key)
+    return obj
+
+
+@lru_cache(maxsize=4096)
+def _text_bbox(text: str, font: str, size: int) -> Tuple[float, float, float, float]:
+    return get_font(font, size).getbbox(text)
+
+
+@lru_cache(maxsize=4096)
+def _fallback_layout(
+    text: str,
+    primary_font: str,
+    fallback_font: str,
+    size: int,
+    mode: str,
+    fontmode: str
+) -> Tuple[Tuple[Tuple[str, str, float], ...], float]:
+    """
+    按字符是否为 ASCII 将文本切分为主字体 / 后备字体片段
+
+    Returns:
+        `(片段, 总宽度)`，片段为 `(文字, 字体路径, 相对起点的横向偏移)`
+    """
+    measure = ImageDraw.Draw(Image.new(mode, (1, 1)))
+    measure.fontmode = fontmode
+    runs: List[Tuple[str, str]] = []
+    for char in text:
+        font = primary_font if char.isascii() else fallback_font
+        if runs and runs[-1][1] == font:
+            runs[-1] = (runs[-1][0] + char, font)
+        else:
+            runs.append((char, font))
+
+    parts: List[Tuple[str, str, float]] = []
+    x = 0
+    for part, font in runs:
+        parts.append((part, font, x))
+        x += measure.textlength(part, font=get_font(font, size))
+    return tuple(parts), x
 
 
 class DrawText:
@@ -19,7 +73,7 @@ class DrawText:
         self._font = str(font)
 
     def get_box(self, text: str, size: int) -> Tuple[float, float, float, float]:
-        return ImageFont.truetype(self._font, size).getbbox(text)
+        return _text_bbox(text, self._font, size)
 
     def draw(
         self,
@@ -33,7 +87,7 @@ class DrawText:
         stroke_fill: Tuple[int, int, int, int] = (0, 0, 0, 0),
         multiline: bool = False
     ) -> None:
-        font = ImageFont.truetype(self._font, size)
+        font = get_font(self._font, size)
         if multiline:
             self._img.multiline_text(
                 (pos_x, pos_y), 
@@ -69,18 +123,9 @@ def draw_text_with_font_fallback(
     stroke_width: int = 0,
     stroke_fill: Tuple[int, int, int, int] = (0, 0, 0, 0),
 ) -> None:
-    primary = ImageFont.truetype(str(primary_font), size)
-    fallback = ImageFont.truetype(str(fallback_font), size)
-    parts: List[Tuple[str, ImageFont.FreeTypeFont]] = []
-
-    for char in str(text):
-        font = primary if char.isascii() else fallback
-        if parts and parts[-1][1] is font:
-            parts[-1] = (parts[-1][0] + char, font)
-        else:
-            parts.append((char, font))
-
-    total_width = sum(image.textlength(part, font=font) for part, font in parts)
+    parts, total_width = _fallback_layout(
+        str(text), str(primary_font), str(fallback_font), size, image.mode, image.fontmode
+    )
     if anchor[0] == 'm':
         x = pos_x - total_width / 2
         part_anchor = 'lm'
@@ -91,17 +136,36 @@ def draw_text_with_font_fallback(
         x = pos_x
         part_anchor = 'la' if len(anchor) > 1 and anchor[1] == 'a' else 'lm'
 
-    for part, font in parts:
+    for part, font, offset in parts:
         image.text(
-            (x, pos_y),
+            (x + offset, pos_y),
             part,
             color,
-            font=font,
+            font=get_font(font, size),
             anchor=part_anchor,
             stroke_width=stroke_width,
             stroke_fill=stroke_fill,
         )
-        x += image.textlength(part, font=font)
+
+
+@lru_cache(maxsize=64)
+def _tricolor_column(
+    height: int,
+    color1: Tuple[int, int, int],
+    color2: Tuple[int, int, int],
+    color3: Tuple[int, int, int]
+) -> np.ndarray:
+    """三色渐变的单列像素，(height, 1, 4)，只读"""
+    y = np.arange(height, dtype=np.float64)[:, None]
+    c1, c2, c3 = (np.array(c, dtype=np.float64) for c in (color1, color2, color3))
+    top = y < height * 0.4
+    ratio = np.where(top, y / (height * 0.4), (y - height * 0.4) / (height * 0.6))
+    color = np.where(top, (1 - ratio) * c1 + ratio * c2, (1 - ratio) * c2 + ratio * c3)
+    column = np.empty((height, 1, 4), dtype=np.uint8)
+    column[:, 0, :3] = np.clip(color, 0, 255).astype(np.uint8)
+    column[:, 0, 3] = 255
+    column.flags.writeable = False
+    return column
 
 
 def tricolor_gradient(
@@ -112,19 +176,8 @@ def tricolor_gradient(
     color3: Tuple[int, int, int] = (255, 255, 255)
 ) -> Image.Image:
     """绘制渐变色"""
-    array = np.zeros((height, width, 3), dtype=np.uint8)
-    
-    for y in range(height):
-        if y < height * 0.4:
-            ratio = y / (height * 0.4)
-            color = (1 - ratio) * np.array(color1) + ratio * np.array(color2)
-        else:
-            ratio = (y - height * 0.4) / (height * 0.6)
-            color = (1 - ratio) * np.array(color2) + ratio * np.array(color3)
-        array[y, :] = np.clip(color, 0, 255)
-    
-    image = Image.fromarray(array).convert('RGBA')
-    return image
+    column = _tricolor_column(height, tuple(color1), tuple(color2), tuple(color3))
+    return Image.fromarray(np.repeat(column, width, axis=1), 'RGBA')
 
 
 def hex_to_rgb(hex_str: str) -> Tuple[int, ...]:
@@ -132,33 +185,47 @@ def hex_to_rgb(hex_str: str) -> Tuple[int, ...]:
     return tuple(int(hex_str[i : i + 2], 16) for i in (0, 2, 4))
 
 
+PRISM_PLUS_STOPS = (
+    (0.0, hex_to_rgb("#ffffff")),
+    (0.14, hex_to_rgb("#ffffff")),
+    (0.24, hex_to_rgb("#ffd5cf")),
+    (0.46, hex_to_rgb("#ffd5cf")),
+    (0.56, hex_to_rgb("#ffc5d5")),
+    (0.67, hex_to_rgb("#eaabff")),
+    (0.85, hex_to_rgb("#72bcfe")),
+    (0.95, hex_to_rgb("#65f2df")),
+    (1.0, hex_to_rgb("#65f2df")),
+)
+"""PRiSM PLUS 渐变色标，位置 0 为底部"""
+
+
+@lru_cache(maxsize=64)
+def _prism_plus_column(height: int) -> np.ndarray:
+    """PRiSM PLUS 渐变的单列像素，(height, 1, 4)，只读"""
+    positions = np.array([p for p, _ in PRISM_PLUS_STOPS])
+    colors = np.array([c for _, c in PRISM_PLUS_STOPS], dtype=np.float64)
+    if height > 1:
+        t = 1.0 - np.arange(height, dtype=np.float64) / (height - 1)
+    else:
+        t = np.zeros(height)
+    # 取第一个满足 p1 <= t <= p2 的色段
+    index = np.clip(np.searchsorted(positions, t, side='left') - 1, 0, len(positions) - 2)
+    p1, p2 = positions[index], positions[index + 1]
+    rel_t = ((t - p1) / (p2 - p1))[:, None]
+    c1, c2 = colors[index], colors[index + 1]
+    column = np.empty((height, 1, 4), dtype=np.uint8)
+    column[:, 0, :3] = (c1 + (c2 - c1) * rel_t).astype(np.uint8)
+    column[:, 0, 3] = 255
+    column.flags.writeable = False
+    return column
+
+
 def tricolor_gradient_prism_plus(width: int, height: int) -> Image.Image:
     """
     垂直绘制 PRiSM PLUS 渐变背景
     """
-    colors_list = [
-        (0.0, hex_to_rgb("#ffffff")),
-        (0.14, hex_to_rgb("#ffffff")),
-        (0.24, hex_to_rgb("#ffd5cf")),
-        (0.46, hex_to_rgb("#ffd5cf")),
-        (0.56, hex_to_rgb("#ffc5d5")),
-        (0.67, hex_to_rgb("#eaabff")),
-        (0.85, hex_to_rgb("#72bcfe")),
-        (0.95, hex_to_rgb("#65f2df")),
-        (1.0, hex_to_rgb("#65f2df")),
-    ]
-    line = Image.new("RGBA", (1, height))
-    for y in range(height):
-        t = 1.0 - (y / (height - 1)) if height > 1 else 0
-        for i in range(len(colors_list) - 1):
-            p1, c1 = colors_list[i]
-            p2, c2 = colors_list[i + 1]
-            if p1 <= t <= p2:
-                rel_t = (t - p1) / (p2 - p1)
-                rgb = tuple(int(c1[j] + (c2[j] - c1[j]) * rel_t) for j in range(3))
-                line.putpixel((0, y), rgb)
-                break
-    return line.resize((width, height), resample=Image.Resampling.BICUBIC)
+    column = _prism_plus_column(height)
+    return Image.fromarray(np.repeat(column, width, axis=1), 'RGBA')
 
 
 def generate_frosted_card(
@@ -213,56 +280,13 @@ def rounded_corners(
     return new_im
 
 
-def _download_cover(music_id: int) -> Optional[Path]:
-    """当本地缺少封面且开启在线素材时，从水鱼封面 CDN 下载并缓存。
-
-    Params:
-        `music_id`: 谱面 ID（会按 `% 10000` 取标准封面编号）
-    Returns:
-        下载成功返回本地缓存路径，否则返回 `None`
-    """
-    # 延迟导入以避免导入期循环依赖
-    from .maimaidx_api_data import maiApi
-
-    if not getattr(maiApi.config, 'assets_online', True):
-        return None
-
-    # DX / 宴会場 ID 与标准封面共用同一张图（编号后四位）
-    cover_id = int(music_id) % 10000
-    if cover_id in _missing_covers:
-        return None
-
-    target = coverdir / f'{cover_id}.png'
-    if target.exists():
-        return target
-
-    # 水鱼封面 CDN 使用未补零的 ID
-    url = f'{maiApi.MaiCover}/{cover_id}.png'
-    try:
-        req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urlopen(req, timeout=10) as resp:
-            if getattr(resp, 'status', 200) != 200:
-                _missing_covers.add(cover_id)
-                return None
-            content = resp.read()
-        if not content:
-            _missing_covers.add(cover_id)
-            return None
-        coverdir.mkdir(parents=True, exist_ok=True)
-        target.write_bytes(content)
-        return target
-    except Exception as e:
-        _missing_covers.add(cover_id)
-        log.warning(f'在线下载封面失败（id={music_id} → {cover_id}）：{e}')
-        return None
-
-
 def music_picture(music_id: Union[int, str]) -> Path:
     """
     获取谱面图片路径。
 
     对齐上游：封面文件按 `song_id % 10000` 取本地文件；
-    均不存在时回退 `0.png`（占位图）。
+    均不存在时回退 `0.png`（占位图）。此处不联网，缺失的封面由
+    `maimaidx_covers.covers` 在绘图前异步下载。
     
     Params:
         `music_id`: 谱面 ID
@@ -278,10 +302,6 @@ def music_picture(music_id: Union[int, str]) -> Path:
     if (_path := coverdir / f'{cover_id}.png').exists():
         return _path
 
-    # 本地无封面时，按需在线下载并缓存（受 assets_online 控制）
-    if (_online := _download_cover(music_id)) is not None:
-        return _online
-
     fallback = coverdir / '0.png'
     if fallback.exists():
         return fallback
@@ -292,7 +312,7 @@ def music_picture(music_id: Union[int, str]) -> Path:
 
 
 def text_to_image(text: str) -> Image.Image:
-    font = ImageFont.truetype(str(SHANGGUMONO), 24)
+    font = get_font(SHANGGUMONO, 24)
     padding = 10
     margin = 4
     lines = text.strip().split('\n')
@@ -1,5 +1,7 @@
 import math
 import traceback
+from bisect import bisect_left
+from functools import lru_cache
 from io import BytesIO
 from typing import Dict, List, Optional, Tuple, Union, overload
 
@@ -8,21 +10,18 @@ from PIL import Image, ImageDraw
 from .. import *
 from .image import DrawText, image_to_base64, music_picture
 from .maimaidx_api_data import maiApi
+from .maimaidx_covers import covers
 from .maimaidx_error import *
 from .maimaidx_model import ChartInfo, PlayInfoDefault, PlayInfoDev, UserInfo
 from .maimaidx_music import mai
 from .maimaidx_play_result import dx_star_from_percentage
+from .maimaidx_render import render_pool
+from .maimaidx_render_cache import render_cache
+from .maimaidx_sprites import sprites, themed_path
+from .maimaidx_tiles import score_tiles
 from .maimaidx_user import Theme
 
 
-def themed_path(theme: Theme, name: str) -> Path:
-    """按主题返回素材路径，主题目录不存在时回退到 mai/pic 根目录。"""
-    path = maimaidir / theme.value / name
-    if path.exists():
-        return path
-    return maimaidir / name
-
-
 def rating_asset_name(rating: int, theme: Theme = Theme.PRISM_PLUS) -> str:
     """按 DX Rating 返回与 B50 页头一致的 Rating 牌素材名。"""
     if rating < 1000:
@@ -227,25 +226,6 @@ class ScoreBaseImage:
                 log.warning(f'无效的 level_index: {getattr(info, "level_index", None)} for song {getattr(info, "song_id", "unknown")}')
                 continue
 
-            cover = Image.open(music_picture(info.song_id)).resize((75, 75))
-            version = Image.open(maimaidir / f'{info.type.upper()}.png').resize((37, 14))
-            if info.rate.islower():
-                rank_name = f'UI_TTR_Rank_{score_Rank_l[info.rate]}.png'
-            else:
-                rank_name = f'UI_TTR_Rank_{info.rate}.png'
-            rate = Image.open(themed_path(self.theme, rank_name)).resize((63, 28))
-
-            self._im.alpha_composite(self._diff[info.level_index], (x, y))
-            self._im.alpha_composite(cover, (x + 12, y + 12))
-            self._im.alpha_composite(version, (x + 51, y + 91))
-            self._im.alpha_composite(rate, (x + 92, y + 78))
-            if info.fc:
-                fc = Image.open(maimaidir / f'UI_MSS_MBase_Icon_{fcl[info.fc]}.png').resize((34, 34))
-                self._im.alpha_composite(fc, (x + 154, y + 77))
-            if info.fs:
-                fs = Image.open(maimaidir / f'UI_MSS_MBase_Icon_{fsl[info.fs]}.png').resize((34, 34))
-                self._im.alpha_composite(fs, (x + 185, y + 77))
-            
             # 安全获取歌曲信息和谱面数据，防止 IndexError
             music = mai.total_list.by_id(str(info.song_id))
             if music and music.charts and len(music.charts) > info.level_index:
@@ -255,21 +235,57 @@ class ScoreBaseImage:
                 # 如果无法获取谱面数据，使用默认值或跳过 DX 分数显示
                 dxscore = 0
                 log.warning(f'无法获取歌曲 {info.song_id} 的谱面数据 (level_index: {info.level_index})')
-            
-            dxnum = dxScore(info.dxScore / dxscore * 100) if dxscore > 0 else 0
-            if dxnum:
-                self._im.alpha_composite(
-                    Image.open(maimaidir / f'UI_GAM_Gauge_DXScoreIcon_0{dxnum}.png').resize((47, 26)), (x + 217, y + 80)
-                )
-
-            self._tb.draw(x + 26, y + 98, 13, info.song_id, self.id_color[info.level_index], anchor='mm')
-            title = info.title
-            if coloumWidth(title) > 18:
-                title = changeColumnWidth(title, 17) + '...'
-            self._sy.draw(x + 93, y + 14, 14, title, self.t_color[info.level_index], anchor='lm')
-            self._tb.draw(x + 93, y + 38, 30, f'{info.achievements:.4f}%', self.t_color[info.level_index], anchor='lm')
-            self._tb.draw(x + 219, y + 65, 15, f'{info.dxScore}/{dxscore}', self.t_color[info.level_index], anchor='mm')
-            self._tb.draw(x + 93, y + 65, 15, f'{info.ds} -> {info.ra}', self.t_color[info.level_index], anchor='lm')
+
+            # 曲绘路径与修改时间计入指纹，占位图或手动替换过的曲绘不会一直沿用
+            key = score_tiles.key(
+                self.theme, music_picture(info.song_id), info.song_id, info.level_index, info.type,
+                info.title, info.rate, info.fc, info.fs, info.achievements, info.dxScore, dxscore,
+                info.ds, info.ra
+            )
+            tile = score_tiles.get(key, lambda: self._draw_tile(info, dxscore))
+            self._im.alpha_composite(tile, (x, y))
+
+    def _draw_tile(
+        self,
+        info: Union[ChartInfo, PlayInfoDefault, PlayInfoDev],
+        dxscore: int
+    ) -> Image.Image:
+        """
+        绘制单个成绩格
+
+        Params:
+            `info`: 成绩
+            `dxscore`: 谱面 DX 分数上限，未知时为 0
+        Returns:
+            `Image.Image` 透明底的成绩格，左上角对应格子位置
+        """
+        frame = self._diff[info.level_index]
+        im = Image.new('RGBA', (max(frame.width, 276), max(frame.height, 114)), (0, 0, 0, 0))
+        im.alpha_composite(frame, (0, 0))
+        im.alpha_composite(sprites.cover(info.song_id), (12, 12))
+        im.alpha_composite(sprites.type_badge(info.type), (51, 91))
+        im.alpha_composite(sprites.rank(self.theme, info.rate), (92, 78))
+        if fc := sprites.fc(info.fc):
+            im.alpha_composite(fc, (154, 77))
+        if fs := sprites.fs(info.fs):
+            im.alpha_composite(fs, (185, 77))
+
+        dxnum = dxScore(info.dxScore / dxscore * 100) if dxscore > 0 else 0
+        if dxnum:
+            im.alpha_composite(sprites.dx_star(dxnum), (217, 80))
+
+        dr = ImageDraw.Draw(im)
+        sy = DrawText(dr, SIYUAN)
+        tb = DrawText(dr, TBFONT)
+        tb.draw(26, 98, 13, info.song_id, self.id_color[info.level_index], anchor='mm')
+        title = info.title
+        if coloumWidth(title) > 18:
+            title = changeColumnWidth(title, 17) + '...'
+        sy.draw(93, 14, 14, title, self.t_color[info.level_index], anchor='lm')
+        tb.draw(93, 38, 30, f'{info.achievements:.4f}%', self.t_color[info.level_index], anchor='lm')
+        tb.draw(219, 65, 15, f'{info.dxScore}/{dxscore}', self.t_color[info.level_index], anchor='mm')
+        tb.draw(93, 65, 15, f'{info.ds} -> {info.ra}', self.t_color[info.level_index], anchor='lm')
+        return im
 
 
 class DrawBest(ScoreBaseImage):
@@ -357,8 +373,28 @@ class DrawBest(ScoreBaseImage):
         """
         return dani_plate_asset_name(self.addRating)
 
+    async def fetch_qq_logo(self) -> Optional[bytes]:
+        """获取 QQ 头像，失败时返回 None（使用默认头像）"""
+        if not self.qqid:
+            return None
+        try:
+            return await maiApi.qqlogo(qqid=self.qqid)
+        except Exception:
+            return None
+
     async def draw(self) -> Image.Image:
-        
+        """获取头像后在绘图线程池中绘制"""
+        return await render_pool.run(self.render, await self.fetch_qq_logo())
+
+    def render(self, qq_logo: Optional[bytes] = None) -> Image.Image:
+        """
+        绘制 B50
+
+        Params:
+            `qq_logo`: QQ 头像数据
+        Returns:
+            `Image.Image`
+        """
         logo = Image.open(themed_path(self.theme, 'logo.png')).resize((249, 120))
         Name = Image.open(maimaidir / 'Name.png')
         MatchLevel = Image.open(maimaidir / self._findMatchLevel()).resize((80, 32))
@@ -376,9 +412,9 @@ class DrawBest(ScoreBaseImage):
         self._im.alpha_composite(plate, (300, 60))
         icon = Image.open(maimaidir / 'UI_Icon_509506.png').resize((120, 120))
         self._im.alpha_composite(icon, (305, 65))
-        if self.qqid:
+        if qq_logo:
             try:
-                qqLogo = Image.open(BytesIO(await maiApi.qqlogo(qqid=self.qqid)))
+                qqLogo = Image.open(BytesIO(qq_logo))
                 self._im.alpha_composite(qqLogo.convert('RGBA').resize((120, 120)), (305, 65))
             except Exception:
                 pass
@@ -514,22 +550,26 @@ def dxScore(dx: int) -> int:
     return dx_star_from_percentage(dx)
 
 
+_CHAR_WIDTHS = (
+    (126, 1), (159, 0), (687, 1), (710, 0), (711, 1), (727, 0), (733, 1), (879, 0), (1154, 1), (1161, 0),
+    (4347, 1), (4447, 2), (7467, 1), (7521, 0), (8369, 1), (8426, 0), (9000, 1), (9002, 2), (11021, 1),
+    (12350, 2), (12351, 1), (12438, 2), (12442, 0), (19893, 2), (19967, 1), (55203, 2), (63743, 1),
+    (64106, 2), (65039, 1), (65059, 0), (65131, 2), (65279, 1), (65376, 2), (65500, 1), (65510, 2),
+    (120831, 1), (262141, 2), (1114109, 1),
+)
+_CHAR_WIDTH_BOUNDS = [num for num, _ in _CHAR_WIDTHS]
+
+
 def getCharWidth(o: int) -> int:
-    widths = [
-        (126, 1), (159, 0), (687, 1), (710, 0), (711, 1), (727, 0), (733, 1), (879, 0), (1154, 1), (1161, 0),
-        (4347, 1), (4447, 2), (7467, 1), (7521, 0), (8369, 1), (8426, 0), (9000, 1), (9002, 2), (11021, 1),
-        (12350, 2), (12351, 1), (12438, 2), (12442, 0), (19893, 2), (19967, 1), (55203, 2), (63743, 1),
-        (64106, 2), (65039, 1), (65059, 0), (65131, 2), (65279, 1), (65376, 2), (65500, 1), (65510, 2),
-        (120831, 1), (262141, 2), (1114109, 1),
-    ]
     if o == 0xe or o == 0xf:
         return 0
-    for num, wid in widths:
-        if o <= num:
-            return wid
+    index = bisect_left(_CHAR_WIDTH_BOUNDS, o)
+    if index < len(_CHAR_WIDTHS):
+        return _CHAR_WIDTHS[index][1]
     return 1
 
 
+@lru_cache(maxsize=4096)
 def coloumWidth(s: str) -> int:
     res = 0
     for ch in s:
@@ -537,6 +577,7 @@ def coloumWidth(s: str) -> int:
     return res
 
 
+@lru_cache(maxsize=4096)
 def changeColumnWidth(s: str, len: int) -> str:
     res = 0
     sList = []
@@ -704,7 +745,20 @@ async def generate(
             all_songs=all_songs,
         )
 
-        msg = MessageSegment.image(image_to_base64(await draw_best.draw()))
+        # 头像与曲绘文件计入指纹，更换头像或曲绘下载成功后重新绘制
+        qq_logo = await draw_best.fetch_qq_logo()
+        song_ids = [chart.song_id for chart in draw_best.sdBest + draw_best.dxBest]
+        await covers.ensure(song_ids)
+        key = render_cache.key(
+            'b50', 'best', qqid, qq_logo, player, best50, theme, all_perfect, min_dx_star, fitted,
+            all_perfect_plus, achievement_mode, difficulty_index, all_songs,
+            [music_picture(song_id) for song_id in song_ids],
+        )
+
+        async def render() -> str:
+            return await render_pool.encode(draw_best.render, qq_logo, kind='best')
+
+        msg = MessageSegment.image(await render_cache.fetch(key, render))
     except (
         UserNotFoundError,
         UserNotExistsError,
@@ -19,11 +19,13 @@ from .. import (
     log,
     maimaidir,
 )
-from .image import image_to_base64, music_picture
+from .image import get_font, music_picture
 from .maimai_best_50 import (
     rating_asset_name,
     themed_path,
 )
+from .maimaidx_covers import covers
+from .maimaidx_layers import backgrounds
 from .maimaidx_error import (
     TokenDisableError,
     TokenError,
@@ -34,6 +36,8 @@ from .maimaidx_error import (
 )
 from .maimaidx_music import mai
 from .maimaidx_play_result import Best50, PlayedResult, Player
+from .maimaidx_render import render_pool
+from .maimaidx_render_cache import render_cache
 from .maimaidx_user import Theme
 
 
@@ -261,10 +265,10 @@ class DrawGoldAnalysis:
 
     @staticmethod
     def _font(path: str, size: int) -> ImageFont.FreeTypeFont:
-        return ImageFont.truetype(path, size)
+        return get_font(path, size)
 
     def _make_background(self) -> Image.Image:
-        """以画面中心为焦点，等比裁切现有 Circle B50 背景。"""
+        """以画面中心为焦点，等比裁切现有 Circle B50 背景；裁切结果缓存，返回副本。"""
         paths = (
             maimaidir / 'circle' / 'b50.png',
             maimaidir / 'prism_plus' / 'b50.png',
@@ -273,13 +277,17 @@ class DrawGoldAnalysis:
         if background_path is None:
             return Image.new('RGBA', (self.WIDTH, self.HEIGHT), (250, 67, 181, 255))
 
-        source = Image.open(background_path).convert('RGBA')
-        return ImageOps.fit(
-            source,
-            (self.WIDTH, self.HEIGHT),
-            method=Image.Resampling.LANCZOS,
-            centering=(0.5, 0.5),
-        )
+        def fit() -> Image.Image:
+            source = Image.open(background_path).convert('RGBA')
+            return ImageOps.fit(
+                source,
+                (self.WIDTH, self.HEIGHT),
+                method=Image.Resampling.LANCZOS,
+                centering=(0.5, 0.5),
+            )
+
+        key = ('analysis', self.WIDTH, self.HEIGHT, str(background_path), background_path.stat().st_mtime_ns)
+        return backgrounds.get(key, fit).copy()
 
     def _text(
         self,
@@ -457,6 +465,15 @@ class DrawGoldAnalysis:
             stroke_fill=(128, 20, 145, 255),
         )
 
+    @classmethod
+    def render_image(
+        cls,
+        player: Player,
+        analysis: Union[GoldAnalysis, WaterAnalysis],
+    ) -> Image.Image:
+        """构建并绘制，供绘图线程池调用"""
+        return cls(player, analysis).render()
+
     def render(self) -> Image.Image:
         self._draw_summary()
         for index, chart in enumerate(self.analysis.top_charts):
@@ -488,8 +505,17 @@ async def generate_gold_analysis(
         analysis = analyze_b50_gold(best50)
         if not analysis.valid_count:
             return '当前 B50 暂无可用的谱面拟合定数'
-        image = DrawGoldAnalysis(player, analysis).render()
-        return MessageSegment.image(image_to_base64(image))
+
+        async def render() -> str:
+            return await render_pool.encode(DrawGoldAnalysis.render_image, player, analysis, kind='best')
+
+        # 曲绘文件计入指纹，下载失败时的占位图不会一直命中
+        song_ids = [chart.record.song_id for chart in analysis.top_charts]
+        await covers.ensure(song_ids)
+        key = render_cache.key(
+            'gold_analysis', 'best', player, best50, [music_picture(song_id) for song_id in song_ids]
+        )
+        return MessageSegment.image(await render_cache.fetch(key, render))
     except (
         UserNotFoundError,
         UserNotExistsError,
@@ -518,8 +544,17 @@ async def generate_water_analysis(
         analysis = analyze_b50_water(best50)
         if not analysis.valid_count:
             return '当前 B50 暂无可用的谱面拟合定数'
-        image = DrawWaterAnalysis(player, analysis).render()
-        return MessageSegment.image(image_to_base64(image))
+
+        async def render() -> str:
+            return await render_pool.encode(DrawWaterAnalysis.render_image, player, analysis, kind='best')
+
+        # 曲绘文件计入指纹，下载失败时的占位图不会一直命中
+        song_ids = [chart.record.song_id for chart in analysis.top_charts]
+        await covers.ensure(song_ids)
+        key = render_cache.key(
+            'water_analysis', 'best', player, best50, [music_picture(song_id) for song_id in song_ids]
+        )
+        return MessageSegment.image(await render_cache.fetch(key, render))
     except (
         UserNotFoundError,
         UserNotExistsError,
@@ -1,10 +1,14 @@
 from typing import Any, Dict
 
-from aiohttp import ClientSession, ClientTimeout
-
 from .. import UUID
+from .maimaidx_cache import cache_key, response_cache
 from .maimaidx_error import *
+from .maimaidx_http import request_key, session_manager, single_flight
 from .maimaidx_model import *
+from .maimaidx_encoding import encoder
+from .maimaidx_render import render_pool
+from .maimaidx_render_cache import render_cache
+from .maimaidx_tiles import score_tiles
 
 
 class MaiConfig(BaseModel):
@@ -23,6 +27,24 @@ class MaiConfig(BaseModel):
     lx_client_id: Optional[str] = None        # OAuth 应用 client_id（模式B）
     lx_client_secret: Optional[str] = None    # OAuth 应用 client_secret（模式B）
     lx_redirect_uri: Optional[str] = None     # OAuth 回调地址（模式B）
+    # 成绩查询缓存：同一用户在 TTL 内的重复查询复用上次结果，TTL 为 0 时关闭
+    response_cache_ttl: int = 60
+    response_cache_size: int = 256
+    # 绘图线程数，为 0 时在事件循环中直接绘制
+    render_workers: int = 2
+    # 图片输出编码：默认格式（PNG / JPEG / WEBP）、有损质量、PNG 压缩等级与调色板颜色数（0 不量化）
+    image_format: str = 'PNG'
+    image_quality: int = 85
+    image_compress_level: int = 6
+    image_quantize: int = 0
+    # 绘图结果缓存：内存中保留的图片数，与磁盘缓存文件数上限（0 不写入磁盘）
+    render_cache_size: int = 32
+    render_cache_disk_size: int = 0
+    # 成绩格缓存：内存中保留的格子数，与磁盘缓存文件数上限（0 不写入磁盘）
+    tile_cache_size: int = 512
+    tile_cache_disk_size: int = 0
+    # 按图片类型指定格式，如 `best=WEBP,table=JPEG`，类型见 maimaidx_encoding.KINDS
+    image_format_overrides: str = ''
 
 
 class MaimaiAPI:
@@ -53,6 +75,17 @@ class MaimaiAPI:
         self.token = self.config.maimaidxtoken
         if self.token:
             self.headers = {'developer-token': self.token}
+        response_cache.configure(self.config.response_cache_ttl, self.config.response_cache_size)
+        render_pool.configure(self.config.render_workers)
+        render_cache.configure(self.config.render_cache_size, self.config.render_cache_disk_size)
+        score_tiles.configure(self.config.tile_cache_size, self.config.tile_cache_disk_size)
+        encoder.configure(
+            self.config.image_format,
+            self.config.image_quality,
+            self.config.image_compress_level,
+            self.config.image_quantize,
+            self.config.image_format_overrides,
+        )
     
     
     async def _requestalias(self, method: str, endpoint: str, **kwargs) -> APIResult:
@@ -66,8 +99,11 @@ class MaimaiAPI:
         Returns:
             `APIResult` 返回结果
         """
-        async with ClientSession(timeout=ClientTimeout(total=30)) as session:
-            async with session.request(method, self.MaiAliasProxyAPI + endpoint, **kwargs) as res:
+        url = self.MaiAliasProxyAPI + endpoint
+
+        async def request() -> APIResult:
+            session = session_manager.get()
+            async with session.request(method, url, **kwargs) as res:
                 if res.status == 200:
                     data = await res.json()
                     return APIResult.model_validate(data)
@@ -76,6 +112,11 @@ class MaimaiAPI:
                 else:
                     raise UnknownError
 
+        # 提交别名、投票等写操作不合并
+        if method != 'GET':
+            return await request()
+        return await single_flight.run(request_key(method, url, **kwargs), request)
+
     async def _requestmai(
         self, 
         method: str, 
@@ -92,13 +133,11 @@ class MaimaiAPI:
         Returns:
             `Dict[str, Any]` 返回结果
         """
-        async with ClientSession(timeout=ClientTimeout(total=30)) as session:
-            async with session.request(
-                method, 
-                self.MaiProberProxyAPI + endpoint, 
-                headers=self.headers, 
-                **kwargs
-            ) as res:
+        url = self.MaiProberProxyAPI + endpoint
+
+        async def request() -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+            session = session_manager.get()
+            async with session.request(method, url, headers=self.headers, **kwargs) as res:
                 if res.status == 200:
                     data = await res.json()
                 elif res.status == 400:
@@ -123,7 +162,11 @@ class MaimaiAPI:
                     raise UserDisabledQueryError
                 else:
                     raise UnknownError
-        return data
+            return data
+
+        # 查分器接口均为查询（POST 仅用于传参），相同请求在途时直接复用
+        key = request_key(method, url, headers=self.headers, **kwargs)
+        return await single_flight.run(key, request)
     
     async def music_data(self):
         """获取曲目数据"""
@@ -155,7 +198,11 @@ class MaimaiAPI:
             json['username'] = username
         json['b50'] = True
 
-        return UserInfo.model_validate(await self._requestmai('POST', '/query/player', json=json))
+        async def request() -> UserInfo:
+            return UserInfo.model_validate(await self._requestmai('POST', '/query/player', json=json))
+
+        key = cache_key('divingfish', qqid or username, '/query/player', json)
+        return await response_cache.fetch(key, request)
 
     async def query_user_plate(
         self,
@@ -181,8 +228,13 @@ class MaimaiAPI:
             json['username'] = username
         if version:
             json['version'] = version
-        result = await self._requestmai('POST', '/query/plate', json=json)
-        return [PlayInfoDefault.model_validate(d) for d in result['verlist']]
+
+        async def request() -> List[PlayInfoDefault]:
+            result = await self._requestmai('POST', '/query/plate', json=json)
+            return [PlayInfoDefault.model_validate(d) for d in result['verlist']]
+
+        key = cache_key('divingfish', qqid or username, '/query/plate', json)
+        return await response_cache.fetch(key, request)
 
     async def query_user_get_dev(
         self, 
@@ -205,8 +257,12 @@ class MaimaiAPI:
         if username:
             params['username'] = username
         
-        result = await self._requestmai('GET', '/dev/player/records', params=params)
-        return UserInfoDev.model_validate(result)
+        async def request() -> UserInfoDev:
+            result = await self._requestmai('GET', '/dev/player/records', params=params)
+            return UserInfoDev.model_validate(result)
+
+        key = cache_key('divingfish', qqid or username, '/dev/player/records', params)
+        return await response_cache.fetch(key, request)
 
     async def query_user_post_dev(
         self,
@@ -358,18 +414,19 @@ class MaimaiAPI:
 
     async def qqlogo(self, qqid: int = None, icon: str = None) -> Optional[bytes]:
         """获取QQ头像"""
-        async with ClientSession(timeout=ClientTimeout(total=30)) as session:
-            if qqid:
-                params = {
-                    'b': 'qq',
-                    'nk': qqid,
-                    's': 100
-                }
-                res = await session.request('GET', self.QQAPI, params=params)
-            elif icon:
-                res = await session.request('GET', icon)
-            else:
-                return None
+        session = session_manager.get()
+        if qqid:
+            params = {
+                'b': 'qq',
+                'nk': qqid,
+                's': 100
+            }
+            request = session.request('GET', self.QQAPI, params=params)
+        elif icon:
+            request = session.request('GET', icon)
+        else:
+            return None
+        async with request as res:
             return await res.read()
 
 
@@ -8,6 +8,7 @@ import aiohttp
 from pydantic import BaseModel
 
 from .. import arcades_json, loga
+from .maimaidx_http import session_manager
 from .maimaidx_music import writefile
 
 
@@ -149,7 +150,8 @@ arcade = ArcadeData()
 async def download_arcade_info(save: bool = True) -> ArcadeList:
     arcadelist = ArcadeList()
     try:
-        async with aiohttp.request('GET', 'https://wc.wahlap.net/maidx/rest/location', timeout=aiohttp.ClientTimeout(total=60)) as req:
+        session = session_manager.get()
+        async with session.get('https://wc.wahlap.net/maidx/rest/location', timeout=aiohttp.ClientTimeout(total=60)) as req:
             if req.status == 200:
                 data = await req.json()
             else:
@@ -0,0 +1,147 @@
+"""查分器响应缓存：按 (数据源, 用户, 接口, 参数) 缓存成绩查询结果，TTL 过期 + LRU 淘汰。"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple, TypeVar, Union
+
+from .. import log
+
+T = TypeVar('T')
+
+CacheKey = Tuple[str, str, str, Hashable]
+"""(数据源, 用户, 接口, 参数)"""
+
+
+def freeze(value: Any) -> Hashable:
+    """把请求参数转换为可哈希的形式，字典按键排序，列表转元组"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def cache_key(
+    service: str,
+    user: Optional[Union[int, str]],
+    endpoint: str,
+    params: Optional[Any] = None
+) -> CacheKey:
+    """
+    生成缓存键
+
+    Params:
+        `service`: 数据源，如 `divingfish` / `lxns`
+        `user`: QQ 号、查分器用户名或好友码
+        `endpoint`: 接口
+        `params`: 其余请求参数
+    Returns:
+        `CacheKey`
+    """
+    return service, str(user), endpoint, freeze(params)
+
+
+class ResponseCache:
+    """
+    查分器响应缓存
+
+    缓存的是解析后的模型对象，同一用户短时间内的多次查询共享同一结果，调用方不应原地修改。
+    请求出错时不缓存。`ttl` 为 0 时关闭缓存。
+    """
+
+    def __init__(self, ttl: float = 60, maxsize: int = 256) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[CacheKey, Tuple[float, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def configure(self, ttl: float, maxsize: int) -> None:
+        """修改 TTL 与容量，超出容量的旧条目立即淘汰"""
+        self.ttl = max(ttl, 0)
+        self.maxsize = max(maxsize, 0)
+        if not self.ttl or not self.maxsize:
+            self._data.clear()
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        """
+        读取缓存
+
+        Returns:
+            `(是否命中, 值)`
+        """
+        item = self._data.get(key)
+        if item is None:
+            return False, None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        """写入缓存"""
+        if not self.ttl or not self.maxsize:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        self._evict()
+
+    async def fetch(self, key: CacheKey, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        命中时直接返回缓存，否则调用 `factory` 请求并写入缓存
+
+        Params:
+            `key`: 缓存键
+            `factory`: 实际请求
+        """
+        hit, value = self.get(key)
+        if hit:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await factory()
+        self.set(key, value)
+        return value
+
+    def invalidate(
+        self,
+        user: Optional[Union[int, str]] = None,
+        service: Optional[str] = None
+    ) -> int:
+        """
+        清除缓存
+
+        Params:
+            `user`: 只清除该用户的条目，默认全部
+            `service`: 只清除该数据源的条目，默认全部
+        Returns:
+            `int` 清除的条目数
+        """
+        if user is None and service is None:
+            count = len(self._data)
+            self._data.clear()
+        else:
+            user = None if user is None else str(user)
+            keys = [
+                key for key in self._data
+                if (user is None or key[1] == user) and (service is None or key[0] == service)
+            ]
+            for key in keys:
+                del self._data[key]
+            count = len(keys)
+        if count:
+            log.info(f'已清除 {count} 条成绩缓存')
+        return count
+
+
+response_cache = ResponseCache()
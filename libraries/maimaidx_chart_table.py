@@ -0,0 +1,153 @@
+"""谱面列式表：把曲库按「一行一张谱面」展开为 NumPy 数组，供范围查询使用。"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .maimaidx_model import Music
+
+
+class ChartTable:
+    """
+    谱面列式表
+
+    每个属性都是等长的一维数组，同一下标对应同一张谱面；行按曲目在曲库中的位置、
+    再按难度下标排列，与逐曲遍历 `music.ds` 的顺序一致。
+    字符串字段（等级、版本、类型）以编码存储，编码表见 `levels` / `versions` / `types`。
+    """
+
+    def __init__(self, musics: Sequence[Music], level_value_map: Optional[Dict[str, float]] = None) -> None:
+        self.levels: List[str] = []
+        self.versions: List[str] = []
+        self.types: List[str] = []
+        self._codes: Dict[str, Dict[str, int]] = {'levels': {}, 'versions': {}, 'types': {}}
+
+        position, song_id, level_index, ds, level_value, fit_diff = [], [], [], [], [], []
+        level, bpm, version, type = [], [], [], []
+        notes: List[Tuple[int, int, int, int, int]] = []
+        for pos, music in enumerate(musics):
+            try:
+                sid = int(music.id)
+            except ValueError:
+                continue
+            bpm_value = music.basic_info.bpm
+            version_code = self._encode('versions', music.basic_info.version)
+            type_code = self._encode('types', music.type)
+            for index, chart_ds in enumerate(music.ds):
+                position.append(pos)
+                song_id.append(sid)
+                level_index.append(index)
+                ds.append(chart_ds)
+                if level_value_map is not None:
+                    level_value.append(level_value_map.get(f'{sid}-{index}', chart_ds))
+                else:
+                    level_value.append(chart_ds)
+                stats = music.stats[index] if music.stats and index < len(music.stats) else None
+                fit_diff.append(stats.fit_diff if stats and stats.fit_diff is not None else np.nan)
+                level.append(self._encode('levels', music.level[index] if index < len(music.level) else ''))
+                bpm.append(bpm_value)
+                version.append(version_code)
+                type.append(type_code)
+                notes.append(self._notes(music, index))
+
+        self.position = np.array(position, dtype=np.int32)
+        """曲目在曲库列表中的下标"""
+        self.song_id = np.array(song_id, dtype=np.int64)
+        self.level_index = np.array(level_index, dtype=np.int8)
+        self.ds = np.array(ds, dtype=np.float64)
+        self.level_value = np.array(level_value, dtype=np.float64)
+        """定数字典中的定数，缺失时同 `ds`"""
+        self.fit_diff = np.array(fit_diff, dtype=np.float64)
+        """拟合定数，缺失为 NaN"""
+        self.level = np.array(level, dtype=np.int16)
+        self.bpm = np.array(bpm, dtype=np.int32)
+        self.version = np.array(version, dtype=np.int16)
+        self.type = np.array(type, dtype=np.int8)
+        note_matrix = np.array(notes, dtype=np.int32).reshape(-1, 5)
+        self.tap, self.hold, self.slide, self.touch, self.brk = note_matrix.T
+        self.notes = note_matrix.sum(axis=1)
+        self.dx_max = self.notes * 3
+        """DX 分数满分"""
+
+    def __len__(self) -> int:
+        return len(self.song_id)
+
+    def _encode(self, field: str, value: str) -> int:
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(codes)
+            getattr(self, field).append(value)
+        return codes[value]
+
+    @staticmethod
+    def _notes(music: Music, index: int) -> Tuple[int, int, int, int, int]:
+        """(tap, hold, slide, touch, break)，标准谱面 touch 为 0"""
+        if index >= len(music.charts):
+            return 0, 0, 0, 0, 0
+        notes = music.charts[index].notes
+        if len(notes) == 4:
+            tap, hold, slide, brk = notes
+            touch = 0
+        else:
+            tap, hold, slide, touch, brk = notes
+        return tuple(int(n or 0) for n in (tap, hold, slide, touch, brk))
+
+    def _codes_of(self, field: str, values: Union[str, Iterable[str]]) -> List[int]:
+        if isinstance(values, str):
+            values = [values]
+        codes = self._codes[field]
+        return [codes[value] for value in values if value in codes]
+
+    def mask(
+        self,
+        *,
+        level: Optional[Union[str, List[str]]] = None,
+        ds: Optional[Union[float, Tuple[float, float]]] = None,
+        level_index: Optional[Union[int, List[int]]] = None,
+        version: Optional[Union[str, List[str]]] = None,
+        type: Optional[Union[str, List[str]]] = None,
+        exclude_song_ids: Optional[Iterable[int]] = None,
+        max_song_id: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        组合筛选条件，返回布尔掩码
+
+        Params:
+            `level`: 等级，列表为任一匹配
+            `ds`: 定数，元组为闭区间
+            `level_index`: 难度下标
+            `version`: 版本，列表为任一匹配
+            `type`: 谱面类型
+            `exclude_song_ids`: 排除的曲目 ID
+            `max_song_id`: 只保留小于该值的曲目 ID，如 `100000` 可排除宴会场
+        Returns:
+            `np.ndarray` 与表等长的布尔数组
+        """
+        result = np.ones(len(self), dtype=bool)
+        if level is not None:
+            result &= np.isin(self.level, self._codes_of('levels', level))
+        if ds is not None:
+            if isinstance(ds, tuple):
+                result &= (self.ds >= ds[0]) & (self.ds <= ds[1])
+            else:
+                result &= self.ds == ds
+        if level_index is not None:
+            result &= np.isin(self.level_index, level_index)
+        if version is not None:
+            result &= np.isin(self.version, self._codes_of('versions', version))
+        if type is not None:
+            result &= np.isin(self.type, self._codes_of('types', type))
+        if exclude_song_ids is not None:
+            result &= ~np.isin(self.song_id, np.fromiter(exclude_song_ids, dtype=np.int64))
+        if max_song_id is not None:
+            result &= self.song_id < max_song_id
+        return result
+
+    def rows(self, mask: np.ndarray) -> np.ndarray:
+        """掩码为真的行号，按曲库顺序排列"""
+        return np.flatnonzero(mask)
+
+    def level_of(self, row: int) -> str:
+        return self.levels[self.level[row]]
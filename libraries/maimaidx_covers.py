@@ -0,0 +1,498 @@
+"""曲绘在线下载：异步并发获取缺失封面，失败重试；CDN 无此封面的编号持久化记录，过期前不再请求。"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Literal, Optional, Tuple, Union
+
+from aiohttp import ClientError
+from PIL import Image
+from pydantic import BaseModel, ValidationError
+
+from .. import coverdir, data_dir, log
+from .maimaidx_http import session_manager
+from .maimaidx_render_cache import render_cache
+from .maimaidx_tiles import score_tiles
+
+CONCURRENCY = 8
+"""同时下载的封面数"""
+RETRIES = 3
+"""网络错误或服务端错误时的最多尝试次数"""
+BACKOFF = 0.5
+"""重试间隔基数（秒），每次翻倍"""
+MISSING_TTL = 7 * 24 * 3600
+"""确认缺失的封面在该秒数内不再请求"""
+MISSING_FILE = 'missing_covers.json'
+MANIFEST_FILE = 'manifest.json'
+
+DownloadStatus = Literal['downloaded', 'not_modified', 'missing', 'failed']
+LocalStatus = Literal['ok', 'absent', 'corrupt']
+
+
+def cover_id_of(music_id: Union[int, str]) -> int:
+    """DX / 宴会場 ID 与标准封面共用同一张图（编号后四位）"""
+    return int(music_id) % 10000
+
+
+class CoverEntry(BaseModel):
+
+    size: int
+    sha256: str
+    mtime: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class CoverSyncReport(BaseModel):
+
+    total: int = 0
+    """需要的封面数（按编号去重）"""
+    downloaded: int = 0
+    """新下载"""
+    updated: int = 0
+    """远端有更新，重新下载"""
+    repaired: int = 0
+    """本地文件损坏，重新下载"""
+    unchanged: int = 0
+    missing: int = 0
+    """CDN 无此封面"""
+    failed: int = 0
+    elapsed: float = 0
+
+    def summary(self) -> str:
+        return (
+            f'曲绘同步完成，共 {self.total} 张，耗时 {self.elapsed:.1f}s\n'
+            f'新下载 {self.downloaded}，更新 {self.updated}，修复 {self.repaired}，未变化 {self.unchanged}\n'
+            f'CDN 缺失 {self.missing}，失败 {self.failed}'
+        )
+
+
+class CoverManifest:
+    """
+    封面清单 `cover/manifest.json`：编号 → 大小、SHA-256、修改时间与 CDN 的 ETag / Last-Modified
+
+    大小与修改时间一致时视为未变化，不重新计算哈希。
+    """
+
+    def __init__(self) -> None:
+        self._entries: Optional[Dict[int, CoverEntry]] = None
+        self._dirty = False
+
+    @property
+    def path(self) -> Path:
+        return coverdir / MANIFEST_FILE
+
+    @property
+    def entries(self) -> Dict[int, CoverEntry]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+                self._entries = {int(k): CoverEntry.model_validate(v) for k, v in data.items()}
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, AttributeError, ValidationError) as e:
+                log.warning(f'读取封面清单失败，将重新校验全部封面：{e}')
+        return self._entries
+
+    def record(
+        self,
+        cover_id: int,
+        content: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> None:
+        """记录刚写入的封面"""
+        path = coverdir / f'{cover_id}.png'
+        self.entries[cover_id] = CoverEntry(
+            size=len(content),
+            sha256=hashlib.sha256(content).hexdigest(),
+            mtime=path.stat().st_mtime,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._dirty = True
+
+    @staticmethod
+    def inspect(cover_id: int, entry: Optional[CoverEntry]) -> Tuple[LocalStatus, Optional[CoverEntry]]:
+        """
+        校验本地封面，不修改清单，可在线程中调用
+
+        Params:
+            `cover_id`: 封面编号
+            `entry`: 清单中现有的条目
+        Returns:
+            `(状态, 新条目)`，状态 `ok` 完好、`absent` 不存在、`corrupt` 无法解码；
+            新条目为 `None` 时应从清单中删除，与 `entry` 相同时无需更新
+        """
+        path = coverdir / f'{cover_id}.png'
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return 'absent', None
+        if entry is not None and entry.size == stat.st_size and entry.mtime == stat.st_mtime:
+            return 'ok', entry
+        content = path.read_bytes()
+        sha256 = hashlib.sha256(content).hexdigest()
+        if entry is None or entry.sha256 != sha256:
+            try:
+                with Image.open(BytesIO(content)) as im:
+                    im.verify()
+            except Exception:
+                return 'corrupt', entry
+            # 本地替换过的文件不再沿用 CDN 的校验信息
+            return 'ok', CoverEntry(size=stat.st_size, sha256=sha256, mtime=stat.st_mtime)
+        return 'ok', entry.model_copy(update={'size': stat.st_size, 'mtime': stat.st_mtime})
+
+    def apply(self, cover_id: int, entry: Optional[CoverEntry]) -> None:
+        """写入 `inspect` 的结果"""
+        if entry is None:
+            if self.entries.pop(cover_id, None) is not None:
+                self._dirty = True
+        elif self.entries.get(cover_id) is not entry:
+            self.entries[cover_id] = entry
+            self._dirty = True
+
+    def check(self, cover_id: int) -> LocalStatus:
+        """校验本地封面并更新清单，见 `inspect`"""
+        status, entry = self.inspect(cover_id, self.entries.get(cover_id))
+        self.apply(cover_id, entry)
+        return status
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = {str(k): v.model_dump(exclude_none=True) for k, v in sorted(self.entries.items())}
+        try:
+            coverdir.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_suffix('.tmp')
+            temp.write_text(json.dumps(data, indent=4), encoding='utf-8')
+            os.replace(temp, self.path)
+        except OSError as e:
+            log.warning(f'保存封面清单失败：{e}')
+
+
+class CoverFetcher:
+    """
+    封面下载器
+
+    使用共享 HTTP 会话，最多 `concurrency` 个并发；同一封面的并发请求只下载一次。
+    返回 404 等客户端错误的编号记入缺失列表（保存在 `data/missing_covers.json`，
+    `MISSING_TTL` 后过期）；超时与 5xx 按指数退避重试，仍失败时不记为缺失。
+    """
+
+    def __init__(self, concurrency: int = CONCURRENCY) -> None:
+        self.concurrency = concurrency
+        self.manifest = CoverManifest()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self._missing: Optional[Dict[int, float]] = None
+        self._dirty = False
+        self._sync_task: Optional[asyncio.Future] = None
+        self._sync_full = False
+        self.downloaded = 0
+        self.failed = 0
+
+    @property
+    def missing_file(self) -> Path:
+        return data_dir / MISSING_FILE
+
+    @property
+    def missing(self) -> Dict[int, float]:
+        """缺失封面编号 → 过期时间戳，首次访问时从磁盘读取并丢弃已过期的条目"""
+        if self._missing is None:
+            self._missing = {}
+            try:
+                data = json.loads(self.missing_file.read_text(encoding='utf-8'))
+                now = time.time()
+                self._missing = {int(k): float(v) for k, v in data.items() if float(v) > now}
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, AttributeError) as e:
+                log.warning(f'读取缺失封面记录失败：{e}')
+        return self._missing
+
+    def is_missing(self, cover_id: int) -> bool:
+        expires = self.missing.get(cover_id)
+        if expires is None:
+            return False
+        if expires <= time.time():
+            del self.missing[cover_id]
+            return False
+        return True
+
+    def _save_missing(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        path = self.missing_file
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_suffix('.tmp')
+            temp.write_text(json.dumps(self.missing, indent=4), encoding='utf-8')
+            os.replace(temp, path)
+        except OSError as e:
+            log.warning(f'保存缺失封面记录失败：{e}')
+
+    def _mark_missing(self, cover_id: int) -> None:
+        self.missing[cover_id] = time.time() + MISSING_TTL
+        self._dirty = True
+
+    def _save(self) -> None:
+        self._save_missing()
+        self.manifest.save()
+
+    @staticmethod
+    def local(music_id: Union[int, str]) -> bool:
+        """本地是否已有该谱面的封面"""
+        return (coverdir / f'{music_id}.png').exists() or (coverdir / f'{cover_id_of(music_id)}.png').exists()
+
+    @staticmethod
+    def online() -> bool:
+        """是否开启在线素材"""
+        from .maimaidx_api_data import maiApi
+
+        return getattr(maiApi.config, 'assets_online', True)
+
+    async def _download(self, cover_id: int, conditional: bool = False) -> DownloadStatus:
+        from .maimaidx_api_data import maiApi
+
+        target = coverdir / f'{cover_id}.png'
+        # 水鱼封面 CDN 使用未补零的 ID
+        url = f'{maiApi.MaiCover}/{cover_id}.png'
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        entry = self.manifest.entries.get(cover_id)
+        if conditional and entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore, self._loop = asyncio.Semaphore(self.concurrency), loop
+        async with self._semaphore:
+            for attempt in range(RETRIES):
+                try:
+                    session = session_manager.get()
+                    async with session.get(url, headers=headers) as resp:
+                        if resp.status == 304:
+                            return 'not_modified'
+                        if resp.status == 200:
+                            content = await resp.read()
+                            if not content:
+                                self._mark_missing(cover_id)
+                                return 'missing'
+                            coverdir.mkdir(parents=True, exist_ok=True)
+                            temp = target.with_suffix('.tmp')
+                            temp.write_bytes(content)
+                            os.replace(temp, target)
+                            self.manifest.record(
+                                cover_id, content, resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+                            )
+                            self.downloaded += 1
+                            return 'downloaded'
+                        if resp.status < 500 and resp.status != 429:
+                            self._mark_missing(cover_id)
+                            return 'missing'
+                        error = f'HTTP {resp.status}'
+                except (ClientError, asyncio.TimeoutError, OSError) as e:
+                    error = f'{type(e).__name__}: {e}'
+                if attempt + 1 < RETRIES:
+                    await asyncio.sleep(BACKOFF * 2 ** attempt)
+        self.failed += 1
+        log.warning(f'在线下载封面失败（{cover_id}）：{error}')
+        return 'failed'
+
+    def _start(self, cover_id: int, conditional: bool = False) -> asyncio.Future:
+        """发起下载，同一编号已在下载时复用"""
+        future = self._inflight.get(cover_id)
+        if future is None:
+            future = asyncio.ensure_future(self._download(cover_id, conditional))
+            self._inflight[cover_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(cover_id, None))
+        return future
+
+    async def fetch(self, music_id: Union[int, str], save: bool = True) -> Optional[Path]:
+        """
+        下载单个谱面的封面，本地已有、确认缺失或未开启在线素材时不请求
+
+        Params:
+            `music_id`: 谱面 ID
+            `save`: 是否立即保存缺失记录与封面清单
+        Returns:
+            下载成功或本地已有时返回路径，否则返回 `None`
+        """
+        cover_id = cover_id_of(music_id)
+        if (target := coverdir / f'{cover_id}.png').exists():
+            return target
+        if not self.online() or self.is_missing(cover_id):
+            return None
+        status = await asyncio.shield(self._start(cover_id))
+        if save:
+            self._save()
+        return target if status == 'downloaded' else None
+
+    async def ensure(self, music_ids: Iterable[Union[int, str]]) -> int:
+        """
+        下载一批谱面中本地缺失的封面，绘图前调用
+
+        Returns:
+            `int` 新下载的封面数
+        """
+        pending = {cover_id_of(i) for i in music_ids if not self.local(i)}
+        if not pending:
+            return 0
+        before = self.downloaded
+        await asyncio.gather(*(self.fetch(i, save=False) for i in pending))
+        self._save()
+        return self.downloaded - before
+
+    async def _sync(
+        self,
+        cover_ids: List[int],
+        full: bool,
+        progress: Optional[Callable[[int, int], None]]
+    ) -> CoverSyncReport:
+        start = time.perf_counter()
+        report = CoverSyncReport(total=len(cover_ids))
+        # 读取与哈希在线程中进行，清单中大小与修改时间未变的文件不重新计算；
+        # 线程只读快照，结果回到事件循环后再写入清单，避免与绘图时的下载同时修改
+        snapshot = dict(self.manifest.entries)
+        results = await asyncio.to_thread(
+            lambda: {i: self.manifest.inspect(i, snapshot.get(i)) for i in cover_ids}
+        )
+        statuses: Dict[int, LocalStatus] = {}
+        for cover_id, (status, entry) in results.items():
+            if self.manifest.entries.get(cover_id) is not snapshot.get(cover_id):
+                # 校验期间已被下载，以新记录为准
+                statuses[cover_id] = 'ok'
+                continue
+            self.manifest.apply(cover_id, entry)
+            statuses[cover_id] = status
+        jobs: Dict[int, LocalStatus] = {}
+        for cover_id, status in statuses.items():
+            if status == 'ok' and not full:
+                report.unchanged += 1
+            elif status != 'ok' and self.is_missing(cover_id):
+                report.missing += 1
+            else:
+                jobs[cover_id] = status
+        if jobs and not self.online():
+            log.warning(f'未开启在线素材，跳过 {len(jobs)} 张封面的同步')
+            report.unchanged += sum(1 for s in jobs.values() if s == 'ok')
+            report.failed += sum(1 for s in jobs.values() if s != 'ok')
+            jobs = {}
+
+        done = 0
+        step = max(len(jobs) // 10, 1)
+
+        async def run(cover_id: int, local: LocalStatus) -> None:
+            nonlocal done
+            status = await asyncio.shield(self._start(cover_id, conditional=local == 'ok'))
+            if status == 'not_modified':
+                report.unchanged += 1
+            elif status == 'downloaded':
+                if local == 'absent':
+                    report.downloaded += 1
+                elif local == 'corrupt':
+                    report.repaired += 1
+                else:
+                    report.updated += 1
+            elif status == 'missing':
+                report.missing += 1
+            else:
+                report.failed += 1
+            done += 1
+            if progress is not None:
+                progress(done, len(jobs))
+            elif done % step == 0 or done == len(jobs):
+                log.info(f'曲绘同步进度 {done}/{len(jobs)}')
+
+        await asyncio.gather(*(run(i, s) for i, s in jobs.items()))
+        self._save()
+        if report.downloaded or report.updated or report.repaired:
+            # 已绘制的图片中可能是占位图或旧曲绘
+            render_cache.clear(disk=True)
+            score_tiles.clear(disk=True)
+        report.elapsed = time.perf_counter() - start
+        log.info(report.summary().replace('\n', '，'))
+        return report
+
+    async def sync(
+        self,
+        music_ids: Iterable[Union[int, str]],
+        full: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> CoverSyncReport:
+        """
+        按封面清单同步曲绘
+
+        下载缺失与损坏的封面；`full` 为 True 时再以 ETag / Last-Modified 向 CDN 校验已有封面，
+        只重新下载有变化的。已有同步进行中时等待其结果；进行中的是增量同步而本次要求
+        `full` 时，等其结束后再开始全量校验。
+
+        Params:
+            `music_ids`: 需要的谱面 ID，通常为 `mai.total_list` 全部曲目
+            `full`: 是否校验已有封面的远端更新
+            `progress`: 进度回调 `(已完成, 需下载数)`，默认每 10% 记录一次日志
+        Returns:
+            `CoverSyncReport`
+        """
+        cover_ids = sorted({cover_id_of(i) for i in music_ids})
+        while True:
+            task = self._sync_task
+            if task is None or task.done():
+                self._sync_full = full
+                self._sync_task = asyncio.ensure_future(self._sync(cover_ids, full, progress))
+                return await asyncio.shield(self._sync_task)
+            if self._sync_full or not full:
+                return await asyncio.shield(task)
+            await asyncio.wait({task})
+
+    @property
+    def syncing(self) -> Optional[Literal['full', 'incremental']]:
+        """进行中的同步类型，没有时为 `None`"""
+        if self._sync_task is None or self._sync_task.done():
+            return None
+        return 'full' if self._sync_full else 'incremental'
+
+    def schedule_prefetch(self, music_ids: Iterable[Union[int, str]]) -> Optional[asyncio.Future]:
+        """在后台补全缺失与损坏的封面，已有同步进行中时不重复创建"""
+        if self._sync_task is not None and not self._sync_task.done():
+            return self._sync_task
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        cover_ids = sorted({cover_id_of(i) for i in music_ids})
+        self._sync_full = False
+        self._sync_task = asyncio.ensure_future(self._sync(cover_ids, False, None))
+        return self._sync_task
+
+    def cancel(self) -> List[asyncio.Future]:
+        """
+        取消后台同步与全部在途下载
+
+        Returns:
+            `List[asyncio.Future]` 被取消的任务
+        """
+        tasks = [f for f in [self._sync_task, *self._inflight.values()] if f is not None and not f.done()]
+        for task in tasks:
+            task.cancel()
+        return tasks
+
+    async def close(self) -> None:
+        """取消同步与下载并等待其结束，插件卸载时在关闭共享会话之前调用"""
+        tasks = self.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._save()
+
+
+covers = CoverFetcher()
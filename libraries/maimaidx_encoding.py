@@ -0,0 +1,203 @@
+"""图片输出编码：按图片类型选择 PNG / JPEG / WebP 与压缩参数，并统计编码耗时与体积。"""
+
+import base64
+import threading
+import time
+from io import BytesIO
+from typing import Any, Dict, Literal, Optional
+
+from PIL import Image, features
+from pydantic import BaseModel, ValidationError
+
+from .. import log
+
+ImageFormat = Literal['PNG', 'JPEG', 'WEBP']
+
+KINDS: Dict[str, str] = {
+    'best': 'b50 / 分数列表 / 上分推荐 / 分析',
+    'info': '谱面信息 / 游玩信息',
+    'table': '定数表 / 完成表',
+    'text': '文字图片',
+    'guess': '猜曲绘',
+}
+"""图片类型及对应的指令"""
+DEFAULT_KIND = 'info'
+TEXT_FORMAT: ImageFormat = 'PNG'
+"""文字图片有损压缩后边缘模糊，未单独指定时固定使用 PNG"""
+
+
+class EncodeProfile(BaseModel):
+
+    format: ImageFormat = 'PNG'
+    quality: int = 85
+    """JPEG / WebP 质量，1~100"""
+    compress_level: int = 6
+    """PNG 压缩等级，0~9，越低越快、体积越大"""
+    quantize: int = 0
+    """PNG 调色板颜色数，0 为不量化"""
+    flatten: bool = True
+    """透明通道全部不透明时转为 RGB"""
+
+
+class EncodeStats(BaseModel):
+
+    count: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+    pixels: int = 0
+
+
+def flatten_alpha(img: Image.Image, force: bool = False) -> Image.Image:
+    """
+    去掉未使用的透明通道
+
+    Params:
+        `img`: 图片
+        `force`: 透明通道有实际内容时是否合成到白底（JPEG 需要）
+    Returns:
+        `Image.Image` 无需处理时返回原图
+    """
+    if img.mode in ('RGB', 'L'):
+        return img
+    if img.mode == 'P':
+        img = img.convert('RGBA')
+    if img.mode == 'LA':
+        img = img.convert('RGBA')
+    if img.mode != 'RGBA':
+        return img.convert('RGB')
+    if img.getchannel('A').getextrema() == (255, 255):
+        return img.convert('RGB')
+    if not force:
+        return img
+    background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+    return Image.alpha_composite(background, img).convert('RGB')
+
+
+class ImageEncoder:
+    """
+    图片编码器
+
+    `default` 为各类型共用的编码参数，`profiles` 中为单独指定的类型；
+    编码在绘图线程中执行，统计按类型累计，可通过「渲染状态」查看。
+    """
+
+    def __init__(self) -> None:
+        self.default = EncodeProfile()
+        self.profiles: Dict[str, EncodeProfile] = {}
+        self._stats: Dict[str, EncodeStats] = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        format: str = 'PNG',
+        quality: int = 85,
+        compress_level: int = 6,
+        quantize: int = 0,
+        overrides: str = ''
+    ) -> None:
+        """
+        设置编码参数
+
+        Params:
+            `format`: 默认格式
+            `quality`: JPEG / WebP 质量
+            `compress_level`: PNG 压缩等级
+            `quantize`: PNG 调色板颜色数
+            `overrides`: 按类型指定格式，如 `best=WEBP,table=JPEG`
+        """
+        params = {
+            'quality': min(max(int(quality), 1), 100),
+            'compress_level': min(max(int(compress_level), 0), 9),
+            'quantize': min(max(int(quantize), 0), 256),
+        }
+        self.default = EncodeProfile(format=self._check_format(format), **params)
+        self.profiles = {'text': EncodeProfile(format=TEXT_FORMAT, **params)}
+        for item in str(overrides or '').replace('，', ',').split(','):
+            if not item.strip():
+                continue
+            kind, _, fmt = item.partition('=')
+            kind = kind.strip().lower()
+            if kind not in KINDS or not fmt.strip():
+                log.warning(f'无效的图片格式配置：{item.strip()}，可用类型：{"、".join(KINDS)}')
+                continue
+            self.profiles[kind] = EncodeProfile(format=self._check_format(fmt), **params)
+
+    @staticmethod
+    def _check_format(fmt: str) -> ImageFormat:
+        fmt = str(fmt).strip().upper()
+        if fmt == 'JPG':
+            fmt = 'JPEG'
+        try:
+            fmt = EncodeProfile(format=fmt).format
+        except ValidationError:
+            log.warning(f'不支持的图片格式：{fmt}，使用 PNG')
+            return 'PNG'
+        if fmt == 'WEBP' and not features.check('webp'):
+            log.warning('当前 Pillow 未编译 WebP 支持，使用 PNG')
+            return 'PNG'
+        return fmt
+
+    def profile(self, kind: str = DEFAULT_KIND) -> EncodeProfile:
+        """获取某类图片的编码参数"""
+        return self.profiles.get(kind, self.default)
+
+    def encode(self, img: Image.Image, kind: str = DEFAULT_KIND, profile: Optional[EncodeProfile] = None) -> bytes:
+        """
+        编码图片
+
+        Params:
+            `img`: 图片
+            `kind`: 图片类型，见 `KINDS`
+            `profile`: 指定编码参数，默认按类型选择
+        Returns:
+            `bytes`
+        """
+        profile = profile or self.profile(kind)
+        start = time.perf_counter()
+        if profile.format == 'JPEG':
+            img = flatten_alpha(img, force=True)
+        elif profile.flatten:
+            img = flatten_alpha(img)
+        buffer = BytesIO()
+        if profile.format == 'JPEG':
+            img.save(buffer, 'JPEG', quality=profile.quality, optimize=False)
+        elif profile.format == 'WEBP':
+            img.save(buffer, 'WEBP', quality=profile.quality, method=4)
+        else:
+            if profile.quantize and img.mode in ('RGB', 'RGBA'):
+                img = img.quantize(profile.quantize, method=Image.Quantize.FASTOCTREE)
+            img.save(buffer, 'PNG', compress_level=profile.compress_level)
+        data = buffer.getvalue()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats.setdefault(kind, EncodeStats())
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.bytes += len(data)
+            stats.pixels += img.width * img.height
+        return data
+
+    def to_base64(self, img: Image.Image, kind: str = DEFAULT_KIND) -> str:
+        """编码图片并转为 `base64://` 字符串"""
+        return 'base64://' + base64.b64encode(self.encode(img, kind)).decode()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各类型的编码次数、平均耗时与平均体积"""
+        with self._lock:
+            return {
+                kind: {
+                    'format': self.profile(kind).format,
+                    'count': s.count,
+                    'avg_ms': s.seconds / s.count * 1000 if s.count else 0.0,
+                    'avg_kb': s.bytes / s.count / 1024 if s.count else 0.0,
+                    'bytes_per_pixel': s.bytes / s.pixels if s.pixels else 0.0,
+                }
+                for kind, s in self._stats.items()
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+encoder = ImageEncoder()
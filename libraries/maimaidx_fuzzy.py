@@ -0,0 +1,250 @@
+"""曲名 / 别名 / 曲师的本地模糊搜索：字符 n-gram 倒排索引 + 相似度排序。"""
+
+from __future__ import annotations
+
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+FIELD_WEIGHTS: Dict[str, float] = {
+    'title': 1.0,
+    'alias': 1.0,
+    'artist': 0.8,
+}
+"""各字段命中时的权重，曲师命中的结果排在同分曲名 / 别名之后"""
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    搜索归一化：全角转半角、小写、片假名转平假名，并去掉空白与标点
+
+    Params:
+        `text`: 原始文本
+    Returns:
+        `str` 归一化后的文本
+    """
+    result = []
+    for ch in unicodedata.normalize('NFKC', text).lower():
+        if 'ァ' <= ch <= 'ヶ':
+            ch = chr(ord(ch) - 0x60)
+        if ch.isalnum():
+            result.append(ch)
+    return ''.join(result)
+
+
+def text_grams(text: str) -> Set[str]:
+    """
+    归一化文本的 n-gram 集合
+
+    所有字符取二元组；非 ASCII 字符（汉字、假名等）单字即有辨识度，额外取一元组。
+    """
+    if not text:
+        return set()
+    grams = {text[i:i + 2] for i in range(len(text) - 1)}
+    grams.update(ch for ch in text if not ch.isascii())
+    if len(text) == 1:
+        grams.add(text)
+    return grams
+
+
+def edit_distance(a: str, b: str, limit: Optional[int] = None) -> int:
+    """
+    Levenshtein 编辑距离
+
+    Params:
+        `limit`: 距离确定超过该值时提前返回 `limit + 1`
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def similarity(query: str, text: str, query_grams: Optional[Set[str]] = None) -> float:
+    """
+    归一化文本间的相似度，取值 0~1
+
+    n-gram Jaccard 与编辑距离比例的平均；完全相同为 1，查询是文本子串时不低于子串占比。
+    """
+    if query == text:
+        return 1.0
+    if not query or not text:
+        return 0.0
+    query_grams = text_grams(query) if query_grams is None else query_grams
+    text_gram_set = text_grams(text)
+    union = len(query_grams | text_gram_set)
+    jaccard = len(query_grams & text_gram_set) / union if union else 0.0
+    return _combine(query, text, jaccard)
+
+
+def _combine(query: str, text: str, jaccard: float, floor: float = 0.0) -> float:
+    """
+    由 Jaccard 与编辑距离合成相似度
+
+    Params:
+        `floor`: 低于该值的结果无需精确，编辑距离可提前截断，此时返回 0
+    """
+    longest = max(len(query), len(text))
+    substring = (0.5 + 0.5 * len(query) / len(text)) if query in text else 0.0
+    # 合成分数 (jaccard + 1 - d / longest) / 2 >= floor 时 d 的最大值
+    limit = max(int(longest * (1 + jaccard - 2 * floor) + 1e-9), 0)
+    distance = edit_distance(query, text, limit)
+    if distance > limit:
+        return min(substring, 0.99) if substring >= floor else 0.0
+    return min(max((jaccard + 1 - distance / longest) / 2, substring), 0.99)
+
+
+def _upper_bound(query: str, text: str, gram_counts: Tuple[int, int], shared: int) -> Tuple[float, float]:
+    """
+    不计算编辑距离时 `similarity` 的 (上界, Jaccard)
+
+    每次编辑最多破坏 3 个 n-gram（两个二元组与一个一元组），
+    由未共有的 n-gram 数可得编辑距离下界。
+    """
+    jaccard = shared / (sum(gram_counts) - shared)
+    if query == text:
+        return 1.0, jaccard
+    longest = max(len(query), len(text))
+    min_distance = max(
+        abs(len(query) - len(text)),
+        -(-(max(gram_counts) - shared) // 3)
+    )
+    bound = (jaccard + 1 - min_distance / longest) / 2
+    if len(query) <= len(text):
+        bound = max(bound, 0.5 + 0.5 * len(query) / len(text))
+    return min(bound, 0.99), jaccard
+
+
+@dataclass
+class FuzzyMatch:
+    """模糊搜索结果，每首曲目只保留得分最高的一条"""
+
+    song_id: int
+    text: str
+    """命中的原始文本"""
+    field: str
+    """命中字段：`title` / `alias` / `artist`"""
+    score: float
+
+
+class FuzzySearchIndex:
+    """
+    n-gram 倒排索引
+
+    文档为 (曲目ID, 字段, 文本)。查询时先用倒排表统计共有 n-gram 数并求出 Jaccard，
+    再按相似度上界从高到低计算编辑距离，上界低于当前结果时停止。
+    """
+
+    def __init__(self) -> None:
+        self._documents: List[Optional[Tuple[int, str, str, str, int]]] = []
+        """文档下标 -> (曲目ID, 字段, 原始文本, 归一化文本, n-gram 数)，删除后置为 None"""
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._lookup: Dict[Tuple[int, str, str], int] = {}
+        """(曲目ID, 字段, 归一化文本) -> 文档下标，用于去重与删除"""
+
+    def __len__(self) -> int:
+        return len(self._lookup)
+
+    def add(self, song_id: int, field: str, text: str) -> None:
+        """添加一条文档，重复添加会被忽略"""
+        normalized = normalize_search_text(text)
+        key = (int(song_id), field, normalized)
+        if not normalized or key in self._lookup:
+            return
+        doc_id = len(self._documents)
+        grams = text_grams(normalized)
+        self._documents.append((int(song_id), field, text, normalized, len(grams)))
+        self._lookup[key] = doc_id
+        for gram in grams:
+            self._postings[gram].add(doc_id)
+
+    def remove(self, song_id: int, field: str, text: str) -> None:
+        """删除一条文档"""
+        normalized = normalize_search_text(text)
+        doc_id = self._lookup.pop((int(song_id), field, normalized), None)
+        if doc_id is None:
+            return
+        self._documents[doc_id] = None
+        for gram in text_grams(normalized):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int = 10,
+        min_score: float = 0.5,
+        fields: Optional[Iterable[str]] = None,
+        candidates: int = 200
+    ) -> List[FuzzyMatch]:
+        """
+        模糊搜索
+
+        Params:
+            `query`: 查询文本
+            `limit`: 最多返回的曲目数
+            `min_score`: 相似度下限（已乘字段权重）
+            `fields`: 限定字段，默认全部
+            `candidates`: 按共有 n-gram 数取前若干个文档参与排序
+        Returns:
+            `List[FuzzyMatch]` 按得分降序
+        """
+        normalized = normalize_search_text(query)
+        grams = text_grams(normalized)
+        if not grams:
+            return []
+        fields = set(fields) if fields is not None else None
+
+        # 粗排：按共有 n-gram 数求出 Jaccard，再用相似度上界剪枝
+        overlap: Counter = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings:
+                overlap.update(postings)
+
+        ranked: List[Tuple[float, float, int]] = []
+        for doc_id, shared in overlap.most_common(candidates):
+            song_id, field, text, doc_text, gram_count = self._documents[doc_id]
+            if fields is not None and field not in fields:
+                continue
+            bound, jaccard = _upper_bound(normalized, doc_text, (len(grams), gram_count), shared)
+            ranked.append((bound * FIELD_WEIGHTS.get(field, 1.0), jaccard, doc_id))
+        ranked.sort(reverse=True)
+
+        # 精排：上界已不可能进入结果时提前结束
+        best: Dict[int, FuzzyMatch] = {}
+        for bound, jaccard, doc_id in ranked:
+            floor = min_score
+            if len(best) >= limit:
+                floor = max(floor, sorted(m.score for m in best.values())[-limit])
+            if bound < floor:
+                break
+            song_id, field, text, doc_text, _ = self._documents[doc_id]
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            if normalized == doc_text:
+                score = weight
+            else:
+                score = _combine(normalized, doc_text, jaccard, floor / weight) * weight
+            if score < min_score:
+                continue
+            if song_id not in best or score > best[song_id].score:
+                best[song_id] = FuzzyMatch(song_id, text, field, round(score, 4))
+        return sorted(best.values(), key=lambda m: (-m.score, m.song_id))[:limit]
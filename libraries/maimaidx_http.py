@@ -0,0 +1,118 @@
+"""进程内共享的 aiohttp 会话：复用连接池、keep-alive 与 DNS 缓存；并发的相同请求合并为一次。"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from .. import log
+from .maimaidx_cache import freeze
+
+T = TypeVar('T')
+
+DEFAULT_TIMEOUT = ClientTimeout(total=30)
+"""未单独指定时的请求超时"""
+CONNECTION_LIMIT = 100
+"""连接池总连接数上限"""
+CONNECTION_LIMIT_PER_HOST = 16
+"""单个主机的连接数上限，避免突发请求压垮查分器"""
+DNS_CACHE_TTL = 300
+"""DNS 缓存秒数"""
+KEEPALIVE_TIMEOUT = 60
+"""空闲连接保活秒数"""
+
+
+class SessionManager:
+    """
+    共享会话管理
+
+    首次使用时在当前事件循环中创建会话；会话被关闭或事件循环变化后会重新创建。
+    插件卸载时调用 `close` 释放连接。
+    """
+
+    def __init__(self) -> None:
+        self._session: Optional[ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self) -> ClientSession:
+        """获取共享会话，须在事件循环中调用"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                self._discard(self._session, self._loop)
+            connector = TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = ClientSession(connector=connector, timeout=DEFAULT_TIMEOUT)
+            self._loop = loop
+        return self._session
+
+    @staticmethod
+    def _discard(session: ClientSession, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """事件循环变化时释放旧会话：原事件循环仍在运行则交给它关闭，否则只能丢弃连接池"""
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            log.info('事件循环已变化，旧的共享 HTTP 会话交由原事件循环关闭')
+        else:
+            session.detach()
+            log.warning('事件循环已变化，旧的共享 HTTP 会话所在事件循环已停止，无法关闭，已丢弃其连接池')
+
+    async def close(self) -> None:
+        """关闭共享会话及其连接池"""
+        session, self._session, self._loop = self._session, None, None
+        if session is not None and not session.closed:
+            await session.close()
+            log.info('已关闭共享 HTTP 会话')
+
+
+session_manager = SessionManager()
+
+
+def request_key(method: str, url: str, **kwargs: Any) -> Hashable:
+    """
+    由请求方式、地址与 `headers` / `params` / `json` 等参数生成请求标识
+
+    请求头中的 Token 一并计入，不同身份的请求不会合并。
+    """
+    return method.upper(), url, freeze(kwargs)
+
+
+class SingleFlight:
+    """
+    并发请求合并
+
+    同一标识的请求在途时，后到的调用直接等待在途结果，不再发起新请求；
+    请求结束（成功或失败）后标识即释放。仅用于只读请求。
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+        """被合并的调用次数"""
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行或加入在途请求
+
+        Params:
+            `key`: 请求标识，见 `request_key`
+            `factory`: 实际请求
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+        # 单个调用方被取消时不影响其他等待者
+        return await asyncio.shield(future)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,78 @@
+"""图层缓存：与用户无关的底图绘制一次后保存在内存中，每次绘图从其副本开始，只绘制随用户变化的部分。"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from PIL import Image
+
+
+class LayerCache:
+    """
+    底图缓存
+
+    按调用方给出的键保存绘制好的 RGBA 底图，最多 `maxsize` 张、合计 `maxbytes` 字节
+    （为 0 时不限），LRU 淘汰。返回的底图为共享对象，调用方需 `copy()` 后再绘制。
+    `cache` 为 False 时每次重新绘制（对应配置 `saveinmem` 关闭）。
+    """
+
+    def __init__(self, maxsize: int = 64, maxbytes: int = 0) -> None:
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.cache = True
+        self._layers: 'OrderedDict[Hashable, Image.Image]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._layers)
+
+    @staticmethod
+    def _size(layer: Image.Image) -> int:
+        return layer.width * layer.height * len(layer.getbands())
+
+    def get(self, key: Hashable, factory: Callable[[], Image.Image]) -> Image.Image:
+        """
+        获取底图
+
+        Params:
+            `key`: 键，需包含决定底图内容的全部输入
+            `factory`: 绘制底图
+        Returns:
+            `Image.Image` 共享底图，不可原地修改
+        """
+        if not self.cache:
+            return factory()
+        with self._lock:
+            layer = self._layers.get(key)
+            if layer is not None:
+                self._layers.move_to_end(key)
+                self.hits += 1
+                return layer
+        layer = factory()
+        with self._lock:
+            self.misses += 1
+            old = self._layers.pop(key, None)
+            if old is not None:
+                self.nbytes -= self._size(old)
+            self._layers[key] = layer
+            self.nbytes += self._size(layer)
+            while len(self._layers) > self.maxsize or (
+                self.maxbytes and self.nbytes > self.maxbytes and len(self._layers) > 1
+            ):
+                self.nbytes -= self._size(self._layers.popitem(last=False)[1])
+        return layer
+
+    def clear(self) -> None:
+        """清空缓存，素材更新后调用"""
+        with self._lock:
+            self._layers.clear()
+            self.nbytes = 0
+
+
+music_info_layers = LayerCache(maxsize=64)
+"""谱面信息图底图，键为 (曲目指纹, 主题, 曲绘修改时间, Bot 名称)"""
+backgrounds = LayerCache(maxsize=32, maxbytes=128 * 1024 * 1024)
+"""渐变、装饰与毛玻璃卡片合成好的背景，键以用途开头，含宽高等全部版式参数"""
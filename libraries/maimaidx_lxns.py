@@ -10,12 +10,13 @@
 - OAuth 模式：用户授权后可获取包含精确达成率的全部成绩，功能完整。
 """
 
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
 
-from aiohttp import ClientSession, ClientTimeout
 from pydantic import BaseModel
 
 from .maimaidx_api_data import maiApi
+from .maimaidx_cache import cache_key, response_cache
+from .maimaidx_http import request_key, session_manager, single_flight
 from .maimaidx_merge import LXSongs
 from .maimaidx_model import ChartInfo, PlayInfoDefault, PlayInfoDev, UserInfo
 from .maimaidx_play_result import (
@@ -35,6 +36,8 @@ USER_BASE = f'{LXNS_BASE}/api/v0/user/maimai/player'
 OAUTH_TOKEN_URL = f'{LXNS_BASE}/api/v0/oauth/token'
 AUTHORIZE_URL = f'{LXNS_BASE}/oauth/authorize'
 
+T = TypeVar('T')
+
 # rate -> 代表达成率（各评级下界），用于开发者模式下由简化成绩推导达成率阈值
 RATE_TO_ACHIEVEMENTS = {
     'sssp': 100.5,
@@ -143,7 +146,8 @@ class LxnsAPI:
     async def _request(
         self, method: str, url: str, *, headers: dict, **kwargs
     ) -> dict:
-        async with ClientSession(timeout=ClientTimeout(total=30)) as session:
+        async def request() -> dict:
+            session = session_manager.get()
             async with session.request(method, url, headers=headers, **kwargs) as res:
                 try:
                     data = await res.json()
@@ -161,6 +165,26 @@ class LxnsAPI:
                     raise LxnsError('落雪：请求过于频繁，请稍后再试')
                 raise LxnsError(f'落雪请求错误：HTTP {res.status}')
 
+        # OAuth 换取令牌等 POST 请求不合并
+        if method != 'GET':
+            return await request()
+        key = request_key(method, url, headers=headers, **kwargs)
+        return await single_flight.run(key, request)
+
+    async def _cached(
+        self,
+        url: str,
+        request: Callable[[], Awaitable[T]],
+        *,
+        user: Optional[int] = None,
+        params: Optional[Any] = None,
+    ) -> T:
+        """成绩类接口经 `response_cache` 缓存，按 QQ 号（缺省为好友码）区分用户；两者皆无时不缓存"""
+        if not (self.qqid or user):
+            return await request()
+        key = cache_key('lxns', self.qqid or user, url, params)
+        return await response_cache.fetch(key, request)
+
     # ---- OAuth ----
     async def oauth_fetch_token(self, code: str) -> LxnsToken:
         json = {
@@ -185,64 +209,92 @@ class LxnsAPI:
 
     # ---- 玩家信息 ----
     async def player_by_qq(self, qq: int) -> LxnsPlayer:
-        data = await self._request(
-            'GET', f'{DEV_BASE}/player/qq/{qq}', headers=self._dev_headers()
-        )
-        return LxnsPlayer.model_validate(data['data'])
+        url = f'{DEV_BASE}/player/qq/{qq}'
+
+        async def request() -> LxnsPlayer:
+            data = await self._request('GET', url, headers=self._dev_headers())
+            return LxnsPlayer.model_validate(data['data'])
+
+        return await self._cached(url, request, user=qq)
 
     async def player_personal(self) -> LxnsPlayer:
-        data = await self._request('GET', USER_BASE, headers=self._user_headers())
-        return LxnsPlayer.model_validate(data['data'])
+        headers = self._user_headers()
+
+        async def request() -> LxnsPlayer:
+            data = await self._request('GET', USER_BASE, headers=headers)
+            return LxnsPlayer.model_validate(data['data'])
+
+        return await self._cached(USER_BASE, request)
 
     # ---- Best50 / AP50 ----
     async def bests_by_friend_code(self, friend_code: int, ap: bool = False) -> LxnsBest50:
         endpoint = f'{DEV_BASE}/player/{friend_code}/bests'
         if ap:
             endpoint += '/ap'
-        data = await self._request('GET', endpoint, headers=self._dev_headers())
-        return LxnsBest50.model_validate(data['data'])
+
+        async def request() -> LxnsBest50:
+            data = await self._request('GET', endpoint, headers=self._dev_headers())
+            return LxnsBest50.model_validate(data['data'])
+
+        return await self._cached(endpoint, request, user=friend_code)
 
     async def bests_personal(self) -> LxnsBest50:
-        data = await self._request(
-            'GET', f'{USER_BASE}/bests', headers=self._user_headers()
-        )
-        return LxnsBest50.model_validate(data['data'])
+        headers = self._user_headers()
+
+        async def request() -> LxnsBest50:
+            data = await self._request('GET', f'{USER_BASE}/bests', headers=headers)
+            return LxnsBest50.model_validate(data['data'])
+
+        return await self._cached(f'{USER_BASE}/bests', request)
 
     # ---- 单曲成绩 ----
     async def song_bests_by_friend_code(
         self, friend_code: int, song_id: int, song_type: str
     ) -> List[LxnsScore]:
         params = {'song_id': song_id, 'song_type': song_type}
-        data = await self._request(
-            'GET',
-            f'{DEV_BASE}/player/{friend_code}/bests',
-            headers=self._dev_headers(),
-            params=params,
-        )
-        return [LxnsScore.model_validate(s) for s in data.get('data', [])]
+        endpoint = f'{DEV_BASE}/player/{friend_code}/bests'
+
+        async def request() -> List[LxnsScore]:
+            data = await self._request(
+                'GET', endpoint, headers=self._dev_headers(), params=params
+            )
+            return [LxnsScore.model_validate(s) for s in data.get('data', [])]
+
+        return await self._cached(endpoint, request, user=friend_code, params=params)
 
     async def song_bests_personal(
         self, song_id: int, song_type: str
     ) -> List[LxnsScore]:
         params = {'song_id': song_id, 'song_type': song_type}
-        data = await self._request(
-            'GET', f'{USER_BASE}/bests', headers=self._user_headers(), params=params
-        )
-        return [LxnsScore.model_validate(s) for s in data.get('data', [])]
+        headers = self._user_headers()
+
+        async def request() -> List[LxnsScore]:
+            data = await self._request(
+                'GET', f'{USER_BASE}/bests', headers=headers, params=params
+            )
+            return [LxnsScore.model_validate(s) for s in data.get('data', [])]
+
+        return await self._cached(f'{USER_BASE}/bests', request, params=params)
 
     # ---- 全部成绩（含精确达成率，仅个人 OAuth 可用）----
     async def all_scores_personal(self) -> List[LxnsScore]:
-        data = await self._request(
-            'GET', f'{USER_BASE}/scores', headers=self._user_headers()
-        )
-        return [LxnsScore.model_validate(s) for s in data.get('data', [])]
+        headers = self._user_headers()
+
+        async def request() -> List[LxnsScore]:
+            data = await self._request('GET', f'{USER_BASE}/scores', headers=headers)
+            return [LxnsScore.model_validate(s) for s in data.get('data', [])]
+
+        return await self._cached(f'{USER_BASE}/scores', request)
 
     # ---- 全部成绩（简化，无达成率，开发者模式）----
     async def simple_scores_by_friend_code(self, friend_code: int) -> List[LxnsScore]:
-        data = await self._request(
-            'GET', f'{DEV_BASE}/player/{friend_code}/scores', headers=self._dev_headers()
-        )
-        return [LxnsScore.model_validate(s) for s in data.get('data', [])]
+        endpoint = f'{DEV_BASE}/player/{friend_code}/scores'
+
+        async def request() -> List[LxnsScore]:
+            data = await self._request('GET', endpoint, headers=self._dev_headers())
+            return [LxnsScore.model_validate(s) for s in data.get('data', [])]
+
+        return await self._cached(endpoint, request, user=friend_code)
 
     # ---- 曲库（开发者 Token）----
     async def music_data(self) -> LXSongs:
@@ -286,19 +338,24 @@ def lxns_score_to_playinfodefault(score: LxnsScore) -> PlayInfoDefault:
     return played_to_playinfodefault(lxns_score_to_played(score))
 
 
+def lxns_player_to_player(player: LxnsPlayer) -> Player:
+    """落雪玩家信息 → 统一 Player。"""
+    return Player(
+        name=player.name,
+        rating=player.rating,
+        course_rank=player.course_rank,
+        friend_code=player.friend_code,
+        class_rank=player.class_rank,
+        star=player.star,
+    )
+
+
 def lxns_best50_to_best50(player: LxnsPlayer, best50: LxnsBest50) -> tuple[Player, Best50]:
     """落雪 b50 → 统一 Player + Best50。"""
     sd = [lxns_score_to_played(s) for s in best50.standard]
     dx = [lxns_score_to_played(s) for s in best50.dx]
     return (
-        Player(
-            name=player.name,
-            rating=player.rating,
-            course_rank=player.course_rank,
-            friend_code=player.friend_code,
-            class_rank=player.class_rank,
-            star=player.star,
-        ),
+        lxns_player_to_player(player),
         Best50(
             sd_total=best50.standard_total or sum(p.rating for p in sd),
             dx_total=best50.dx_total or sum(p.rating for p in dx),
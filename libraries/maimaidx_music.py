@@ -2,19 +2,25 @@ import asyncio
 import json
 import random
 import traceback
+import unicodedata
+from bisect import bisect_left, bisect_right
 from collections import Counter, defaultdict
-from copy import deepcopy
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import numpy as np
 from PIL import Image
 
 from .. import *
-from .image import image_to_base64, music_picture
+from .image import music_picture
 from .maimaidx_api_data import maiApi
+from .maimaidx_chart_table import ChartTable
+from .maimaidx_covers import covers
+from .maimaidx_encoding import encoder
 from .maimaidx_error import *
+from .maimaidx_fuzzy import FuzzySearchIndex
 from .maimaidx_merge import LXSongs, merge_alias_data, merge_music_data, song_to_music
 from .maimaidx_model import *
+from .maimaidx_render_cache import fingerprint, render_cache
 from .tool import openfile, writefile
 
 
@@ -68,19 +74,210 @@ def in_or_equal(
         return checker == elem
 
 
-class MusicList(List[Music]):
+def _match_keys(keys: List[Any], bucket: Dict[Any, Any], elem: Any) -> List[Any]:
+    """
+    按 `cross` / `in_or_equal` 的语义，找出桶中与条件匹配的取值
     
+    Params:
+        `keys`: 桶中所有取值（已排序）
+        `bucket`: 取值 -> 曲目位置
+        `elem`: 筛选条件，列表为任一匹配，元组为闭区间，其余为相等
+    Returns:
+        `List[Any]` 匹配的取值
+    """
+    if isinstance(elem, List):
+        return [key for key in dict.fromkeys(elem) if key in bucket]
+    elif isinstance(elem, Tuple):
+        return keys[bisect_left(keys, elem[0]):bisect_right(keys, elem[1])]
+    else:
+        return [elem] if elem in bucket else []
+
+
+class _MusicFieldIndex:
+    """`MusicList.filter` 使用的字段索引，位置均为曲目在列表中的下标"""
+
+    def __init__(self, musics: List[Music]) -> None:
+        self.level: Dict[str, Dict[int, Set[int]]] = defaultdict(lambda: defaultdict(set))
+        """等级 -> 曲目位置 -> 难度下标"""
+        self.ds: Dict[float, Dict[int, Set[int]]] = defaultdict(lambda: defaultdict(set))
+        """定数 -> 曲目位置 -> 难度下标"""
+        self.genre: Dict[str, Set[int]] = defaultdict(set)
+        self.type: Dict[str, Set[int]] = defaultdict(set)
+        self.bpm: Dict[int, Set[int]] = defaultdict(set)
+        self.version: Dict[str, Set[int]] = defaultdict(set)
+        self.title: List[str] = []
+        """小写标题"""
+        self.artist: List[str] = []
+        """小写曲师"""
+        self.charter: List[List[str]] = []
+        """小写谱师"""
+        for position, music in enumerate(musics):
+            for index, level in enumerate(music.level):
+                self.level[level][position].add(index)
+            for index, ds in enumerate(music.ds):
+                self.ds[ds][position].add(index)
+            self.genre[music.basic_info.genre].add(position)
+            self.type[music.type].add(position)
+            self.bpm[music.basic_info.bpm].add(position)
+            self.version[music.basic_info.version].add(position)
+            self.title.append(music.title.lower())
+            self.artist.append(music.basic_info.artist.lower())
+            self.charter.append([(chart.charter or '').lower() for chart in music.charts])
+        self.keys: Dict[str, List[Any]] = {
+            name: sorted(getattr(self, name))
+            for name in ('level', 'ds', 'genre', 'type', 'bpm', 'version')
+        }
+
+    def songs(self, name: str, elem: Any) -> Set[int]:
+        """满足曲目级条件的曲目位置"""
+        bucket: Dict[Any, Set[int]] = getattr(self, name)
+        result: Set[int] = set()
+        for key in _match_keys(self.keys[name], bucket, elem):
+            result |= bucket[key]
+        return result
+
+    def charts(self, name: str, elem: Any) -> Dict[int, Set[int]]:
+        """满足谱面级条件的曲目位置及其难度下标"""
+        bucket: Dict[Any, Dict[int, Set[int]]] = getattr(self, name)
+        result: Dict[int, Set[int]] = defaultdict(set)
+        for key in _match_keys(self.keys[name], bucket, elem):
+            for position, indexes in bucket[key].items():
+                result[position] |= indexes
+        return result
+
+    def charters(self, search: str, positions: Iterable[int]) -> Dict[int, Set[int]]:
+        """谱师包含 `search` 的曲目位置及其难度下标"""
+        search = search.lower()
+        result: Dict[int, Set[int]] = {}
+        for position in positions:
+            indexes = {
+                index for index, charter in enumerate(self.charter[position])
+                if search in charter
+            }
+            if indexes:
+                result[position] = indexes
+        return result
+
+
+class _IndexedList(list):
+    """增删改时调用 `_invalidate_index` 的列表，子类据此让自身索引失效"""
+
+    def _invalidate_index(self) -> None:
+        """列表内容变化后调用，默认不做任何事，带索引的子类重写此方法清除索引"""
+
+    def append(self, item) -> None:
+        super().append(item)
+        self._invalidate_index()
+
+    def extend(self, items) -> None:
+        super().extend(items)
+        self._invalidate_index()
+
+    def insert(self, index, item) -> None:
+        super().insert(index, item)
+        self._invalidate_index()
+
+    def remove(self, item) -> None:
+        super().remove(item)
+        self._invalidate_index()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._invalidate_index()
+        return item
+
+    def clear(self) -> None:
+        super().clear()
+        self._invalidate_index()
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._invalidate_index()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._invalidate_index()
+
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self._invalidate_index()
+
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._invalidate_index()
+
+    def __iadd__(self, items):
+        super().__iadd__(items)
+        self._invalidate_index()
+        return self
+
+
+class MusicList(_IndexedList, List[Music]):
+    """
+    曲目列表
+
+    `by_id` / `by_title` / `by_id_list` 走哈希索引，索引在首次查询时构建，
+    列表被增删改后自动失效并在下次查询时重建。
+    """
+
+    _id_index: Optional[Dict[str, Music]] = None
+    """`str(id)` -> 曲目"""
+    _title_index: Dict[str, Music]
+    """标题 -> 曲目（同名取列表中第一首，与线性查找一致）"""
+    _position_index: Dict[int, int]
+    """`int(id)` -> 在列表中的下标，用于按原顺序返回 `by_id_list` 结果"""
+    _field_index: _MusicFieldIndex
+    """`filter` 使用的字段索引"""
+    _chart_table: Optional[ChartTable] = None
+    _level_value_map: Optional[Dict[str, float]] = None
+
+    @property
+    def chart_table(self) -> ChartTable:
+        """谱面列式表，首次访问时构建，与索引一同失效"""
+        if self._chart_table is None:
+            self._chart_table = ChartTable(self, self._level_value_map)
+        return self._chart_table
+
+    def rebuild_index(self, level_value_map: Optional[Dict[str, float]] = None) -> None:
+        """
+        重建索引，数据整体替换前调用可避免首次查询时再构建
+        
+        Params:
+            `level_value_map`: 定数字典，传入后用于谱面列式表的 `level_value` 列
+        """
+        if level_value_map is not None:
+            self._level_value_map = level_value_map
+        self._chart_table = None
+        id_index: Dict[str, Music] = {}
+        title_index: Dict[str, Music] = {}
+        position_index: Dict[int, int] = {}
+        for position, music in enumerate(self):
+            id_index.setdefault(music.id, music)
+            title_index.setdefault(music.title, music)
+            try:
+                position_index.setdefault(int(music.id), position)
+            except ValueError:
+                continue
+        self._title_index = title_index
+        self._position_index = position_index
+        self._field_index = _MusicFieldIndex(self)
+        self._id_index = id_index
+
+    def _ensure_index(self) -> None:
+        if self._id_index is None:
+            self.rebuild_index()
+
+    def _invalidate_index(self) -> None:
+        self._id_index = None
+        self._chart_table = None
+
     def by_id(self, music_id: Union[str, int]) -> Optional[Music]:
-        for music in self:
-            if music.id == str(music_id):
-                return music
-        return None
+        self._ensure_index()
+        return self._id_index.get(str(music_id))
 
     def by_title(self, music_title: str) -> Optional[Music]:
-        for music in self:
-            if music.title == music_title:
-                return music
-        return None
+        self._ensure_index()
+        return self._title_index.get(music_title)
     
     def by_plan(
         self, 
@@ -97,19 +294,13 @@ class MusicList(List[Music]):
                 type=music.type
             )
         
-        for music in self:
-            if level not in music.level:
-                continue
-            if int(music.id) >= 100000:
-                continue
+        table = self.chart_table
+        for row in table.rows(table.mask(level=level, max_song_id=100000)):
+            music = self[table.position[row]]
+            index = int(table.level_index[row])
             if music.level.count(level) > 1: # 同曲有相同等级
-                lv[music.id] = { 
-                    index: create_ra_music(music, index)
-                    for index, _lv in enumerate(music.level) 
-                    if _lv == level 
-                }
+                lv[music.id][index] = create_ra_music(music, index)
             else:
-                index = music.level.index(level)
                 lv[music.id] = create_ra_music(music, index)
         return dict(lv)
     
@@ -125,28 +316,29 @@ class MusicList(List[Music]):
         _level = {
             lv: {f"{lv.rstrip('+')}.{i}": [] for i in level_range(lv)} for lv in levelList
         }
-        for music in self:
-            if int(music.id) >= 100000:
-                continue
-            for index, ds in enumerate(music.ds):
-                if ds < 7:
-                    continue
-                ra = RaMusic(
-                    id=music.id,
-                    ds=ds,
-                    lv=str(index),
-                    lvp=music.level[index],
-                    type=music.type
-                )
-                _level[music.level[index]][str(ds)].append(ra)
+        table = self.chart_table
+        for row in table.rows((table.ds >= 7) & (table.song_id < 100000)):
+            music = self[table.position[row]]
+            index = int(table.level_index[row])
+            ds = music.ds[index]
+            ra = RaMusic(
+                id=music.id,
+                ds=ds,
+                lv=str(index),
+                lvp=music.level[index],
+                type=music.type
+            )
+            _level[music.level[index]][str(ds)].append(ra)
         return _level
     
     def by_id_list(self, music_id_list: List[int]) -> Optional[List[Music]]:
-        musicList = []
-        for music in self:
-            if int(music.id) in music_id_list:
-                musicList.append(music)
-        return musicList
+        self._ensure_index()
+        positions = {
+            self._position_index[music_id]
+            for music_id in music_id_list
+            if music_id in self._position_index
+        }
+        return [self[position] for position in sorted(positions)]
     
     def random(self) -> Music:
         return random.choice(self)
@@ -165,33 +357,63 @@ class MusicList(List[Music]):
         diff: List[int] = ...,
         version: Union[str, List[str]] = ...
     ) -> 'MusicList':
-        new_list = MusicList()
-        for music in self:
-            diff2 = diff
-            music = deepcopy(music)
-            ret, diff2 = cross(music.level, level, diff2)
-            if not ret:
-                continue
-            ret, diff2 = cross(music.ds, ds, diff2)
-            if not ret:
-                continue
-            ret, diff2 = search_charts(music.charts, charter_search, diff2)
-            if not ret:
-                continue
-            if not in_or_equal(music.basic_info.genre, genre):
-                continue
-            if not in_or_equal(music.type, type):
-                continue
-            if not in_or_equal(music.basic_info.bpm, bpm):
-                continue
-            if not in_or_equal(music.basic_info.version, version):
-                continue
-            if title_search is not Ellipsis and title_search.lower() not in music.title.lower():
+        """
+        按条件筛选曲目
+
+        先用字段索引求出候选曲目与难度下标的交集，再对标题 / 曲师做子串匹配。
+        结果为原曲目的浅拷贝，仅 `diff` 替换为匹配的难度下标，谱面等子模型与曲库共享，请勿修改。
+        """
+        self._ensure_index()
+        index = self._field_index
+        
+        candidates: Optional[Set[int]] = None
+        for name, elem in (('genre', genre), ('type', type), ('bpm', bpm), ('version', version)):
+            if elem is Ellipsis:
                 continue
-            if artist_search is not Ellipsis and artist_search.lower() not in music.basic_info.artist.lower():
+            matched = index.songs(name, elem)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return MusicList()
+        
+        # 谱面级条件：与 `cross` 一致，空值视为不筛选
+        chart_filters: List[Dict[int, Set[int]]] = []
+        for name, elem in (('level', level), ('ds', ds)):
+            if not elem or elem is Ellipsis:
                 continue
-            music.diff = diff2
-            new_list.append(music)
+            matched = index.charts(name, elem)
+            if candidates is not None:
+                matched = {p: i for p, i in matched.items() if p in candidates}
+            chart_filters.append(matched)
+            candidates = set(matched)
+            if not candidates:
+                return MusicList()
+        if charter_search and charter_search is not Ellipsis:
+            matched = index.charters(
+                charter_search, range(len(self)) if candidates is None else candidates
+            )
+            chart_filters.append(matched)
+            candidates = set(matched)
+        
+        positions: Iterable[int] = range(len(self)) if candidates is None else sorted(candidates)
+        if title_search is not Ellipsis:
+            title_search = title_search.lower()
+            positions = [p for p in positions if title_search in index.title[p]]
+        if artist_search is not Ellipsis:
+            artist_search = artist_search.lower()
+            positions = [p for p in positions if artist_search in index.artist[p]]
+        
+        new_list = MusicList()
+        for position in positions:
+            music = self[position]
+            diff2 = diff
+            if chart_filters:
+                diff2 = [
+                    _j for _j in (range(len(music.charts)) if diff is Ellipsis else diff)
+                    if all(_j in matched[position] for matched in chart_filters)
+                ]
+                if not diff2:
+                    continue
+            new_list.append(music.model_copy(update={'diff': diff2}))
         return new_list
 
 
@@ -207,21 +429,99 @@ def search_charts(checker: List[Chart], elem: str, diff: List[int]) -> Tuple[boo
     return ret, diff_ret
 
 
-class AliasList(List[Alias]):
+def normalize_alias(alias_name: str) -> str:
+    """别名索引键：全角转半角（NFKC）、去除首尾空白并转小写"""
+    return unicodedata.normalize('NFKC', alias_name).strip().lower()
 
-    def by_id(self, music_id: Union[str, int]) -> Optional[List[Alias]]:
-        alias_music = []
+
+class AliasList(_IndexedList, List[Alias]):
+    """
+    别名列表
+
+    `by_alias` / `by_id` 走倒排索引，别名按 `normalize_alias` 归一化后作为键，
+    因此查询不区分大小写与全半角。单条别名的增删请使用 `add_alias` / `remove_alias`，
+    可以原地更新索引而无需重建。
+    """
+
+    _alias_index: Optional[Dict[str, List[Alias]]] = None
+    """归一化别名 -> 别名条目"""
+    _id_index: Dict[int, List[Alias]]
+    """SongID -> 别名条目"""
+
+    def rebuild_index(self) -> None:
+        alias_index: Dict[str, List[Alias]] = defaultdict(list)
+        id_index: Dict[int, List[Alias]] = defaultdict(list)
         for music in self:
-            if music.SongID == int(music_id):
-                alias_music.append(music)
-        return alias_music
+            id_index[music.SongID].append(music)
+            for key in dict.fromkeys(normalize_alias(_a) for _a in music.Alias):
+                alias_index[key].append(music)
+        self._id_index = dict(id_index)
+        self._alias_index = dict(alias_index)
+
+    def _ensure_index(self) -> None:
+        if self._alias_index is None:
+            self.rebuild_index()
+
+    def _invalidate_index(self) -> None:
+        self._alias_index = None
+
+    def by_id(self, music_id: Union[str, int]) -> Optional[List[Alias]]:
+        self._ensure_index()
+        return list(self._id_index.get(int(music_id), []))
     
     def by_alias(self, music_alias: str) -> Optional[List[Alias]]:
-        alias_list = []
-        for music in self:
-            if music_alias in music.Alias:
-                alias_list.append(music)
-        return alias_list
+        self._ensure_index()
+        return list(self._alias_index.get(normalize_alias(music_alias), []))
+
+    def add_alias(self, music_id: Union[str, int], alias_name: str, name: Optional[str] = None) -> bool:
+        """
+        为曲目添加一条别名并更新索引
+        
+        Params:
+            `music_id`: 曲目ID
+            `alias_name`: 别名，按小写保存
+            `name`: 曲名，曲目尚无别名条目时用于新建条目
+        Returns:
+            `bool` 曲目无别名条目且未提供 `name` 时返回 `False`
+        """
+        self._ensure_index()
+        alias_name = alias_name.lower()
+        items = self._id_index.get(int(music_id))
+        if not items:
+            if name is None:
+                return False
+            self.append(Alias(SongID=int(music_id), Name=name, Alias=[alias_name]))
+            return True
+        item = items[0]
+        if alias_name not in item.Alias:
+            item.Alias.append(alias_name)
+        bucket = self._alias_index.setdefault(normalize_alias(alias_name), [])
+        if not any(_a is item for _a in bucket):
+            bucket.append(item)
+        return True
+
+    def remove_alias(self, music_id: Union[str, int], alias_name: str) -> bool:
+        """
+        从曲目移除一条别名并更新索引
+        
+        Returns:
+            `bool` 曲目不存在该别名时返回 `False`
+        """
+        self._ensure_index()
+        alias_name = alias_name.lower()
+        items = self._id_index.get(int(music_id))
+        if not items or alias_name not in items[0].Alias:
+            return False
+        item = items[0]
+        item.Alias.remove(alias_name)
+        key = normalize_alias(alias_name)
+        if all(normalize_alias(_a) != key for _a in item.Alias):
+            bucket = [_a for _a in self._alias_index.get(key, []) if _a is not item]
+            if bucket:
+                self._alias_index[key] = bucket
+            else:
+                self._alias_index.pop(key, None)
+        return True
 
 
 dataerror = dedent(f'''
@@ -321,9 +621,9 @@ async def get_music_list() -> Tuple[MusicList, Dict[str, float]]:
         stats_map=stats_map,
     )
     total_list = MusicList()
-    for song in songs:
-        total_list.append(song_to_music(song))
-    log.info(f'曲库合并完成：{len(total_list)} 首')
+    total_list.extend(song_to_music(song) for song in songs)
+    total_list.rebuild_index(level_value_map)
+    log.info(f'曲库合并完成：{len(total_list)} 首，{len(total_list.chart_table)} 张谱面')
     return total_list, level_value_map
 
 
@@ -391,6 +691,7 @@ async def get_music_alias_list() -> AliasList:
                 _a['Name'] = music.title
         total_alias_list.append(Alias.model_validate(_a))
 
+    total_alias_list.rebuild_index()
     log.info(f'别名合并完成：{len(total_alias_list)} 首')
     return total_alias_list
 
@@ -405,7 +706,10 @@ async def update_local_alias(id: str, alias_name: str) -> bool:
             local_alias_data[id] = []
         
         local_alias_data[id].append(alias_name.lower())
-        mai.total_alias_list.by_id(id)[0].Alias.append(alias_name.lower())
+        music = mai.total_list.by_id(id)
+        if not mai.total_alias_list.add_alias(id, alias_name, music.title if music else None):
+            return False
+        mai.fuzzy_index.add(int(id), 'alias', alias_name)
         await writefile(local_alias_file, local_alias_data)
         return True
     except Exception as e:
@@ -432,9 +736,8 @@ async def delete_local_alias(id: str, alias_name: str) -> bool:
         if len(local_alias_data[id]) == 0:
             del local_alias_data[id]
 
-        alias_item = mai.total_alias_list.by_id(id)[0]
-        if target in alias_item.Alias:
-            alias_item.Alias.remove(target)
+        mai.total_alias_list.remove_alias(id, target)
+        mai.fuzzy_index.remove(int(id), 'alias', target)
 
         await writefile(local_alias_file, local_alias_data)
         return True
@@ -459,19 +762,44 @@ class MaiMusic:
     """游玩次数超过1w次的曲目数据"""
     guess_data: List[Music]
     """猜歌数据"""
+    fuzzy_index: FuzzySearchIndex
+    """曲名 / 别名 / 曲师模糊搜索索引"""
 
     def __init__(self) -> None:
         """封装所有曲目信息以及猜歌数据，便于更新"""
         self.total_level_value_map = {}
+        self.fuzzy_index = FuzzySearchIndex()
 
     async def get_music(self) -> None:
         """获取所有曲目数据（水鱼 + 落雪合并）"""
-        self.total_list, self.total_level_value_map = await get_music_list()
-        self.total_level_data = self.total_list.by_level_list()
+        total_list, level_value_map = await get_music_list()
+        level_data = total_list.by_level_list()
+        # 索引已在 get_music_list 中构建，这里一次性替换，查询方不会看到半新半旧的数据
+        self.total_list, self.total_level_value_map, self.total_level_data = (
+            total_list, level_value_map, level_data
+        )
+        self.build_fuzzy_index()
+        # 定数、曲目变化后旧的绘图缓存不再命中
+        render_cache.set_catalog(fingerprint(total_list))
+        # 后台补全缺失的曲绘，绘图时不再逐张在线下载
+        covers.schedule_prefetch(music.id for music in total_list)
 
     async def get_music_alias(self) -> None:
-        """获取所有曲目别名"""
+        """获取所有曲目别名，并重建模糊搜索索引"""
         self.total_alias_list = await get_music_alias_list()
+        self.build_fuzzy_index()
+
+    def build_fuzzy_index(self) -> None:
+        """用当前曲库与别名库构建模糊搜索索引"""
+        index = FuzzySearchIndex()
+        for music in self.total_list:
+            index.add(int(music.id), 'title', music.title)
+            index.add(int(music.id), 'artist', music.basic_info.artist)
+        for alias in getattr(self, 'total_alias_list', []):
+            for name in alias.Alias:
+                index.add(alias.SongID, 'alias', name)
+        self.fuzzy_index = index
+        log.info(f'模糊搜索索引构建完成：{len(index)} 条')
         
     async def get_plate_json(self) -> None:
         """获取所有牌子数据"""
@@ -516,13 +844,23 @@ class Guess:
             except (ValueError, TypeError):
                 self.switch.disable = []
     
-    def start(self, group_id: str):
+    def choose(self) -> Music:
+        """随机抽取一首猜歌曲目"""
+        if not mai.guess_data:
+            raise ValueError("猜歌数据未初始化，请先调用 mai.guess() 初始化数据")
+        return random.choice(mai.guess_data)
+
+    async def start(self, group_id: str):
         """开始猜歌"""
-        self.Group[group_id] = self.guessData()
+        music = self.choose()
+        await covers.ensure([music.id])
+        self.Group[group_id] = self.guessData(music)
 
-    def startpic(self, group_id: str):
+    async def startpic(self, group_id: str):
         """开始猜曲绘"""
-        self.Group[group_id] = self.guesspicdata()
+        music = self.choose()
+        await covers.ensure([music.id])
+        self.Group[group_id] = self.guesspicdata(music)
         
     def calculate_frequency_weights(self, image: Image.Image) -> np.ndarray:
         """
@@ -572,11 +910,9 @@ class Guess:
         im = im.crop((x, y, x + w2, y + h2))
         return im
 
-    def guesspicdata(self) -> GuessPicData:
-        """猜曲绘数据"""
-        if not mai.guess_data:
-            raise ValueError("猜歌数据未初始化，请先调用 mai.guess() 初始化数据")
-        music = random.choice(mai.guess_data)
+    def guesspicdata(self, music: Optional[Music] = None) -> GuessPicData:
+        """猜曲绘数据，`music` 为空时随机抽取"""
+        music = music or self.choose()
         pic = self.pic(music)
         alias_list = mai.total_alias_list.by_id(music.id)
         if not alias_list or len(alias_list) == 0:
@@ -585,13 +921,11 @@ class Guess:
         else:
             answer = alias_list[0].Alias.copy() if hasattr(alias_list[0], 'Alias') else [str(music.id), music.title]
             answer.append(str(music.id))
-        return GuessPicData(music=music, img=image_to_base64(pic), answer=answer, end=False)
+        return GuessPicData(music=music, img=encoder.to_base64(pic, 'guess'), answer=answer, end=False)
 
-    def guessData(self) -> GuessDefaultData:
-        """猜歌数据"""
-        if not mai.guess_data:
-            raise ValueError("猜歌数据未初始化，请先调用 mai.guess() 初始化数据")
-        music = random.choice(mai.guess_data)
+    def guessData(self, music: Optional[Music] = None) -> GuessDefaultData:
+        """猜歌数据，`music` 为空时随机抽取"""
+        music = music or self.choose()
         guess_options = random.sample([
             f'的 Expert 难度是 {music.level[2]}',
             f'的 Master 难度是 {music.level[3]}',
@@ -612,7 +946,7 @@ class Guess:
         pic = self.pic(music)
         return GuessDefaultData(
             music=music, 
-            img=image_to_base64(pic), 
+            img=encoder.to_base64(pic, 'guess'), 
             answer=answer, 
             end=False, 
             options=guess_options
@@ -1,10 +1,15 @@
 import copy
 
 from .. import MessageSegment, get_botname
-from .image import draw_text_with_font_fallback
+from .image import draw_text_with_font_fallback, music_picture
 from .maimai_best_50 import *
+from .maimaidx_covers import covers
+from .maimaidx_layers import music_info_layers
 from .maimaidx_lxns import LxnsError
 from .maimaidx_music import Music, mai
+from .maimaidx_render import render_pool
+from .maimaidx_render_cache import fingerprint, render_cache
+from .maimaidx_thumbnails import thumbnails
 
 
 def newbestscore(song_id: str, lv: int, value: int, bestlist: List[ChartInfo]) -> int:
@@ -70,6 +75,53 @@ async def draw_music_info(
     if music.basic_info.genre == '宴会場':
         return await draw_music_banquet_info(music)
 
+    async def render() -> str:
+        return await render_pool.encode(_render_music_info, music, theme, bestlist, calc, isfull, kind='info')
+
+    # 曲绘文件计入指纹，下载失败时的占位图不会一直命中
+    await covers.ensure([music.id])
+    key = render_cache.key('music_info', 'info', music, theme, bestlist, calc, isfull, music_picture(music.id))
+    return MessageSegment.image(await render_cache.fetch(key, render))
+
+
+def _render_music_info(
+    music: Music,
+    theme: Theme,
+    bestlist: List[ChartInfo],
+    calc: bool,
+    isfull: bool
+) -> Image.Image:
+    """绘制谱面信息图，`calc` 为 False 时不计算可提升的 Rating"""
+    # 除 Rating 一栏外与用户无关，底图按曲目、主题缓存
+    key = (fingerprint(music), theme, music_picture(music.id).stat().st_mtime_ns, get_botname())
+    im = music_info_layers.get(key, lambda: _render_music_info_base(music, theme)).copy()
+    fn = DrawText(ImageDraw.Draw(im), FOTNEWRODIN)
+    default_color = theme.color
+
+    for num in range(2, len(music.charts)):
+        ra = get_best_rating(music.ds[num])
+        for _n, value in enumerate(ra):
+            size = 22
+            if not calc:
+                rating = value
+            elif not isfull:
+                size = 17
+                rating = f'{value}(+{value})'
+            elif value > bestlist[-1].ra:
+                new = newbestscore(music.id, num, value, bestlist)
+                if new == 0:
+                    rating = value
+                else:
+                    size = 17
+                    rating = f'{value}(+{new})'
+            else:
+                rating = value
+            fn.draw(295 + 125 * _n, 1017 + 46 * (num - 2), size, rating, default_color, 'mm')
+    return im
+
+
+def _render_music_info_base(music: Music, theme: Theme) -> Image.Image:
+    """绘制谱面信息图中与用户无关的部分"""
     im = Image.open(themed_path(theme, 'chart_info.png')).convert('RGBA')
     dr = ImageDraw.Draw(im)
     mr = DrawText(dr, SIYUAN)
@@ -81,7 +133,7 @@ async def draw_music_info(
     im.alpha_composite(Image.open(themed_path(theme, 'logo.png')).resize((249, 120)), (65, 25))
     if music.basic_info.is_new:
         im.alpha_composite(Image.open(maimaidir / 'UI_CMN_TabTitle_NewSong.png').resize((249, 120)), (842, 100))
-    songbg = Image.open(music_picture(music.id)).resize((242, 242))
+    songbg = thumbnails.get(music.id, (242, 242))
     im.alpha_composite(songbg, (133, 197))
     im.alpha_composite(Image.open(maimaidir / f'{music.basic_info.version}.png').resize((182, 90)), (800, 370))
     im.alpha_composite(Image.open(maimaidir / f'{music.type}.png').resize((80, 30)), (295, 410))
@@ -117,37 +169,20 @@ async def draw_music_info(
             note_values.insert(4, '-')
         for n in range(6):
             fn.draw(480 + 122 * n, 590 + spacing, 25, note_values[n] if n < len(note_values) else '-', default_color, 'mm')
-        if num > 1:
-            ra = get_best_rating(music.ds[num])
-            for _n, value in enumerate(ra):
-                size = 22
-                if not calc:
-                    rating = value
-                elif not isfull:
-                    size = 17
-                    rating = f'{value}(+{value})'
-                elif value > bestlist[-1].ra:
-                    new = newbestscore(music.id, num, value, bestlist)
-                    if new == 0:
-                        rating = value
-                    else:
-                        size = 17
-                        rating = f'{value}(+{new})'
-                else:
-                    rating = value
-                fn.draw(295 + 125 * _n, 1017 + 46 * (num - 2), size, rating, default_color, 'mm')
     draw_text_with_font_fallback(
         dr, 600, 1220, 25,
         f'Designed by Yuri-YuzuChaN & BlueDeer233. Generated by {get_botname()} BOT',
         default_color, FOTNEWRODIN, SIYUAN, 'mm', 3, (255, 255, 255, 255),
     )
-    return MessageSegment.image(image_to_base64(im))
+    return im
 
 
 async def draw_music_banquet_info(music: Music) -> MessageSegment:
     """绘制宴会場谱面信息"""
-    from .maimaidx_user import Theme
+    return MessageSegment.image(await render_pool.encode(_render_music_banquet_info, music, kind='info'))
+
 
+def _render_music_banquet_info(music: Music) -> Image.Image:
     im = Image.open(maimaidir / 'chart_info_enkaijou.png')
     dr = ImageDraw.Draw(im)
     fn = DrawText(dr, FOTNEWRODIN)
@@ -176,7 +211,7 @@ async def draw_music_banquet_info(music: Music) -> MessageSegment:
     if music.basic_info.is_new:
         im.alpha_composite(Image.open(maimaidir / 'UI_CMN_TabTitle_NewSong.png').resize((249, 120)), (950, 165))
     # cover
-    im.alpha_composite(Image.open(music_picture(music.id)).resize((242, 242)), (133, 246))
+    im.alpha_composite(thumbnails.get(music.id, (242, 242)), (133, 246))
     # version
     im.alpha_composite(Image.open(maimaidir / f'{music.basic_info.version}.png').resize((182, 90)), (800, 415))
 
@@ -212,7 +247,7 @@ async def draw_music_banquet_info(music: Music) -> MessageSegment:
         f'Designed by Yuri-YuzuChaN & BlueDeer233. Generated by {get_botname()} BOT',
         stroke_color, FOTNEWRODIN, SIYUAN, 'mm', 3, (255, 255, 255, 255),
     )
-    return MessageSegment.image(image_to_base64(im))
+    return im
 
 
 async def draw_music_play_data(qqid: int, music_id: str) -> Union[str, MessageSegment]:
@@ -246,78 +281,10 @@ async def draw_music_play_data(qqid: int, music_id: str) -> Union[str, MessageSe
 
         dev = bool(maiApi.token or is_lxns(qqid))
 
-        im = Image.open(themed_path(theme, 'play_info.png')).convert('RGBA')
-    
-        dr = ImageDraw.Draw(im)
-        tb = DrawText(dr, TBFONT)
-        mr = DrawText(dr, SIYUAN)
-
-        im.alpha_composite(Image.open(themed_path(theme, 'logo.png')).resize((249, 120)), (0, 34))
-        cover = Image.open(music_picture(music_id))
-        im.alpha_composite(cover.resize((300, 300)), (100, 260))
-        im.alpha_composite(Image.open(maimaidir / f'info_{category[music.basic_info.genre]}.png'), (100, 260))
-        im.alpha_composite(Image.open(maimaidir / f'{music.basic_info.version}.png').resize((183, 90)), (295, 205))
-        im.alpha_composite(Image.open(maimaidir / f'{music.type}.png').resize((55, 20)), (350, 560))
-        
-        color = theme.color
-        artist = music.basic_info.artist
-        if coloumWidth(artist) > 58:
-            artist = changeColumnWidth(artist, 57) + '...'
-        mr.draw(255, 595, 12, artist, color, 'mm')
-        title = music.title
-        if coloumWidth(title) > 38:
-            title = changeColumnWidth(title, 37) + '...'
-        mr.draw(255, 622, 18, title, color, 'mm')
-        tb.draw(160, 720, 22, music.id, color, 'mm')
-        tb.draw(380, 720, 22, music.basic_info.bpm, color, 'mm')
-
-        y = 100
-        for num, info in enumerate(diff):
-            im.alpha_composite(Image.open(maimaidir / f'd_{num}.png'), (650, 235 + y * num))
-            if info:
-                im.alpha_composite(Image.open(themed_path(theme, 'ra_dx.png')).resize((102, 44)), (850, 272 + y * num))
-                if dev:
-                    dxscore = info.dxScore
-                    _dxscore = sum(music.charts[num].notes) * 3
-                    dxnum = dxScore(dxscore / _dxscore * 100)
-                    rating, rate = info.ra, score_Rank_l[info.rate]
-                    if dxnum != 0:
-                        im.alpha_composite(
-                            Image.open(maimaidir / f'UI_GAM_Gauge_DXScoreIcon_0{dxnum}.png').resize((32, 19)), 
-                            (851, 296 + y * num)
-                        )
-                    tb.draw(916, 304 + y * num, 13, f'{dxscore}/{_dxscore}', color, 'mm')
-                else:
-                    rating, rate = computeRa(music.ds[num], info.achievements, israte=True)
-                    
-                im.alpha_composite(Image.open(maimaidir / 'fcfs.png'), (965, 265 + y * num))
-                if info.fc:
-                    im.alpha_composite(
-                        Image.open(maimaidir / f'UI_CHR_PlayBonus_{fcl[info.fc]}.png').resize((65, 65)), 
-                        (960, 261 + y * num)
-                    )
-                if info.fs:
-                    im.alpha_composite(
-                        Image.open(maimaidir / f'UI_CHR_PlayBonus_{fsl[info.fs]}.png').resize((65, 65)), 
-                        (1025, 261 + y * num)
-                    )
-                im.alpha_composite(Image.open(themed_path(theme, 'ra.png')), (1350, 405 + y * num))
-                im.alpha_composite(
-                    Image.open(themed_path(theme, f'UI_TTR_Rank_{rate}.png')).resize((100, 45)), 
-                    (737, 272 + y * num)
-                )
-
-                tb.draw(510, 292 + y * num, 42, f'{info.achievements:.4f}%', color, 'lm')
-                tb.draw(685, 248 + y * num, 25, music.ds[num], anchor='mm')
-                tb.draw(915, 283 + y * num, 18, rating, color, 'mm')
-            else:
-                tb.draw(685, 248 + y * num, 25, music.ds[num], anchor='mm')
-                mr.draw(800, 302 + y * num, 30, '未游玩', color, 'mm')
-        if len(diff) == 4:
-            mr.draw(800, 302 + y * 4, 30, '没有该难度', color, 'mm')
-
-        mr.draw(600, 827, 22, f'Designed by Yuri-YuzuChaN & BlueDeer233. Generated by {get_botname()} BOT', color, 'mm')
-        msg = MessageSegment.image(image_to_base64(im))
+        await covers.ensure([music.id])
+        msg = MessageSegment.image(
+            await render_pool.encode(_render_music_play_data, music, diff, theme, dev, kind='info')
+        )
         
     except (
         UserNotFoundError,
@@ -336,6 +303,86 @@ async def draw_music_play_data(qqid: int, music_id: str) -> Union[str, MessageSe
     return msg
 
 
+def _render_music_play_data(
+    music: Music,
+    diff: List[Union[None, PlayInfoDev, PlayInfoDefault]],
+    theme: Theme,
+    dev: bool
+) -> Image.Image:
+    """绘制谱面游玩图，`dev` 为 True 时按开发者接口的精确字段绘制"""
+    im = Image.open(themed_path(theme, 'play_info.png')).convert('RGBA')
+
+    dr = ImageDraw.Draw(im)
+    tb = DrawText(dr, TBFONT)
+    mr = DrawText(dr, SIYUAN)
+
+    im.alpha_composite(Image.open(themed_path(theme, 'logo.png')).resize((249, 120)), (0, 34))
+    im.alpha_composite(thumbnails.get(music.id, (300, 300)), (100, 260))
+    im.alpha_composite(Image.open(maimaidir / f'info_{category[music.basic_info.genre]}.png'), (100, 260))
+    im.alpha_composite(Image.open(maimaidir / f'{music.basic_info.version}.png').resize((183, 90)), (295, 205))
+    im.alpha_composite(Image.open(maimaidir / f'{music.type}.png').resize((55, 20)), (350, 560))
+
+    color = theme.color
+    artist = music.basic_info.artist
+    if coloumWidth(artist) > 58:
+        artist = changeColumnWidth(artist, 57) + '...'
+    mr.draw(255, 595, 12, artist, color, 'mm')
+    title = music.title
+    if coloumWidth(title) > 38:
+        title = changeColumnWidth(title, 37) + '...'
+    mr.draw(255, 622, 18, title, color, 'mm')
+    tb.draw(160, 720, 22, music.id, color, 'mm')
+    tb.draw(380, 720, 22, music.basic_info.bpm, color, 'mm')
+
+    y = 100
+    for num, info in enumerate(diff):
+        im.alpha_composite(Image.open(maimaidir / f'd_{num}.png'), (650, 235 + y * num))
+        if info:
+            im.alpha_composite(Image.open(themed_path(theme, 'ra_dx.png')).resize((102, 44)), (850, 272 + y * num))
+            if dev:
+                dxscore = info.dxScore
+                _dxscore = sum(music.charts[num].notes) * 3
+                dxnum = dxScore(dxscore / _dxscore * 100)
+                rating, rate = info.ra, score_Rank_l[info.rate]
+                if dxnum != 0:
+                    im.alpha_composite(
+                        Image.open(maimaidir / f'UI_GAM_Gauge_DXScoreIcon_0{dxnum}.png').resize((32, 19)), 
+                        (851, 296 + y * num)
+                    )
+                tb.draw(916, 304 + y * num, 13, f'{dxscore}/{_dxscore}', color, 'mm')
+            else:
+                rating, rate = computeRa(music.ds[num], info.achievements, israte=True)
+
+            im.alpha_composite(Image.open(maimaidir / 'fcfs.png'), (965, 265 + y * num))
+            if info.fc:
+                im.alpha_composite(
+                    Image.open(maimaidir / f'UI_CHR_PlayBonus_{fcl[info.fc]}.png').resize((65, 65)), 
+                    (960, 261 + y * num)
+                )
+            if info.fs:
+                im.alpha_composite(
+                    Image.open(maimaidir / f'UI_CHR_PlayBonus_{fsl[info.fs]}.png').resize((65, 65)), 
+                    (1025, 261 + y * num)
+                )
+            im.alpha_composite(Image.open(themed_path(theme, 'ra.png')), (1350, 405 + y * num))
+            im.alpha_composite(
+                Image.open(themed_path(theme, f'UI_TTR_Rank_{rate}.png')).resize((100, 45)), 
+                (737, 272 + y * num)
+            )
+
+            tb.draw(510, 292 + y * num, 42, f'{info.achievements:.4f}%', color, 'lm')
+            tb.draw(685, 248 + y * num, 25, music.ds[num], anchor='mm')
+            tb.draw(915, 283 + y * num, 18, rating, color, 'mm')
+        else:
+            tb.draw(685, 248 + y * num, 25, music.ds[num], anchor='mm')
+            mr.draw(800, 302 + y * num, 30, '未游玩', color, 'mm')
+    if len(diff) == 4:
+        mr.draw(800, 302 + y * 4, 30, '没有该难度', color, 'mm')
+
+    mr.draw(600, 827, 22, f'Designed by Yuri-YuzuChaN & BlueDeer233. Generated by {get_botname()} BOT', color, 'mm')
+    return im
+
+
 def calc_achievements_fc(scorelist: Union[List[float], List[str]], lvlist_num: int, isfc: bool = False) -> int:
     r = -1
     obj = range(4) if isfc else achievementList[-6:]
@@ -347,7 +394,7 @@ def calc_achievements_fc(scorelist: Union[List[float], List[str]], lvlist_num: i
     return r
 
 
-def draw_rating(rating: str, path: Path) -> MessageSegment:
+async def draw_rating(rating: str, path: Path) -> MessageSegment:
     """
     绘制指定定数表文字
     
@@ -357,11 +404,15 @@ def draw_rating(rating: str, path: Path) -> MessageSegment:
     Returns:
         `MessageSegment`
     """
+    return MessageSegment.image(await render_pool.encode(_render_rating, rating, path, kind='table'))
+
+
+def _render_rating(rating: str, path: Path) -> Image.Image:
     im = Image.open(path)
     dr = ImageDraw.Draw(im)
     sy = DrawText(dr, SIYUAN)
     sy.draw(700, 100, 65, f'Level.{rating}   定数表', (124, 129, 255, 255), 'mm', 5, (255, 255, 255, 255))
-    return MessageSegment.image(image_to_base64(im))
+    return im
 
 
 async def draw_rating_table(qqid: int, rating: str, isfc: bool = False) -> Union[MessageSegment, str]:
@@ -405,82 +456,15 @@ async def draw_rating_table(qqid: int, rating: str, isfc: bool = False) -> Union
                     for _s in range(fs_index + 1):
                         statistics[sync_rank[_s]] += 1
 
-        achievements_fc_list: List[Union[float, List[float]]] = []
-        lvlist = mai.total_level_data[rating]
-        lvnum = sum([len(v) for v in lvlist.values()])
-        
-        unfinished_bg = Image.open(maimaidir / 'unfinished_1.png')
-        complete_bg = Image.open(maimaidir / 'complete_1.png')
-        
-        bg = ratingdir / f'{rating}.png'
-        
-        im = Image.open(bg).convert('RGBA')
-        dr = ImageDraw.Draw(im)
-        tb = DrawText(dr, TBFONT)
-        fn = DrawText(dr, FOTNEWRODIN)
-        font_color = (114, 188, 254, 255)
-        
-        # 标题
-        fn.draw(495, 160, 70, 'Level.', font_color, 'ld', 8, (255, 255, 255, 255))
-        fn.draw(750, 160, 100, rating, font_color, 'ld', 8, (255, 255, 255, 255))
-        
-        # 统计面板背景
-        complete_panel = maimaidir / 'complete.png'
-        if complete_panel.exists():
-            im.alpha_composite(Image.open(complete_panel).convert('RGBA'), (251, 190))
-        
-        # 第一行统计
-        stats_first_line_x, stats_first_line_y = 534, 238
-        tb.draw(394, stats_first_line_y, 30, f"{statistics['clear']}/{lvnum}",
-                (124, 129, 255, 255), 'mm', 5, (255, 255, 255, 255))
-        for n in range(6):
-            x = stats_first_line_x + n * 102
-            tb.draw(x, stats_first_line_y, 30, statistics[stat_keys[1 + n]],
-                    (124, 129, 255, 255), 'mm', 2, (255, 255, 255, 255))
-        # 第二行统计
-        stats_second_line_x, stats_second_line_y = 292, 323
-        for n in range(9):
-            x = stats_second_line_x + n * 102
-            tb.draw(x, stats_second_line_y, 30, statistics[stat_keys[7 + n]],
-                    (124, 129, 255, 255), 'mm', 2, (255, 255, 255, 255))
-        
-        # 曲绘叠加层
-        START_Y = 450
-        for ra, songs in lvlist.items():
-            if not songs:
-                continue
-            for num, music in enumerate(songs):
-                row, col = divmod(num, 14)
-                x = 140 + col * 85
-                cover_y = START_Y + row * 85
-                if music.id in fromid and music.lv in fromid[music.id]:
-                    if not isfc:
-                        score = fromid[music.id][music.lv]['achievements']
-                        achievements_fc_list.append(score)
-                        rate = computeRa(music.ds, score, onlyrate=True)
-                        rank = Image.open(themed_path(Theme.PRISM_PLUS, f'UI_TTR_Rank_{rate}.png')).resize((78, 35))
-                        if score >= 100:
-                            im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
-                        else:
-                            im.alpha_composite(unfinished_bg, (x + 1, cover_y + 1))
-                        im.alpha_composite(rank, (x, cover_y + 20))
-                        continue
-                    if _fc := fromid[music.id][music.lv]['fc']:
-                        achievements_fc_list.append(combo_rank.index(_fc))
-                        fc = Image.open(maimaidir / f'UI_MSS_MBase_Icon_{fcl[_fc]}.png').resize((50, 50))
-                        im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
-                        im.alpha_composite(fc, (x + 15, cover_y + 13))
-            rows = (len(songs) - 1) // 14 + 1
-            START_Y += rows * 85 + 30
-
-        if len(achievements_fc_list) == lvnum:
-            r = calc_achievements_fc(achievements_fc_list, lvnum, isfc)
-            if r != -1:
-                pic = fcl[combo_rank[r]] if isfc else score_Rank_l[score_Rank[-6:][r]]
-                im.alpha_composite(Image.open(maimaidir / f'UI_MSS_Allclear_Icon_{pic}.png'), (40, 40))
-        
-        final_im = im.resize((int(im.size[0] * 0.8), int(im.size[1] * 0.8)), Image.Resampling.LANCZOS)
-        msg = MessageSegment.image(image_to_base64(final_im))
+        async def render() -> str:
+            await covers.ensure(m.id for songs in mai.total_level_data[rating].values() for m in songs)
+            return await render_pool.encode(
+                _render_rating_table, rating, isfc, fromid, statistics, stat_keys, kind='table'
+            )
+
+        # 底图路径计入指纹，定数表更新后不再命中旧图
+        key = render_cache.key('rating_table', 'table', rating, isfc, fromid, statistics, ratingdir / f'{rating}.png')
+        msg = MessageSegment.image(await render_cache.fetch(key, render))
     except (
         UserNotFoundError,
         UserNotExistsError,
@@ -497,6 +481,91 @@ async def draw_rating_table(qqid: int, rating: str, isfc: bool = False) -> Union
     return msg
 
 
+def _render_rating_table(
+    rating: str,
+    isfc: bool,
+    fromid: Dict[str, Dict[str, dict]],
+    statistics: Dict[str, int],
+    stat_keys: List[str]
+) -> Image.Image:
+    """绘制定数表完成度"""
+    achievements_fc_list: List[Union[float, List[float]]] = []
+    lvlist = mai.total_level_data[rating]
+    lvnum = sum([len(v) for v in lvlist.values()])
+
+    unfinished_bg = Image.open(maimaidir / 'unfinished_1.png')
+    complete_bg = Image.open(maimaidir / 'complete_1.png')
+
+    bg = ratingdir / f'{rating}.png'
+
+    im = Image.open(bg).convert('RGBA')
+    dr = ImageDraw.Draw(im)
+    tb = DrawText(dr, TBFONT)
+    fn = DrawText(dr, FOTNEWRODIN)
+    font_color = (114, 188, 254, 255)
+
+    # 标题
+    fn.draw(495, 160, 70, 'Level.', font_color, 'ld', 8, (255, 255, 255, 255))
+    fn.draw(750, 160, 100, rating, font_color, 'ld', 8, (255, 255, 255, 255))
+
+    # 统计面板背景
+    complete_panel = maimaidir / 'complete.png'
+    if complete_panel.exists():
+        im.alpha_composite(Image.open(complete_panel).convert('RGBA'), (251, 190))
+
+    # 第一行统计
+    stats_first_line_x, stats_first_line_y = 534, 238
+    tb.draw(394, stats_first_line_y, 30, f"{statistics['clear']}/{lvnum}",
+            (124, 129, 255, 255), 'mm', 5, (255, 255, 255, 255))
+    for n in range(6):
+        x = stats_first_line_x + n * 102
+        tb.draw(x, stats_first_line_y, 30, statistics[stat_keys[1 + n]],
+                (124, 129, 255, 255), 'mm', 2, (255, 255, 255, 255))
+    # 第二行统计
+    stats_second_line_x, stats_second_line_y = 292, 323
+    for n in range(9):
+        x = stats_second_line_x + n * 102
+        tb.draw(x, stats_second_line_y, 30, statistics[stat_keys[7 + n]],
+                (124, 129, 255, 255), 'mm', 2, (255, 255, 255, 255))
+
+    # 曲绘叠加层
+    START_Y = 450
+    for ra, songs in lvlist.items():
+        if not songs:
+            continue
+        for num, music in enumerate(songs):
+            row, col = divmod(num, 14)
+            x = 140 + col * 85
+            cover_y = START_Y + row * 85
+            if music.id in fromid and music.lv in fromid[music.id]:
+                if not isfc:
+                    score = fromid[music.id][music.lv]['achievements']
+                    achievements_fc_list.append(score)
+                    rate = computeRa(music.ds, score, onlyrate=True)
+                    rank = Image.open(themed_path(Theme.PRISM_PLUS, f'UI_TTR_Rank_{rate}.png')).resize((78, 35))
+                    if score >= 100:
+                        im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
+                    else:
+                        im.alpha_composite(unfinished_bg, (x + 1, cover_y + 1))
+                    im.alpha_composite(rank, (x, cover_y + 20))
+                    continue
+                if _fc := fromid[music.id][music.lv]['fc']:
+                    achievements_fc_list.append(combo_rank.index(_fc))
+                    fc = Image.open(maimaidir / f'UI_MSS_MBase_Icon_{fcl[_fc]}.png').resize((50, 50))
+                    im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
+                    im.alpha_composite(fc, (x + 15, cover_y + 13))
+        rows = (len(songs) - 1) // 14 + 1
+        START_Y += rows * 85 + 30
+
+    if len(achievements_fc_list) == lvnum:
+        r = calc_achievements_fc(achievements_fc_list, lvnum, isfc)
+        if r != -1:
+            pic = fcl[combo_rank[r]] if isfc else score_Rank_l[score_Rank[-6:][r]]
+            im.alpha_composite(Image.open(maimaidir / f'UI_MSS_Allclear_Icon_{pic}.png'), (40, 40))
+
+    return im.resize((int(im.size[0] * 0.8), int(im.size[1] * 0.8)), Image.Resampling.LANCZOS)
+
+
 async def draw_plate_table(qqid: int, version: str, plan: str) -> Union[MessageSegment, str]:
     """
     绘制完成表
@@ -526,9 +595,11 @@ async def draw_plate_table(qqid: int, version: str, plan: str) -> Union[MessageS
             if _d.song_id not in music_id_list:
                 continue
             _music = mai.total_list.by_id(_d.song_id)
-            _d.table_level = _music.level
-            _d.ds = _music.ds[_d.level_index]
-            playerdata.append(_d)
+            # 查分器结果来自响应缓存，复制后再补充字段，不修改缓存中的对象
+            playerdata.append(_d.model_copy(update={
+                'table_level': _music.level,
+                'ds': _music.ds[_d.level_index],
+            }))
 
         ra: Dict[str, Dict[str, List[Optional[PlayInfoDefault]]]] = {}
         """
@@ -553,159 +624,10 @@ async def draw_plate_table(qqid: int, version: str, plan: str) -> Union[MessageS
                 continue
             ra[_d.table_level[3]][str(_d.song_id)][_d.level_index] = _d
         
-        finished_bg = [Image.open(maimaidir / f't_{_}.png') for _ in range(5)]
-        unfinished_bg = Image.open(maimaidir / 'unfinished_2.png')
-        complete_bg = Image.open(maimaidir / 'complete_2.png')
-        progress_big = Image.open(maimaidir / 'progress_big.png')
-        progress_bg_img = Image.open(maimaidir / 'plate_progress.png') if (maimaidir / 'plate_progress.png').exists() else None
-        progress_small_img = Image.open(maimaidir / 'progress_small.png') if (maimaidir / 'progress_small.png').exists() else None
-
-        im = Image.open(platedir / f'{version}.png')
-        draw = ImageDraw.Draw(im)
-        mr = DrawText(draw, SIYUAN)
-        fn = DrawText(draw, FOTNEWRODIN)
-        default_color = (124, 129, 255, 255)
-        
-        # 进度面板背景
-        if progress_bg_img:
-            im.alpha_composite(progress_bg_img, (175, 20))
-        plate_title = normalize_plate_filename(f'{version}{"極" if plan == "极" else plan}')
-        plate_title_path = plate_version_dir / f'{plate_title}.png'
-        if not plate_title_path.exists():
-            plate_title_path = plate_version_dir / f'{version}{"極" if plan == "极" else plan}.png'
-        if plate_title_path.exists():
-            im.alpha_composite(Image.open(plate_title_path).resize((1000, 161)), (200, 45))
-        else:
-            log.warning(f'未找到牌子标题素材：{plate_title}')
-        
-        lv: List[set[int]] = [set() for _ in range(number)]
-        finished_songs: set[int] = set()
-        START_Y = 490
-        if plan == '极' or plan == '極':
-            for level in reversed(levelList):
-                if level not in ra:
-                    continue
-                songs = ra[level]
-                max_row = 0
-                for num, _id in enumerate(songs):
-                    row, col = divmod(num, 12)
-                    max_row = max(max_row, row)
-                    x = 180 + col * 96
-                    cover_y = START_Y + row * 96
-                    f: List[int] = []
-                    for n, play in enumerate(ra[level][_id]):
-                        if play is None or not play.fc: continue
-                        if n == 3:
-                            finished_songs.add(int(_id))
-                            im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
-                            fc = Image.open(maimaidir / f'UI_CHR_PlayBonus_{fcl[play.fc]}.png').resize((60, 60))
-                            im.alpha_composite(fc, (x + 10, cover_y + 12))
-                        lv[n].add(play.song_id)
-                        f.append(n)
-                    for n in f:
-                        im.alpha_composite(finished_bg[n], (x + 4 + 19 * n, cover_y + 63))
-                START_Y += (max_row + 1) * 96 + 30
-        if plan == '将':
-            for level in reversed(levelList):
-                if level not in ra:
-                    continue
-                songs = ra[level]
-                max_row = 0
-                for num, _id in enumerate(songs):
-                    row, col = divmod(num, 12)
-                    max_row = max(max_row, row)
-                    x = 180 + col * 96
-                    cover_y = START_Y + row * 96
-                    f: List[int] = []
-                    for n, play in enumerate(ra[level][_id]):
-                        if play is None or play.achievements < 100: continue
-                        if n == 3:
-                            finished_songs.add(int(_id))
-                            im.alpha_composite(complete_bg if play.achievements >= 100 else unfinished_bg, (x + 1, cover_y + 1))
-                            rate = computeRa(play.ds, play.achievements, onlyrate=True)
-                            rank = Image.open(themed_path(Theme.PRISM_PLUS, f'UI_TTR_Rank_{rate}.png')).resize((80, 36))
-                            im.alpha_composite(rank, (x, cover_y + 22))
-                        lv[n].add(play.song_id)
-                        f.append(n)
-                    for n in f:
-                        im.alpha_composite(finished_bg[n], (x + 4 + 19 * n, cover_y + 63))
-                START_Y += (max_row + 1) * 96 + 30
-        if plan == '神':
-            _fc = ['ap', 'app']
-            for level in reversed(levelList):
-                if level not in ra:
-                    continue
-                songs = ra[level]
-                max_row = 0
-                for num, _id in enumerate(songs):
-                    row, col = divmod(num, 12)
-                    max_row = max(max_row, row)
-                    x = 180 + col * 96
-                    cover_y = START_Y + row * 96
-                    f: List[int] = []
-                    for n, play in enumerate(ra[level][_id]):
-                        if play is None or play.fc not in _fc: continue
-                        if n == 3:
-                            finished_songs.add(int(_id))
-                            im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
-                            ap = Image.open(maimaidir / f'UI_CHR_PlayBonus_{fcl[play.fc]}.png').resize((60, 60))
-                            im.alpha_composite(ap, (x + 10, cover_y + 12))
-                        lv[n].add(play.song_id)
-                        f.append(n)
-                    for n in f:
-                        im.alpha_composite(finished_bg[n], (x + 4 + 19 * n, cover_y + 63))
-                START_Y += (max_row + 1) * 96 + 30
-        if plan == '舞舞':
-            fs = ['fsd', 'fdx', 'fsdp', 'fdxp']
-            for level in reversed(levelList):
-                if level not in ra:
-                    continue
-                songs = ra[level]
-                max_row = 0
-                for num, _id in enumerate(songs):
-                    row, col = divmod(num, 12)
-                    max_row = max(max_row, row)
-                    x = 180 + col * 96
-                    cover_y = START_Y + row * 96
-                    f: List[int] = []
-                    for n, play in enumerate(ra[level][_id]):
-                        if play is None or play.fs not in fs: continue
-                        if n == 3:
-                            finished_songs.add(int(_id))
-                            im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
-                            fsd = Image.open(maimaidir / f'UI_CHR_PlayBonus_{fsl[play.fs]}.png').resize((60, 60))
-                            im.alpha_composite(fsd, (x + 10, cover_y + 12))
-                        lv[n].add(play.song_id)
-                        f.append(n)
-                    for n in f:
-                        im.alpha_composite(finished_bg[n], (x + 4 + 19 * n, cover_y + 63))
-                START_Y += (max_row + 1) * 96 + 30
-        
-        # 进度条与统计面板
-        complete_count = len(finished_songs)
-        progress = complete_count / plate_total_num if plate_total_num > 0 else 0
-        if progress != 0:
-            bar = progress_big.crop((0, 0, int(993 * progress), 92))
-            im.alpha_composite(bar, (204, 219))
-        complete_text = 'COMPLETED!!!' if complete_count == plate_total_num else f'{complete_count}/{plate_total_num}'
-        fn.draw(700, 240, 30, complete_text, default_color, 'mm', 3, (255, 255, 255, 255))
-        fn.draw(1190, 240, 30, f'{round(progress * 100, 2)}%', default_color, 'rm', 3, (255, 255, 255, 255))
-        
-        stats_color = ScoreBaseImage.id_color.copy()
-        stats_start_x, stats_gap_x, stats_start_y = 320, 253, 300
-        for _l in range(number):
-            x_pos = stats_start_x + _l * stats_gap_x
-            complete_sum_group = len(lv[_l])
-            plate_count = plate_total_num
-            progress_group = complete_sum_group / plate_count if plate_count > 0 else 0
-            if progress_group != 0 and progress_small_img:
-                bar_small = progress_small_img.crop((0, 0, int(230 * progress_group), 46))
-                im.alpha_composite(bar_small, (x_pos - 115, 326))
-            fn.draw(x_pos, stats_start_y, 40, complete_sum_group, stats_color[_l], 'mm', 4, (255, 255, 255, 255))
-            fn.draw(x_pos + 115, stats_start_y + 20, 14, f'/{plate_count}', stats_color[_l], 'rd', 3, (255, 255, 255, 255))
-            fn.draw(x_pos + 115, 343, 20, f'{round(progress_group * 100, 2)}%', default_color, 'rm', 2, (255, 255, 255, 255))
-        
-        msg = MessageSegment.image(image_to_base64(im))
+        key = render_cache.key('plate_table', 'table', version, plan, ra, number, platedir / f'{version}.png')
+        msg = MessageSegment.image(await render_cache.fetch(key, lambda: render_pool.encode(
+            _render_plate_table, version, plan, ra, number, plate_total_num, kind='table'
+        )))
     except (
         UserNotFoundError,
         UserNotExistsError,
@@ -720,3 +642,166 @@ async def draw_plate_table(qqid: int, version: str, plan: str) -> Union[MessageS
         log.error(traceback.format_exc())
         msg = f'未知错误：{type(e)}\n请联系Bot管理员'
     return msg
+
+
+def _render_plate_table(
+    version: str,
+    plan: str,
+    ra: Dict[str, Dict[str, List[Optional[PlayInfoDefault]]]],
+    number: int,
+    plate_total_num: int
+) -> Image.Image:
+    """绘制完成表"""
+    finished_bg = [Image.open(maimaidir / f't_{_}.png') for _ in range(5)]
+    unfinished_bg = Image.open(maimaidir / 'unfinished_2.png')
+    complete_bg = Image.open(maimaidir / 'complete_2.png')
+    progress_big = Image.open(maimaidir / 'progress_big.png')
+    progress_bg_img = Image.open(maimaidir / 'plate_progress.png') if (maimaidir / 'plate_progress.png').exists() else None
+    progress_small_img = Image.open(maimaidir / 'progress_small.png') if (maimaidir / 'progress_small.png').exists() else None
+
+    im = Image.open(platedir / f'{version}.png')
+    draw = ImageDraw.Draw(im)
+    mr = DrawText(draw, SIYUAN)
+    fn = DrawText(draw, FOTNEWRODIN)
+    default_color = (124, 129, 255, 255)
+
+    # 进度面板背景
+    if progress_bg_img:
+        im.alpha_composite(progress_bg_img, (175, 20))
+    plate_title = normalize_plate_filename(f'{version}{"極" if plan == "极" else plan}')
+    plate_title_path = plate_version_dir / f'{plate_title}.png'
+    if not plate_title_path.exists():
+        plate_title_path = plate_version_dir / f'{version}{"極" if plan == "极" else plan}.png'
+    if plate_title_path.exists():
+        im.alpha_composite(Image.open(plate_title_path).resize((1000, 161)), (200, 45))
+    else:
+        log.warning(f'未找到牌子标题素材：{plate_title}')
+
+    lv: List[set[int]] = [set() for _ in range(number)]
+    finished_songs: set[int] = set()
+    START_Y = 490
+    if plan == '极' or plan == '極':
+        for level in reversed(levelList):
+            if level not in ra:
+                continue
+            songs = ra[level]
+            max_row = 0
+            for num, _id in enumerate(songs):
+                row, col = divmod(num, 12)
+                max_row = max(max_row, row)
+                x = 180 + col * 96
+                cover_y = START_Y + row * 96
+                f: List[int] = []
+                for n, play in enumerate(ra[level][_id]):
+                    if play is None or not play.fc: continue
+                    if n == 3:
+                        finished_songs.add(int(_id))
+                        im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
+                        fc = Image.open(maimaidir / f'UI_CHR_PlayBonus_{fcl[play.fc]}.png').resize((60, 60))
+                        im.alpha_composite(fc, (x + 10, cover_y + 12))
+                    lv[n].add(play.song_id)
+                    f.append(n)
+                for n in f:
+                    im.alpha_composite(finished_bg[n], (x + 4 + 19 * n, cover_y + 63))
+            START_Y += (max_row + 1) * 96 + 30
+    if plan == '将':
+        for level in reversed(levelList):
+            if level not in ra:
+                continue
+            songs = ra[level]
+            max_row = 0
+            for num, _id in enumerate(songs):
+                row, col = divmod(num, 12)
+                max_row = max(max_row, row)
+                x = 180 + col * 96
+                cover_y = START_Y + row * 96
+                f: List[int] = []
+                for n, play in enumerate(ra[level][_id]):
+                    if play is None or play.achievements < 100: continue
+                    if n == 3:
+                        finished_songs.add(int(_id))
+                        im.alpha_composite(complete_bg if play.achievements >= 100 else unfinished_bg, (x + 1, cover_y + 1))
+                        rate = computeRa(play.ds, play.achievements, onlyrate=True)
+                        rank = Image.open(themed_path(Theme.PRISM_PLUS, f'UI_TTR_Rank_{rate}.png')).resize((80, 36))
+                        im.alpha_composite(rank, (x, cover_y + 22))
+                    lv[n].add(play.song_id)
+                    f.append(n)
+                for n in f:
+                    im.alpha_composite(finished_bg[n], (x + 4 + 19 * n, cover_y + 63))
+            START_Y += (max_row + 1) * 96 + 30
+    if plan == '神':
+        _fc = ['ap', 'app']
+        for level in reversed(levelList):
+            if level not in ra:
+                continue
+            songs = ra[level]
+            max_row = 0
+            for num, _id in enumerate(songs):
+                row, col = divmod(num, 12)
+                max_row = max(max_row, row)
+                x = 180 + col * 96
+                cover_y = START_Y + row * 96
+                f: List[int] = []
+                for n, play in enumerate(ra[level][_id]):
+                    if play is None or play.fc not in _fc: continue
+                    if n == 3:
+                        finished_songs.add(int(_id))
+                        im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
+                        ap = Image.open(maimaidir / f'UI_CHR_PlayBonus_{fcl[play.fc]}.png').resize((60, 60))
+                        im.alpha_composite(ap, (x + 10, cover_y + 12))
+                    lv[n].add(play.song_id)
+                    f.append(n)
+                for n in f:
+                    im.alpha_composite(finished_bg[n], (x + 4 + 19 * n, cover_y + 63))
+            START_Y += (max_row + 1) * 96 + 30
+    if plan == '舞舞':
+        fs = ['fsd', 'fdx', 'fsdp', 'fdxp']
+        for level in reversed(levelList):
+            if level not in ra:
+                continue
+            songs = ra[level]
+            max_row = 0
+            for num, _id in enumerate(songs):
+                row, col = divmod(num, 12)
+                max_row = max(max_row, row)
+                x = 180 + col * 96
+                cover_y = START_Y + row * 96
+                f: List[int] = []
+                for n, play in enumerate(ra[level][_id]):
+                    if play is None or play.fs not in fs: continue
+                    if n == 3:
+                        finished_songs.add(int(_id))
+                        im.alpha_composite(complete_bg, (x + 1, cover_y + 1))
+                        fsd = Image.open(maimaidir / f'UI_CHR_PlayBonus_{fsl[play.fs]}.png').resize((60, 60))
+                        im.alpha_composite(fsd, (x + 10, cover_y + 12))
+                    lv[n].add(play.song_id)
+                    f.append(n)
+                for n in f:
+                    im.alpha_composite(finished_bg[n], (x + 4 + 19 * n, cover_y + 63))
+            START_Y += (max_row + 1) * 96 + 30
+
+    # 进度条与统计面板
+    complete_count = len(finished_songs)
+    progress = complete_count / plate_total_num if plate_total_num > 0 else 0
+    if progress != 0:
+        bar = progress_big.crop((0, 0, int(993 * progress), 92))
+        im.alpha_composite(bar, (204, 219))
+    complete_text = 'COMPLETED!!!' if complete_count == plate_total_num else f'{complete_count}/{plate_total_num}'
+    fn.draw(700, 240, 30, complete_text, default_color, 'mm', 3, (255, 255, 255, 255))
+    fn.draw(1190, 240, 30, f'{round(progress * 100, 2)}%', default_color, 'rm', 3, (255, 255, 255, 255))
+
+    stats_color = ScoreBaseImage.id_color.copy()
+    stats_start_x, stats_gap_x, stats_start_y = 320, 253, 300
+    for _l in range(number):
+        x_pos = stats_start_x + _l * stats_gap_x
+        complete_sum_group = len(lv[_l])
+        plate_count = plate_total_num
+        progress_group = complete_sum_group / plate_count if plate_count > 0 else 0
+        if progress_group != 0 and progress_small_img:
+            bar_small = progress_small_img.crop((0, 0, int(230 * progress_group), 46))
+            im.alpha_composite(bar_small, (x_pos - 115, 326))
+        fn.draw(x_pos, stats_start_y, 40, complete_sum_group, stats_color[_l], 'mm', 4, (255, 255, 255, 255))
+        fn.draw(x_pos + 115, stats_start_y + 20, 14, f'/{plate_count}', stats_color[_l], 'rd', 3, (255, 255, 255, 255))
+        fn.draw(x_pos + 115, 343, 20, f'{round(progress_group * 100, 2)}%', default_color, 'rm', 2, (255, 255, 255, 255))
+
+    return im
@@ -2,7 +2,7 @@ import random
 import time
 import traceback
 from collections import defaultdict
-from typing import Callable, DefaultDict
+from typing import Any, AsyncIterator, Callable, DefaultDict
 
 import pyecharts.options as opts
 from pyecharts.charts import Pie
@@ -14,14 +14,18 @@ from .maimai_best_50 import (
     changeColumnWidth,
     coloumWidth,
     computeRa,
-    themed_path,
 )
 from .maimaidx_user import Theme, userstore
 from .maimaidx_api_data import *
+from .maimaidx_covers import covers
+from .maimaidx_encoding import encoder
+from .maimaidx_layers import backgrounds
 from .maimaidx_lxns import LxnsError
 from .maimaidx_model import PlanInfo, PlayInfoDefault, PlayInfoDev, RaMusic
 from .maimaidx_music import Music, mai
-from .maimaidx_source import get_plate, get_player_b50_userinfo, get_player_records
+from .maimaidx_render import render_pool, text_to_base64
+from .maimaidx_sprites import sprites
+from .maimaidx_source import get_plate, get_player_b50_userinfo, get_player_records, get_records
 from .tool import run_chrome_to_base64
 
 Filter = Tuple[
@@ -33,6 +37,16 @@ Filter = Tuple[
 ]
 Condition = Callable[[PlayInfoDefault], bool]
 
+SCORELIST_PAGE_SIZE = 80
+"""分数列表、已完成 / 未完成谱面每页成绩数（5 列 x 16 行）"""
+NOTPLAYED_PAGE_SIZE = 400
+"""未游玩谱面每页数量（20 列 x 20 行）"""
+
+
+def page_count(total: int, size: int) -> int:
+    """总页数，没有数据时也有一页"""
+    return max((total + size - 1) // size, 1)
+
 
 async def music_global_data(music: Music, level_index: int) -> MessageSegment:
     """
@@ -105,8 +119,11 @@ class DrawScore(ScoreBaseImage):
         self,
         image: Image.Image = None,
         theme: Theme = Theme.PRISM_PLUS,
+        decorated: bool = False,
     ) -> None:
         super().__init__(image, theme)
+        if decorated:
+            return
         self._im.alpha_composite(self.aurora_bg)
         self._im.alpha_composite(self.shines_bg, (34, 0))
         self._im.alpha_composite(self.rainbow_bg, (319, self._im.size[1] - 643))
@@ -114,6 +131,31 @@ class DrawScore(ScoreBaseImage):
         for h in range((self._im.size[1] // 358) + 1):
             self._im.alpha_composite(self.pattern_bg, (0, (358 + 7) * h))
 
+    @classmethod
+    def render(
+        cls,
+        height: int,
+        theme: Theme,
+        draw: Callable[..., Image.Image],
+        *args: Any
+    ) -> Image.Image:
+        """
+        在渐变背景上构建并执行 `draw`，供绘图线程池调用
+
+        Params:
+            `height`: 背景高度
+            `theme`: 主题
+            `draw`: 绘制方法，如 `DrawScore.draw_plan`
+            `args`: 绘制参数
+        Returns:
+            `Image.Image`
+        """
+        # 背景只与高度有关，合成好的背景按高度缓存
+        background = backgrounds.get(
+            ('score', 1400, height), lambda: DrawScore(tricolor_gradient(1400, height))._im
+        )
+        return draw(cls(background.copy(), theme, decorated=True), *args)
+
     def whilepic(self, data: List[RaMusic], y: int = 200):
         """
         循环绘制谱面
@@ -130,8 +172,7 @@ class DrawScore(ScoreBaseImage):
                 y += dy if n != 0 else 0
             else:
                 x += 65
-            cover = Image.open(music_picture(v.id)).resize((55, 55))
-            self._im.alpha_composite(cover, (x, y))
+            self._im.alpha_composite(sprites.cover(v.id, (55, 55)), (x, y))
             self._im.alpha_composite(self.id_diff[int(v.lv)], (x, y + 45))
             self._tb.draw(x + 27, y + 50, 10, v.id, self.t_color[int(v.lv)], 'mm')
     
@@ -149,15 +190,12 @@ class DrawScore(ScoreBaseImage):
             x = 200 if isdx else 700
             y += 140 if index != 0 else 0
             
-            rate = Image.open(themed_path(self.theme, f'UI_TTR_Rank_{_d.rate}.png')).resize((63, 28))
-            
             self._im.alpha_composite(self._rise[_d.level_index], (x + 30, y))
-            self._im.alpha_composite(Image.open(music_picture(_d.song_id)).resize((80, 80)), (x + 55, y + 40))
-            self._im.alpha_composite(Image.open(maimaidir / f'{_d.type.upper()}.png').resize((60, 22)), (x + 240, y + 114))
+            self._im.alpha_composite(sprites.cover(_d.song_id, (80, 80)), (x + 55, y + 40))
+            self._im.alpha_composite(sprites.type_badge(_d.type, (60, 22)), (x + 240, y + 114))
             if _d.oldrate:
-                oldrate = Image.open(themed_path(self.theme, f'UI_TTR_Rank_{_d.oldrate}.png')).resize((63, 28))
-                self._im.alpha_composite(oldrate, (x + 145, y + 82))
-            self._im.alpha_composite(rate, (x + 305, y + 82))
+                self._im.alpha_composite(sprites.rank(self.theme, _d.oldrate), (x + 145, y + 82))
+            self._im.alpha_composite(sprites.rank(self.theme, _d.rate), (x + 305, y + 82))
             
             title = _d.title
             if coloumWidth(title) > 26:
@@ -262,23 +300,28 @@ class DrawScore(ScoreBaseImage):
             `Image.Image`
         """
         lendata = len(data)
-        newdata = data[(page - 1) * 80: page * 80]
         self._im.alpha_composite(self.title_lengthen_bg, (475, 30))
         if category == 'completed' or category == 'unfinished':
+            size = SCORELIST_PAGE_SIZE
+            newdata = data[(page - 1) * size: page * size]
             txt = '已完成' if category == 'completed' else '未完成'
             self._sy.draw(700, 77, 28, f'{txt}谱面', self.text_color, 'mm')
             self.whiledraw(newdata, True, 140)
             self._im.alpha_composite(self.design_bg, (200, self._im.size[1] - 113))
             
             pagemsg = f'{txt}谱面共计「{lendata}」个，'
-            pagemsg += f'展示第「{(page - 1) * 80 + 1}-{80 * (page - 1) + len(newdata)}」个，'
+            pagemsg += f'展示第「{(page - 1) * size + 1}-{size * (page - 1) + len(newdata)}」个，'
             pagemsg += f'当前第「{page} / {end_page}」页'
             self._sy.draw(700, self._im.size[1] - 70, 25, pagemsg, self.text_color, 'mm')
         else:
+            size = NOTPLAYED_PAGE_SIZE
             self._sy.draw(700, 77, 28, '未游玩谱面', self.text_color, 'mm')
-            self.whilepic(data)
+            self.whilepic(data[(page - 1) * size: page * size])
             self._im.alpha_composite(self.design_bg, (200, self._im.size[1] - 113))
-            self._sy.draw(700, self._im.size[1] - 70, 25, f'未游玩谱面共计「{len(data)}」个', self.text_color, 'mm')
+            pagemsg = f'未游玩谱面共计「{lendata}」个'
+            if end_page > 1:
+                pagemsg += f'，当前第「{page} / {end_page}」页'
+            self._sy.draw(700, self._im.size[1] - 70, 25, pagemsg, self.text_color, 'mm')
         return self._im
     
     def draw_scorelist(
@@ -300,18 +343,19 @@ class DrawScore(ScoreBaseImage):
             `Image.Image`
         """
         lendata = len(data)
-        newdata = data[(page - 1) * 80: page * 80]
+        size = SCORELIST_PAGE_SIZE
+        newdata = data[(page - 1) * size: page * size]
         r = len(newdata) // 20 + (0 if len(newdata) % 20 == 0 else 1)
         for n in range(r):
             y = (109 * 4 + 140) * n
             self._im.alpha_composite(self.title_lengthen_bg, (475, 30 + y))
-            start = (20 * n + 1) + 80 * (page - 1)
+            start = (20 * n + 1) + size * (page - 1)
             self._sy.draw(700, 77 + y, 28, f'No.{start}- No.{start + len(newdata[n * 20: (n + 1) * 20]) - 1}', self.text_color, 'mm')
             self.whiledraw(newdata[n * 20: (n + 1) * 20], True, 140 + y)
         self._im.alpha_composite(self.design_bg, (200, self._im.size[1] - 113))
         
         pagemsg = f'「{rating}」共计「{lendata}」个成绩，'
-        pagemsg += f'展示第「{(page - 1) * 80 + 1}-{80 * (page - 1) + len(newdata)}」个，'
+        pagemsg += f'展示第「{(page - 1) * size + 1}-{size * (page - 1) + len(newdata)}」个，'
         pagemsg += f'当前第「{page} / {end_page}」页'
         self._sy.draw(700, self._im.size[1] - 70, 25, pagemsg, self.text_color, 'mm')
         return self._im
@@ -347,49 +391,54 @@ def get_rise_score_list(
     sssp_ds = round(ra / 22.4, 1)
     ds = (sssp_ds + 0.1, ss_ds + 0.1)
     version = list(plate_to_dx_version.values())[-1:] if type == 'DX' else list(plate_to_dx_version.values())[:-2]
-    musiclist = mai.total_list.filter(level=level, ds=ds, version=version)
-    for _m in musiclist:
-        if (song_id := int(_m.id)) in ignore:
-            continue
-        if song_id >= 100000:
-            continue
-        for index in _m.diff:
-            for r in achievementList[-4:]:
-                basera, rate = computeRa(_m.ds[index], r, israte=True)
-                if basera <= ra:
-                    continue
-                if score and basera - int(score) < ra:
+    table = mai.total_list.chart_table
+    mask = table.mask(
+        level=level or None,
+        ds=ds,
+        version=version,
+        exclude_song_ids=ignore,
+        max_song_id=100000
+    )
+    for row in table.rows(mask):
+        _m = mai.total_list[table.position[row]]
+        song_id = int(table.song_id[row])
+        index = int(table.level_index[row])
+        for r in achievementList[-4:]:
+            basera, rate = computeRa(_m.ds[index], r, israte=True)
+            if basera <= ra:
+                continue
+            if score and basera - int(score) < ra:
+                continue
+            if song_id in old_records and index in old_records[song_id]:
+                oldra, oldrate = computeRa(_m.ds[index], old_records[song_id][index], israte=True)
+                if oldra >= basera:
                     continue
-                if song_id in old_records and index in old_records[song_id]:
-                    oldra, oldrate = computeRa(_m.ds[index], old_records[song_id][index], israte=True)
-                    if oldra >= basera:
-                        continue
-                    ss = RiseScore(
-                        song_id=song_id,
-                        title=_m.title,
-                        type=_m.type,
-                        level_index=index,
-                        ds=_m.ds[index],
-                        ra=basera,
-                        rate=rate,
-                        achievements=r,
-                        oldra=oldra,
-                        oldrate=oldrate,
-                        oldachievements=old_records[song_id][index]
-                    )
-                else:
-                    ss = RiseScore(
-                        song_id=song_id,
-                        title=_m.title,
-                        type=_m.type,
-                        level_index=index,
-                        ds=_m.ds[index],
-                        ra=basera,
-                        rate=rate,
-                        achievements=r
-                    )
-                music.append(ss)
-                break
+                ss = RiseScore(
+                    song_id=song_id,
+                    title=_m.title,
+                    type=_m.type,
+                    level_index=index,
+                    ds=_m.ds[index],
+                    ra=basera,
+                    rate=rate,
+                    achievements=r,
+                    oldra=oldra,
+                    oldrate=oldrate,
+                    oldachievements=old_records[song_id][index]
+                )
+            else:
+                ss = RiseScore(
+                    song_id=song_id,
+                    title=_m.title,
+                    type=_m.type,
+                    level_index=index,
+                    ds=_m.ds[index],
+                    ra=basera,
+                    rate=rate,
+                    achievements=r
+                )
+            music.append(ss)
+            break
     if not music:
         return music, 0
     new = random.sample(music, min(len(music), 5))
@@ -416,12 +465,7 @@ async def rise_score_data(
     """
     try:
         user = await get_player_b50_userinfo(qqid=qqid, username=username)
-        records = await get_plate(
-            qqid=qqid,
-            username=username,
-            version=list(plate_to_dx_version.values()),
-            exact=True,
-        )
+        records = await get_records(qqid=qqid, username=username, exact=True)
         old_records: DefaultDict[int, Dict[int, float]] = defaultdict(dict)
         for m in records:
             old_records[m.song_id][m.level_index] = m.achievements
@@ -436,13 +480,12 @@ async def rise_score_data(
         
         h = max(lensd, lendx)
         height = h * 140 + 110 + 150
-        image = tricolor_gradient(1400, height)
         
         theme = userstore.get(int(qqid)).theme if qqid else Theme.PRISM_PLUS
-        ds = DrawScore(image, theme)
-        im = ds.draw_rise(sd, sd_low_score, dx, dx_low_score).crop((200, 0, 1200, height))
+        await covers.ensure(r.song_id for r in sd + dx)
+        im = await render_pool.run(DrawScore.render, height, theme, DrawScore.draw_rise, sd, sd_low_score, dx, dx_low_score)
         
-        msg = MessageSegment.image(image_to_base64(im))
+        msg = MessageSegment.image(await render_pool.encode(im.crop, (200, 0, 1200, height), kind='best'))
     except (
         UserNotFoundError,
         UserNotExistsError,
@@ -460,7 +503,7 @@ async def rise_score_data(
     return msg
 
 
-def plate_message(
+async def plate_message(
     result: str, 
     plan: str, 
     music_list: List[PlayInfoDefault], 
@@ -486,7 +529,7 @@ def plate_message(
                 self_record = m.fs
         result += f'No.{n + 1:02d} {f"「{m.song_id}」":>7} {f"「{diffs[m.level_index]}」":>11} 「{m.ds}」 {m.title}  {self_record}\n'
     if len(music_list) > 10:
-        result = MessageSegment.image(image_to_base64(text_to_image(result.strip())))
+        result = MessageSegment.image(await text_to_base64(result.strip()))
     return result
 
 
@@ -604,13 +647,13 @@ async def player_plate_data(
     if len(difficult) > 0:
         if len(difficult) < 60:
             result += '剩余定数大于13.6的曲目：\n'
-            result = plate_message(result, plan, difficult, played)
+            result = await plate_message(result, plan, difficult, played)
         else:
             result += f'还有{len(difficult)}首大于13.6定数的曲目，加油推分捏！\n'
     elif len(ramain) > 0:
         if len(ramain) < 60:
             result += '剩余曲目：\n'
-            result = plate_message(result, plan, ramain, played)
+            result = await plate_message(result, plan, ramain, played)
         else:
             result += '已经没有定数大于13.6的曲目了，加油清谱捏！\n'
     else:
@@ -722,31 +765,44 @@ async def level_process_data(
             unfinished_y = (ulen // 5 + (0 if ulen % 5 == 0 else 1)) * 109 + 140
             nlen = len(notplayed[:100])
             notstarted_y = (nlen // 20 + (0 if nlen % 20 == 0 else 1)) * 65 + 140
-            image = tricolor_gradient(1400, 150 + completed_y + unfinished_y + notstarted_y)
             theme = userstore.get(int(qqid)).theme if qqid else Theme.PRISM_PLUS
-            dp = DrawScore(image, theme)
-            im = dp.draw_plan(completed, completed_y, unfinished, unfinished_y, notplayed, plan, completed_len)
+            await covers.ensure([
+                *(d.song_id for d in completed[:completed_len]),
+                *(d.song_id for d in unfinished[:30]),
+                *(m.id for m in notplayed[:100]),
+            ])
+            im = await render_pool.run(
+                DrawScore.render, 150 + completed_y + unfinished_y + notstarted_y, theme, DrawScore.draw_plan,
+                completed, completed_y, unfinished, unfinished_y, notplayed, plan, completed_len
+            )
         elif category == 'completed' or category == 'unfinished':
             data = completed if category == 'completed' else unfinished
-            lendata = len(data)
-            end_page_num = lendata // 80 + 1
+            end_page_num = page_count(len(data), SCORELIST_PAGE_SIZE)
             if page > end_page_num:
                 return f'超出页数，您的成绩共计「{end_page_num}」页，请重新输入'
-            topage = len(data[(page - 1) * 80: page * 80])
+            topage = len(data[(page - 1) * SCORELIST_PAGE_SIZE: page * SCORELIST_PAGE_SIZE])
             plc = (topage // 5 + (0 if topage % 5 == 0 else 1)) * 109
-            image = tricolor_gradient(1400, 240 + plc + 120)
             theme = userstore.get(int(qqid)).theme if qqid else Theme.PRISM_PLUS
-            dp = DrawScore(image, theme)
-            im = dp.draw_category(category, data, page, end_page_num)
+            await covers.ensure(d.song_id for d in data[(page - 1) * SCORELIST_PAGE_SIZE: page * SCORELIST_PAGE_SIZE])
+            im = await render_pool.run(
+                DrawScore.render, 240 + plc + 120, theme, DrawScore.draw_category, category, data, page, end_page_num
+            )
         else:
-            lennotstarted = len(notplayed)
+            # 未游玩谱面同样分页，避免整个等级的谱面画在一张图上
+            end_page_num = page_count(len(notplayed), NOTPLAYED_PAGE_SIZE)
+            if page > end_page_num:
+                return f'超出页数，未游玩谱面共计「{end_page_num}」页，请重新输入'
+            pagedata = notplayed[(page - 1) * NOTPLAYED_PAGE_SIZE: page * NOTPLAYED_PAGE_SIZE]
+            lennotstarted = len(pagedata)
             pln = (lennotstarted // 20 + (0 if lennotstarted % 20 == 0 else 1)) * 65
-            image = tricolor_gradient(1400, 240 + pln + 120)
             theme = userstore.get(int(qqid)).theme if qqid else Theme.PRISM_PLUS
-            dp = DrawScore(image, theme)
-            im = dp.draw_category(category, notplayed)
+            await covers.ensure(m.id for m in pagedata)
+            im = await render_pool.run(
+                DrawScore.render, 240 + pln + 120, theme, DrawScore.draw_category,
+                category, notplayed, page, end_page_num
+            )
         
-        msg = MessageSegment.image(image_to_base64(im))
+        msg = MessageSegment.image(await render_pool.run(encoder.to_base64, im, 'best'))
     except (
         UserNotFoundError,
         UserNotExistsError,
@@ -763,6 +819,60 @@ async def level_process_data(
     return msg
 
 
+async def _scorelist_records(
+    qqid: int,
+    username: Optional[str],
+    rating: Union[str, float]
+) -> Union[List[PlayInfoDefault], List[PlayInfoDev]]:
+    """指定等级 / 定数的成绩，按达成率降序"""
+    data: Union[List[PlayInfoDefault], List[PlayInfoDev]] = await get_player_records(
+        qqid=qqid, username=username, exact=True
+    )
+    if isinstance(rating, str):
+        return sorted(filter(lambda x: x.level == rating, data), key=lambda z: z.achievements, reverse=True)
+    return sorted(filter(lambda x: x.ds == rating, data), key=lambda z: z.achievements, reverse=True)
+
+
+def _scorelist_height(count: int, last: bool) -> int:
+    """
+    分数列表单页高度
+
+    Params:
+        `count`: 本页成绩数
+        `last`: 是否为最后一页
+    """
+    line = count // 5 + (0 if count % 5 == 0 else 1)
+    if not last:
+        plc = line * 109 + 140 * 4
+    elif count <= 20:
+        plc = 4 * 109 + 140
+    elif count <= 40:
+        plc = line * 109 + 140 * 2
+    elif count <= 60:
+        plc = line * 109 + 140 * 3
+    else:
+        plc = line * 109 + 140 * 4
+    return 150 + plc
+
+
+async def _render_scorelist_page(
+    theme: Theme,
+    rating: Union[str, float],
+    data: Union[List[PlayInfoDefault], List[PlayInfoDev]],
+    page: int,
+    end_page: int
+) -> MessageSegment:
+    """绘制分数列表的一页"""
+    pagedata = data[(page - 1) * SCORELIST_PAGE_SIZE: page * SCORELIST_PAGE_SIZE]
+    await covers.ensure(d.song_id for d in pagedata)
+    count = len(pagedata)
+    return MessageSegment.image(await render_pool.encode(
+        DrawScore.render, _scorelist_height(count, page == end_page), theme,
+        DrawScore.draw_scorelist, rating, data, page, end_page,
+        kind='best'
+    ))
+
+
 async def level_achievement_list_data(
     qqid: int, 
     username: Optional[str], 
@@ -782,39 +892,12 @@ async def level_achievement_list_data(
         `Union[MessageSegment, str]
     """
     try:
-        data: Union[List[PlayInfoDefault], List[PlayInfoDev]] = await get_player_records(
-            qqid=qqid, username=username, exact=True
-        )
-
-        if isinstance(rating, str):
-            newdata = sorted(list(filter(lambda x: x.level == rating, data)), key=lambda z: z.achievements, reverse=True)
-        else:
-            newdata = sorted(list(filter(lambda x: x.ds == rating, data)), key=lambda z: z.achievements, reverse=True)
-        
-        lendata = len(newdata)
-        end_page_num = lendata // 80 + 1
+        newdata = await _scorelist_records(qqid, username, rating)
+        end_page_num = page_count(len(newdata), SCORELIST_PAGE_SIZE)
         if page > end_page_num:
             return f'超出页数，您的成绩共计「{end_page_num}」页，请重新输入'
-        
-        topage = len(newdata[(page - 1) * 80: page * 80])
-        line = topage // 5 + (0 if topage % 5 == 0 else 1)
-        if page < end_page_num:
-            plc = line * 109 + 140 * 4
-        elif topage <= 20:
-            plc = 4 * 109 + 140
-        elif topage <= 40:
-            plc = line * 109 + 140 * 2
-        elif topage <= 60:
-            plc = line * 109 + 140 * 3
-        else:
-            plc = line * 109 + 140 * 4
-        
-        image = tricolor_gradient(1400, 150 + plc)
-
         theme = userstore.get(int(qqid)).theme if qqid else Theme.PRISM_PLUS
-        sc = DrawScore(image, theme)
-        im = sc.draw_scorelist(rating, newdata, page, end_page_num)
-        msg = MessageSegment.image(image_to_base64(im))
+        msg = await _render_scorelist_page(theme, rating, newdata, page, end_page_num)
     except (
         UserNotFoundError,
         UserNotExistsError,
@@ -831,6 +914,45 @@ async def level_achievement_list_data(
     return msg
 
 
+async def level_achievement_list_pages(
+    qqid: int,
+    username: Optional[str],
+    rating: Union[str, float]
+) -> AsyncIterator[Union[MessageSegment, str]]:
+    """
+    逐页绘制全部分数列表
+
+    每次只绘制一页，调用方取走（发送）上一页后才开始绘制下一页，
+    成绩再多同时也只占用一页的画布。
+
+    Params:
+        `qqid` : 用户QQ
+        `username` : 查分器用户名
+        `rating` : 定数
+    Returns:
+        `AsyncIterator[Union[MessageSegment, str]]` 每页一张图片，出错时为错误信息
+    """
+    try:
+        data = await _scorelist_records(qqid, username, rating)
+        end_page_num = page_count(len(data), SCORELIST_PAGE_SIZE)
+        theme = userstore.get(int(qqid)).theme if qqid else Theme.PRISM_PLUS
+        for page in range(1, end_page_num + 1):
+            yield await _render_scorelist_page(theme, rating, data, page, end_page_num)
+    except (
+        UserNotFoundError,
+        UserNotExistsError,
+        UserDisabledQueryError,
+        TokenError,
+        TokenDisableError,
+        TokenNotFoundError,
+        LxnsError,
+    ) as e:
+        yield str(e)
+    except Exception as e:
+        log.error(traceback.format_exc())
+        yield f'未知错误：{type(e)}\n请联系Bot管理员'
+
+
 async def rating_ranking_data(name: str, page: int) -> Union[MessageSegment, str]:
     """
     查看查分器排行榜
@@ -861,7 +983,7 @@ async def rating_ranking_data(name: str, page: int) -> Union[MessageSegment, str
             for i, ranker in enumerate(rank_data[(page - 1) * 50:end]):
                 msg += f'No.{i + 1 + (page - 1) * 50:02d}.「{ranker.ra}」 {ranker.username} \n'
             msg += f'第「{page}」页，共「{user_num // 50 + 1}」页'
-            data = MessageSegment.image(image_to_base64(text_to_image(msg.strip())))
+            data = MessageSegment.image(await text_to_base64(msg.strip()))
     except Exception as e:
         log.error(traceback.format_exc())
         data = f'未知错误：{type(e)}\n请联系Bot管理员'
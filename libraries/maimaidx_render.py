@@ -0,0 +1,159 @@
+"""绘图线程池：Pillow 绘图与编码移出事件循环，避免一张 B50 阻塞其他群的消息、猜歌计时与别名推送。"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from PIL import Image
+
+from .. import log
+from .image import text_to_image
+from .maimaidx_encoding import DEFAULT_KIND, encoder
+
+T = TypeVar('T')
+
+DEFAULT_WORKERS = 2
+SLOW_RENDER = 5
+"""单次绘图（含排队）超过该秒数时记录警告"""
+
+
+class RenderPool:
+    """
+    绘图线程池
+
+    `workers` 为 0 时在事件循环中直接绘制（与旧行为一致）。
+    Pillow 的缩放、合成与 PNG 压缩会释放 GIL，线程即可让事件循环保持响应；
+    绘图依赖进程内的曲目数据、素材缓存与静态目录，因此不使用进程池。
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS) -> None:
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def queued(self) -> int:
+        """等待空闲线程的任务数"""
+        return self.submitted - self.started
+
+    @property
+    def running(self) -> int:
+        """正在绘制的任务数"""
+        return self.started - self.completed - self.failed
+
+    def configure(self, workers: int) -> None:
+        """修改线程数，旧线程池在已提交的任务完成后释放"""
+        workers = max(int(workers), 0)
+        if workers == self.workers:
+            return
+        self.workers = workers
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='maimai-render')
+        return self._executor
+
+    def _job(self, submitted: float, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        start = time.perf_counter()
+        with self._lock:
+            self.started += 1
+            self.wait_time += start - submitted
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+                self.run_time += time.perf_counter() - start
+            raise
+        end = time.perf_counter()
+        latency = end - submitted
+        with self._lock:
+            self.completed += 1
+            self.run_time += end - start
+            self.max_latency = max(self.max_latency, latency)
+        if latency > SLOW_RENDER:
+            log.warning(
+                f'绘图耗时 {latency:.1f}s（排队 {start - submitted:.1f}s）：'
+                f'{getattr(func, "__qualname__", func)}'
+            )
+        return result
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        在线程池中执行同步绘图函数
+
+        Params:
+            `func`: 绘图函数
+            `args` / `kwargs`: 参数
+        Returns:
+            `func` 的返回值
+        """
+        with self._lock:
+            self.submitted += 1
+        job = partial(self._job, time.perf_counter(), func, *args, **kwargs)
+        if not self.workers:
+            return job()
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), job)
+
+    async def encode(
+        self,
+        func: Callable[..., Image.Image],
+        *args: Any,
+        kind: str = DEFAULT_KIND,
+        **kwargs: Any
+    ) -> str:
+        """
+        绘图并编码为 base64，两步在同一任务中完成
+
+        Params:
+            `func`: 绘图函数
+            `args` / `kwargs`: 参数
+            `kind`: 图片类型，决定输出格式，见 `maimaidx_encoding.KINDS`
+        """
+        return await self.run(_render_to_base64, kind, func, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """队列深度与耗时统计"""
+        with self._lock:
+            done = self.completed + self.failed
+            return {
+                'workers': self.workers,
+                'queued': self.queued,
+                'running': self.running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'avg_wait': self.wait_time / done if done else 0.0,
+                'avg_run': self.run_time / done if done else 0.0,
+                'max_latency': self.max_latency,
+            }
+
+    def shutdown(self) -> None:
+        """释放线程池，插件卸载时调用"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_to_base64(kind: str, func: Callable[..., Image.Image], *args: Any, **kwargs: Any) -> str:
+    return encoder.to_base64(func(*args, **kwargs), kind)
+
+
+async def text_to_base64(text: str) -> str:
+    """文字转图片并编码为 base64"""
+    return await render_pool.encode(text_to_image, text, kind='text')
+
+
+render_pool = RenderPool()
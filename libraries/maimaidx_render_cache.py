@@ -0,0 +1,258 @@
+"""绘图结果缓存：按输入数据的指纹缓存编码后的图片，成绩未变化时重复查询直接返回上次的图片。"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from pydantic import BaseModel
+
+from .. import data_dir, get_botname, log
+from .maimaidx_encoding import encoder
+from .maimaidx_http import SingleFlight
+
+CACHE_DIR = 'render_cache'
+PREFIX = 'base64://'
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Path):
+        try:
+            return [str(value), value.stat().st_mtime_ns]
+        except OSError:
+            return [str(value), None]
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha1(value).hexdigest()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    return repr(value)
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    计算输入数据的指纹
+
+    模型按字段序列化，`Path` 附带修改时间（底图重新生成后指纹随之变化），
+    `bytes`（如头像）取其哈希。
+    """
+    data = json.dumps(parts, default=_default, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+class DiskStore:
+    """
+    有上限的磁盘缓存目录
+
+    文件保存在 `data/{name}` 下，文件名为 `{键}{suffix}`；最多保留 `maxfiles` 个（为 0 时不读写），
+    按修改时间淘汰，读取时刷新修改时间。写入先写临时文件再替换，可在多个线程中同时使用。
+    """
+
+    def __init__(self, name: str, maxfiles: int = 0, suffix: str = '') -> None:
+        self.name = name
+        self.maxfiles = maxfiles
+        self.suffix = suffix
+        self._files: Optional[int] = None
+        """目录中的文件数，首次写入时统计"""
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return data_dir / self.name
+
+    def _entries(self) -> list:
+        return [p for p in self.path.glob(f'*{self.suffix}') if not p.name.endswith('.tmp')]
+
+    def read(self, key: str) -> Optional[bytes]:
+        """读取缓存文件，不存在或读取失败时返回 `None`"""
+        if not self.maxfiles:
+            return None
+        path = self.path / f'{key}{self.suffix}'
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def write(self, key: str, data: bytes) -> None:
+        """写入缓存文件，失败时抛出 `OSError`"""
+        if not self.maxfiles:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self.path / f'{key}{self.suffix}'
+        temp = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+        temp.write_bytes(data)
+        os.replace(temp, path)
+        with self._lock:
+            if self._files is None:
+                self._files = len(self._entries())
+            else:
+                self._files += 1
+            # 超出一成后再整体清理，避免每次写入都遍历目录
+            if self._files > self.maxfiles * 1.1:
+                self._trim()
+
+    def _trim(self) -> None:
+        files = []
+        for path in self._entries():
+            try:
+                files.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                continue
+        files.sort(key=lambda item: item[0])
+        for _, old in files[:max(len(files) - self.maxfiles, 0)]:
+            old.unlink(missing_ok=True)
+        self._files = min(len(files), self.maxfiles)
+
+    def clear(self) -> None:
+        """删除目录中的全部文件"""
+        if not self.path.exists():
+            return
+        with self._lock:
+            for path in self.path.iterdir():
+                path.unlink(missing_ok=True)
+            self._files = 0
+
+
+class RenderCache:
+    """
+    绘图结果缓存
+
+    键为 `{名称}-{指纹}`，指纹包含绘图输入、曲库版本、当前编码参数与页脚中的 Bot 名称。
+    内存中按 LRU 保留最多 `maxsize` 张、合计 `maxbytes` 字节（为 0 时不限）；`disk_size` 大于 0 时同时保存在
+    `data/render_cache` 下，最多 `disk_size` 个文件，重启后仍可命中。
+    同一键并发请求时只绘制一次。
+    """
+
+    def __init__(self, maxsize: int = 32, disk_size: int = 0, maxbytes: int = 64 * 1024 * 1024) -> None:
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.disk = DiskStore(CACHE_DIR, disk_size)
+        self.catalog = ''
+        """曲库版本，曲目数据更新后由 `set_catalog` 设置"""
+        self._data: 'OrderedDict[str, str]' = OrderedDict()
+        self.nbytes = 0
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def disk_size(self) -> int:
+        return self.disk.maxfiles
+
+    @property
+    def cache_dir(self) -> Path:
+        return self.disk.path
+
+    def configure(self, maxsize: int, disk_size: int) -> None:
+        """修改容量，超出容量的旧条目立即淘汰"""
+        self.maxsize = max(maxsize, 0)
+        self.disk.maxfiles = max(disk_size, 0)
+        self._evict()
+
+    def set_catalog(self, catalog: str) -> None:
+        """设置曲库版本，版本变化后旧条目不再命中"""
+        if catalog != self.catalog:
+            self.catalog = catalog
+            self._data.clear()
+            self.nbytes = 0
+
+    def key(self, name: str, kind: str, *parts: Any) -> str:
+        """
+        生成缓存键
+
+        Params:
+            `name`: 绘图名称，如 `b50`
+            `kind`: 图片类型，编码参数随之计入指纹
+            `parts`: 决定绘图结果的全部输入
+        """
+        return f'{name}-{fingerprint(self.catalog, encoder.profile(kind), get_botname(), *parts)}'
+
+    def _evict(self) -> None:
+        while len(self._data) > self.maxsize or (
+            self.maxbytes and self.nbytes > self.maxbytes and len(self._data) > 1
+        ):
+            self.nbytes -= len(self._data.popitem(last=False)[1])
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        data = self.disk.read(key)
+        return None if data is None else PREFIX + base64.b64encode(data).decode()
+
+    def _write_disk(self, key: str, value: str) -> None:
+        if not value.startswith(PREFIX):
+            return
+        try:
+            self.disk.write(key, base64.b64decode(value[len(PREFIX):]))
+        except OSError as e:
+            log.warning(f'保存绘图缓存失败：{e}')
+
+    async def fetch(self, key: str, factory: Callable[[], Awaitable[str]]) -> str:
+        """
+        命中时直接返回缓存的图片，否则调用 `factory` 绘制并写入缓存
+
+        Params:
+            `key`: 缓存键，见 `key`
+            `factory`: 实际绘图，返回 `base64://` 字符串
+        """
+        if not self.maxsize and not self.disk_size:
+            return await factory()
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+        return await self._flight.run(key, lambda: self._load(key, factory))
+
+    async def _load(self, key: str, factory: Callable[[], Awaitable[str]]) -> str:
+        value = await asyncio.to_thread(self._read_disk, key) if self.disk_size else None
+        if value is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            value = await factory()
+            if self.disk_size:
+                await asyncio.to_thread(self._write_disk, key, value)
+        if self.maxsize:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._data[key] = value
+            self.nbytes += len(value)
+            self._evict()
+        return value
+
+    def clear(self, disk: bool = False) -> int:
+        """
+        清空缓存，曲绘等素材更新后调用
+
+        Params:
+            `disk`: 是否同时删除磁盘缓存
+        Returns:
+            `int` 清除的内存条目数
+        """
+        count = len(self._data)
+        self._data.clear()
+        self.nbytes = 0
+        if disk:
+            self.disk.clear()
+        return count
+
+
+render_cache = RenderCache()
@@ -6,14 +6,19 @@
 
 from __future__ import annotations
 
-from typing import Callable, List, Optional, Tuple, Union
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import BaseModel, PrivateAttr
 
 from .maimaidx_api_data import maiApi
+from .maimaidx_cache import cache_key, response_cache
 from .maimaidx_error import TokenNotFoundError
 from .maimaidx_lxns import (
     LxnsAPI,
     LxnsFeatureUnavailable,
     lxns_best50_to_best50,
+    lxns_player_to_player,
     lxns_score_to_playinfodefault,
     lxns_scores_to_played,
     lxns_scores_to_records,
@@ -64,6 +69,109 @@ async def _friend_code(user: User) -> int:
     return player.friend_code
 
 
+# ---------------------------------------------------------------------------
+# 成绩快照
+# ---------------------------------------------------------------------------
+class RecordsSnapshot(BaseModel):
+    """
+    玩家完整成绩快照
+
+    一次拉取后缓存在 `response_cache` 中，各类筛选 B50、等级进度、分数列表与上分推荐
+    均由同一份成绩在本地计算。快照为共享对象，调用方不应原地修改。
+    """
+
+    player: Player
+    records: List[PlayedResult]
+    exact: bool = True
+    """是否含精确达成率；落雪开发者模式的简化成绩为 False"""
+
+    _ranked: Optional[List[Tuple[int, PlayedResult]]] = PrivateAttr(default=None)
+
+    @property
+    def ranked(self) -> List[Tuple[int, PlayedResult]]:
+        """按 B50 排序键降序排列的成绩，首次使用时排序一次"""
+        if self._ranked is None:
+            self._ranked = rank_records(self.records)
+        return self._ranked
+
+    def variants(self, filters: Dict[str, RecordFilter]) -> Dict[str, Best50]:
+        """一次遍历生成多种 B50，见 `partition_b50_records`"""
+        return partition_b50_records(self.records, filters, _is_new_song, self.ranked)
+
+    def best50(
+        self,
+        *,
+        all_perfect: bool = False,
+        min_dx_star: Optional[int] = None,
+        fitted: bool = False,
+        all_perfect_plus: bool = False,
+        achievement_mode: Optional[str] = None,
+        difficulty_index: Optional[int] = None,
+        all_songs: bool = False,
+    ) -> Best50:
+        """按筛选条件从快照选出 B50，条件含义同 `get_best50`"""
+        if all_songs:
+            top50 = [record for _, record in self.ranked[:50]]
+            return Best50(
+                sd_total=sum(record.rating for record in top50[:35]),
+                dx_total=sum(record.rating for record in top50[35:]),
+                sd=top50[:35],
+                dx=top50[35:],
+            )
+        if difficulty_index is not None:
+            record_filter = difficulty_filter(difficulty_index)
+        elif achievement_mode is not None:
+            record_filter = achievement_filter(achievement_mode)
+        elif all_perfect_plus:
+            record_filter = ap_plus50_filter
+        elif fitted:
+            record_filter = fitted_filter(_fitted_level_value, _rating_for_level_value)
+        elif min_dx_star is not None:
+            record_filter = star_filter(min_dx_star, _dx_star_for_record)
+        elif all_perfect:
+            record_filter = ap50_filter
+        else:
+            raise ValueError('未指定 B50 筛选条件')
+        return self.variants({'best50': record_filter})['best50']
+
+
+async def get_records_snapshot(
+    qqid: Optional[Union[int, str]] = None,
+    username: Optional[str] = None,
+    *,
+    exact: bool = False,
+) -> RecordsSnapshot:
+    """
+    获取玩家完整成绩快照，TTL 内重复调用不再请求查分器
+
+    Params:
+        `qqid`: 用户QQ
+        `username`: 查分器用户名（仅水鱼）
+        `exact`: 是否要求精确达成率，落雪开发者模式下会抛出 `LxnsFeatureUnavailable`
+    Returns:
+        `RecordsSnapshot`
+    """
+    if is_lxns(qqid, username):
+        async def request() -> RecordsSnapshot:
+            records = await _lxns_records_raw(qqid, exact=exact)
+            player = await _lxns_player_raw(qqid)
+            user = userstore.get(int(qqid))
+            return RecordsSnapshot(
+                player=player, records=records, exact=bool(user.access_token)
+            )
+
+        key = cache_key('lxns', qqid, 'records_snapshot', {'exact': exact})
+    else:
+        async def request() -> RecordsSnapshot:
+            player, records = await _divingfish_dev_records_raw(
+                qqid=qqid, username=username
+            )
+            return RecordsSnapshot(player=player, records=records)
+
+        key = cache_key('divingfish', qqid or username, 'records_snapshot')
+    return await response_cache.fetch(key, request)
+
+
 # ---------------------------------------------------------------------------
 # 统一 API（PlayedResult）
 # ---------------------------------------------------------------------------
@@ -100,91 +208,7 @@ async def get_best50(
     if difficulty_index is not None and not 0 <= difficulty_index <= 4:
         raise ValueError('谱面难度索引必须在 0 到 4 之间')
 
-    if all_songs:
-        if is_lxns(qqid, username):
-            player, _ = await _lxns_best50_raw(qqid, all_perfect=False)
-            records = await _lxns_records_raw(qqid, exact=False)
-        else:
-            player, records = await _divingfish_dev_records_raw(
-                qqid=qqid, username=username
-            )
-        best50 = select_all_songs_b50_records(records)
-    elif difficulty_index is not None:
-        if is_lxns(qqid, username):
-            player, _ = await _lxns_best50_raw(qqid, all_perfect=False)
-            records = await _lxns_records_raw(qqid, exact=False)
-        else:
-            player, records = await _divingfish_dev_records_raw(
-                qqid=qqid, username=username
-            )
-        best50 = select_difficulty_b50_records(
-            records,
-            difficulty_index,
-            _is_new_song,
-        )
-    elif achievement_mode is not None:
-        if is_lxns(qqid, username):
-            player, _ = await _lxns_best50_raw(qqid, all_perfect=False)
-            records = await _lxns_records_raw(qqid, exact=True)
-        else:
-            player, records = await _divingfish_dev_records_raw(
-                qqid=qqid, username=username
-            )
-        best50 = select_achievement_b50_records(
-            records,
-            achievement_mode,
-            _is_new_song,
-        )
-    elif all_perfect_plus:
-        if is_lxns(qqid, username):
-            player, _ = await _lxns_best50_raw(qqid, all_perfect=False)
-            records = await _lxns_records_raw(qqid, exact=False)
-        else:
-            player, records = await _divingfish_dev_records_raw(
-                qqid=qqid, username=username
-            )
-        best50 = select_ap_plus50_records(records, _is_new_song)
-    elif fitted:
-        if is_lxns(qqid, username):
-            player, _ = await _lxns_best50_raw(qqid, all_perfect=False)
-            records = await _lxns_records_raw(qqid, exact=False)
-        else:
-            player, records = await _divingfish_dev_records_raw(
-                qqid=qqid, username=username
-            )
-        best50 = select_fitted_b50_records(
-            records,
-            _is_new_song,
-            _fitted_level_value,
-            _rating_for_level_value,
-        )
-    elif min_dx_star is not None:
-        if is_lxns(qqid, username):
-            player, _ = await _lxns_best50_raw(qqid, all_perfect=False)
-            records = await _lxns_records_raw(qqid, exact=False)
-        else:
-            player, records = await _divingfish_dev_records_raw(
-                qqid=qqid, username=username
-            )
-        best50 = select_star_b50_records(
-            records,
-            min_dx_star,
-            _is_new_song,
-            _dx_star_for_record,
-        )
-    elif is_lxns(qqid, username):
-        player, best50 = await _lxns_best50_raw(
-            qqid, all_perfect=all_perfect
-        )
-    elif all_perfect:
-        player, best50 = await _divingfish_ap50_raw(
-            qqid=qqid, username=username
-        )
-    else:
-        user = await maiApi.query_user_b50(qqid=qqid, username=username)
-        return userinfo_to_player(user), userinfo_to_best50(user)
-
-    if (
+    filtered = (
         all_perfect
         or all_perfect_plus
         or min_dx_star is not None
@@ -192,22 +216,173 @@ async def get_best50(
         or achievement_mode is not None
         or difficulty_index is not None
         or all_songs
-    ):
-        filtered_rating = best50.sd_total + best50.dx_total
-        player = player.model_copy(update={'rating': filtered_rating})
+    )
+    if not filtered:
+        if is_lxns(qqid, username):
+            return await _lxns_best50_raw(qqid, all_perfect=False)
+        user = await maiApi.query_user_b50(qqid=qqid, username=username)
+        return userinfo_to_player(user), userinfo_to_best50(user)
+
+    if all_perfect and is_lxns(qqid, username):
+        # 落雪 AP50 由开发者接口直接给出
+        player, best50 = await _lxns_best50_raw(qqid, all_perfect=True)
+    else:
+        snapshot = await get_records_snapshot(
+            qqid, username, exact=achievement_mode is not None
+        )
+        player = snapshot.player
+        best50 = snapshot.best50(
+            all_perfect=all_perfect,
+            min_dx_star=min_dx_star,
+            fitted=fitted,
+            all_perfect_plus=all_perfect_plus,
+            achievement_mode=achievement_mode,
+            difficulty_index=difficulty_index,
+            all_songs=all_songs,
+        )
+
+    filtered_rating = best50.sd_total + best50.dx_total
+    player = player.model_copy(update={'rating': filtered_rating})
     return player, best50
 
 
+# ---------------------------------------------------------------------------
+# B50 选取
+# ---------------------------------------------------------------------------
+RecordFilter = Callable[[PlayedResult], Optional[PlayedResult]]
+"""成绩筛选：返回 None 表示排除，否则返回参与排序的成绩（可为改写后的副本）"""
+
+
+def b50_sort_key(record: PlayedResult) -> Tuple[int, float, float, int, int]:
+    """B50 排序键，降序比较：Rating、达成率、定数、曲目 ID、难度"""
+    return (
+        record.rating,
+        record.achievements,
+        record.level_value,
+        record.song_id,
+        record.level_index,
+    )
+
+
+def top_records(records: Iterable[PlayedResult], k: int) -> List[PlayedResult]:
+    """
+    按 `b50_sort_key` 取前 k 个成绩
+
+    使用堆做部分选择，结果与 `sorted(records, key=b50_sort_key, reverse=True)[:k]` 完全一致
+    （含同分时保持原顺序）。
+    """
+    return heapq.nlargest(k, records, key=b50_sort_key)
+
+
+def _best50(old_records: List[PlayedResult], new_records: List[PlayedResult]) -> Best50:
+    return Best50(
+        sd_total=sum(record.rating for record in old_records),
+        dx_total=sum(record.rating for record in new_records),
+        sd=old_records,
+        dx=new_records,
+    )
+
+
+def select_b50_records(
+    records: Iterable[PlayedResult],
+    record_filter: RecordFilter,
+    is_new_song: Callable[[int], Optional[bool]],
+) -> Best50:
+    """
+    按单个筛选条件选出旧曲 35 与新曲 15
+
+    先筛选、按新旧曲分组（无法判断新旧的成绩排除），再对两组分别做堆选择。
+    """
+    old_records: List[PlayedResult] = []
+    new_records: List[PlayedResult] = []
+    for record in records:
+        selected = record_filter(record)
+        if selected is None:
+            continue
+        is_new = is_new_song(record.song_id)
+        if is_new is None:
+            continue
+        (new_records if is_new else old_records).append(selected)
+    return _best50(top_records(old_records, 35), top_records(new_records, 15))
+
+
+def rank_records(records: Iterable[PlayedResult]) -> List[Tuple[int, PlayedResult]]:
+    """按 `b50_sort_key` 降序排列的 (原下标, 成绩)，供 `partition_b50_records` 复用"""
+    return sorted(enumerate(records), key=lambda item: b50_sort_key(item[1]), reverse=True)
+
+
+def partition_b50_records(
+    records: List[PlayedResult],
+    filters: Dict[str, RecordFilter],
+    is_new_song: Callable[[int], Optional[bool]],
+    ranked: Optional[List[Tuple[int, PlayedResult]]] = None,
+) -> Dict[str, Best50]:
+    """
+    单次遍历成绩，同时生成多种 B50
+
+    按排序键从高到低遍历一次，每条成绩依次交给仍未选满的筛选条件，新旧曲判断至多一次；
+    所有条件的 35 / 15 均选满后提前结束。筛选条件返回改写后的成绩（如拟合定数）时，
+    该条件改为收集全部通过的成绩，遍历结束后按原顺序重新选择。
+    结果与对每个条件分别调用 `select_b50_records` 一致。
+
+    Params:
+        `records`: 完整成绩
+        `filters`: 名称 -> 筛选条件
+        `is_new_song`: 曲目 ID -> 是否新曲
+        `ranked`: `rank_records(records)` 的结果，多次调用时可复用
+    Returns:
+        `Dict[str, Best50]` 名称 -> 旧曲 35 + 新曲 15
+    """
+    if ranked is None:
+        ranked = rank_records(records)
+    limits = (35, 15)
+    buckets: Dict[str, Tuple[list, list]] = {name: ([], []) for name in filters}
+    """名称 -> (旧曲, 新曲)，元素为 (原下标, 成绩)"""
+    rerank: Dict[str, List[Tuple[int, bool, PlayedResult]]] = {}
+    active = dict(filters)
+    for index, record in ranked:
+        if not active:
+            break
+        unknown = True
+        is_new = None
+        for name, record_filter in list(active.items()):
+            selected = record_filter(record)
+            if selected is None:
+                continue
+            if unknown:
+                is_new = is_new_song(record.song_id)
+                unknown = False
+            if is_new is None:
+                break
+            if selected is not record or name in rerank:
+                rerank.setdefault(name, []).append((index, is_new, selected))
+                continue
+            bucket = buckets[name][is_new]
+            if len(bucket) < limits[is_new]:
+                bucket.append((index, record))
+                if all(len(b) >= limit for b, limit in zip(buckets[name], limits)):
+                    del active[name]
+
+    result: Dict[str, Best50] = {}
+    for name, (old_items, new_items) in buckets.items():
+        if name in rerank:
+            # 排序键已改变：按原顺序合并已收集的成绩后重新选择
+            items = [(index, False, record) for index, record in old_items]
+            items += [(index, True, record) for index, record in new_items]
+            items += rerank[name]
+            items.sort(key=lambda item: item[0])
+            old_records = top_records((r for _, is_new, r in items if not is_new), 35)
+            new_records = top_records((r for _, is_new, r in items if is_new), 15)
+        else:
+            old_records = [record for _, record in old_items]
+            new_records = [record for _, record in new_items]
+        result[name] = _best50(old_records, new_records)
+    return result
+
+
 def select_all_songs_b50_records(records: List[PlayedResult]) -> Best50:
     """忽略新旧曲分类，按单曲 Rating 选出最高的 50 个成绩。"""
-    sort_key = lambda r: (
-        r.rating,
-        r.achievements,
-        r.level_value,
-        r.song_id,
-        r.level_index,
-    )
-    top50 = sorted(records, key=sort_key, reverse=True)[:50]
+    top50 = top_records(records, 50)
 
     # Best50 数据结构仍以 35 + 15 保存，以兼容既有模型转换；
     # 全曲模式渲染时会将两段重新合并并连续绘制。
@@ -221,37 +396,73 @@ def select_all_songs_b50_records(records: List[PlayedResult]) -> Best50:
     )
 
 
+def ap50_filter(record: PlayedResult) -> Optional[PlayedResult]:
+    """AP / AP+ 成绩"""
+    return record if (record.fc or '').lower() in {'ap', 'app'} else None
+
+
+def ap_plus50_filter(record: PlayedResult) -> Optional[PlayedResult]:
+    """AP+ 成绩"""
+    return record if (record.fc or '').lower() == 'app' else None
+
+
+def achievement_filter(mode: str) -> RecordFilter:
+    """达成率区间筛选，区间见 `achievement_matches_mode`"""
+    if mode not in ACHIEVEMENT_B50_MODES:
+        raise ValueError(f'未知的达成率筛选模式：{mode}')
+    return lambda record: record if achievement_matches_mode(record.achievements, mode) else None
+
+
+def difficulty_filter(difficulty_index: int) -> RecordFilter:
+    """谱面难度筛选"""
+    if not 0 <= difficulty_index <= 4:
+        raise ValueError('谱面难度索引必须在 0 到 4 之间')
+    return lambda record: record if record.level_index == difficulty_index else None
+
+
+def star_filter(
+    min_dx_star: int,
+    dx_star_of: Callable[[PlayedResult], Optional[int]],
+) -> RecordFilter:
+    """DX SCORE 星级筛选"""
+    if not 1 <= min_dx_star <= 5:
+        raise ValueError('DX 星级必须在 1 到 5 之间')
+
+    def record_filter(record: PlayedResult) -> Optional[PlayedResult]:
+        dx_star = dx_star_of(record)
+        if dx_star is None or dx_star < min_dx_star:
+            return None
+        return record
+
+    return record_filter
+
+
+def fitted_filter(
+    fitted_level_value_of: Callable[[PlayedResult], Optional[float]],
+    rating_of: Callable[[float, float], int],
+) -> RecordFilter:
+    """以拟合定数重算 Rating，无拟合定数的成绩排除"""
+
+    def record_filter(record: PlayedResult) -> Optional[PlayedResult]:
+        fitted_level_value = fitted_level_value_of(record)
+        if fitted_level_value is None or fitted_level_value <= 0:
+            return None
+        return record.model_copy(
+            update={
+                'level_value': fitted_level_value,
+                'rating': rating_of(fitted_level_value, record.achievements),
+            }
+        )
+
+    return record_filter
+
+
 def select_ap50_records(
     records: List[PlayedResult],
     is_new_song: Callable[[int], Optional[bool]],
 ) -> Best50:
     """从完整成绩中选出旧曲 AP35 与新曲 AP15。"""
-    old_records: List[PlayedResult] = []
-    new_records: List[PlayedResult] = []
-
-    for record in records:
-        if (record.fc or '').lower() not in {'ap', 'app'}:
-            continue
-        is_new = is_new_song(record.song_id)
-        if is_new is None:
-            continue
-        (new_records if is_new else old_records).append(record)
-
-    sort_key = lambda r: (
-        r.rating,
-        r.achievements,
-        r.level_value,
-        r.song_id,
-        r.level_index,
-    )
-    ap35 = sorted(old_records, key=sort_key, reverse=True)[:35]
-    ap15 = sorted(new_records, key=sort_key, reverse=True)[:15]
-    return Best50(
-        sd_total=sum(record.rating for record in ap35),
-        dx_total=sum(record.rating for record in ap15),
-        sd=ap35,
-        dx=ap15,
-    )
+    return select_b50_records(records, ap50_filter, is_new_song)
 
 
 def select_ap_plus50_records(
@@ -259,31 +470,7 @@ def select_ap_plus50_records(
     is_new_song: Callable[[int], Optional[bool]],
 ) -> Best50:
     """从玩家完整成绩中选出旧曲 AP+35 与新曲 AP+15。"""
-    old_records: List[PlayedResult] = []
-    new_records: List[PlayedResult] = []
-    for record in records:
-        if (record.fc or '').lower() != 'app':
-            continue
-        is_new = is_new_song(record.song_id)
-        if is_new is None:
-            continue
-        (new_records if is_new else old_records).append(record)
-
-    sort_key = lambda r: (
-        r.rating,
-        r.achievements,
-        r.level_value,
-        r.song_id,
-        r.level_index,
-    )
-    app35 = sorted(old_records, key=sort_key, reverse=True)[:35]
-    app15 = sorted(new_records, key=sort_key, reverse=True)[:15]
-    return Best50(
-        sd_total=sum(record.rating for record in app35),
-        dx_total=sum(record.rating for record in app15),
-        sd=app35,
-        dx=app15,
-    )
+    return select_b50_records(records, ap_plus50_filter, is_new_song)
 
 
 ACHIEVEMENT_B50_MODES = frozenset({'under_s', 'near', 'lock'})
@@ -314,34 +501,7 @@ def select_achievement_b50_records(
     is_new_song: Callable[[int], Optional[bool]],
 ) -> Best50:
     """按达成率区间筛选完整成绩，再选出旧曲 35 与新曲 15。"""
-    if mode not in ACHIEVEMENT_B50_MODES:
-        raise ValueError(f'未知的达成率筛选模式：{mode}')
-
-    old_records: List[PlayedResult] = []
-    new_records: List[PlayedResult] = []
-    for record in records:
-        if not achievement_matches_mode(record.achievements, mode):
-            continue
-        is_new = is_new_song(record.song_id)
-        if is_new is None:
-            continue
-        (new_records if is_new else old_records).append(record)
-
-    sort_key = lambda r: (
-        r.rating,
-        r.achievements,
-        r.level_value,
-        r.song_id,
-        r.level_index,
-    )
-    b35 = sorted(old_records, key=sort_key, reverse=True)[:35]
-    b15 = sorted(new_records, key=sort_key, reverse=True)[:15]
-    return Best50(
-        sd_total=sum(record.rating for record in b35),
-        dx_total=sum(record.rating for record in b15),
-        sd=b35,
-        dx=b15,
-    )
+    return select_b50_records(records, achievement_filter(mode), is_new_song)
 
 
 def select_difficulty_b50_records(
@@ -350,34 +510,7 @@ def select_difficulty_b50_records(
     is_new_song: Callable[[int], Optional[bool]],
 ) -> Best50:
     """按谱面难度筛选完整成绩，再选出旧曲 35 与新曲 15。"""
-    if not 0 <= difficulty_index <= 4:
-        raise ValueError('谱面难度索引必须在 0 到 4 之间')
-
-    old_records: List[PlayedResult] = []
-    new_records: List[PlayedResult] = []
-    for record in records:
-        if record.level_index != difficulty_index:
-            continue
-        is_new = is_new_song(record.song_id)
-        if is_new is None:
-            continue
-        (new_records if is_new else old_records).append(record)
-
-    sort_key = lambda r: (
-        r.rating,
-        r.achievements,
-        r.level_value,
-        r.song_id,
-        r.level_index,
-    )
-    b35 = sorted(old_records, key=sort_key, reverse=True)[:35]
-    b15 = sorted(new_records, key=sort_key, reverse=True)[:15]
-    return Best50(
-        sd_total=sum(record.rating for record in b35),
-        dx_total=sum(record.rating for record in b15),
-        sd=b35,
-        dx=b15,
-    )
+    return select_b50_records(records, difficulty_filter(difficulty_index), is_new_song)
 
 
 def select_star_b50_records(
@@ -387,35 +520,7 @@ def select_star_b50_records(
     dx_star_of: Callable[[PlayedResult], Optional[int]],
 ) -> Best50:
     """从完整成绩中选出 DX SCORE 至少 N 星的 B35 与 B15。"""
-    if not 1 <= min_dx_star <= 5:
-        raise ValueError('DX 星级必须在 1 到 5 之间')
-
-    old_records: List[PlayedResult] = []
-    new_records: List[PlayedResult] = []
-    for record in records:
-        dx_star = dx_star_of(record)
-        if dx_star is None or dx_star < min_dx_star:
-            continue
-        is_new = is_new_song(record.song_id)
-        if is_new is None:
-            continue
-        (new_records if is_new else old_records).append(record)
-
-    sort_key = lambda r: (
-        r.rating,
-        r.achievements,
-        r.level_value,
-        r.song_id,
-        r.level_index,
-    )
-    b35 = sorted(old_records, key=sort_key, reverse=True)[:35]
-    b15 = sorted(new_records, key=sort_key, reverse=True)[:15]
-    return Best50(
-        sd_total=sum(record.rating for record in b35),
-        dx_total=sum(record.rating for record in b15),
-        sd=b35,
-        dx=b15,
-    )
+    return select_b50_records(records, star_filter(min_dx_star, dx_star_of), is_new_song)
 
 
 def select_fitted_b50_records(
@@ -425,37 +530,8 @@ def select_fitted_b50_records(
     rating_of: Callable[[float, float], int],
 ) -> Best50:
     """用拟合定数重算 Rating，并选出拟合 B35 与 B15。"""
-    old_records: List[PlayedResult] = []
-    new_records: List[PlayedResult] = []
-    for record in records:
-        fitted_level_value = fitted_level_value_of(record)
-        if fitted_level_value is None or fitted_level_value <= 0:
-            continue
-        is_new = is_new_song(record.song_id)
-        if is_new is None:
-            continue
-        fitted_record = record.model_copy(
-            update={
-                'level_value': fitted_level_value,
-                'rating': rating_of(fitted_level_value, record.achievements),
-            }
-        )
-        (new_records if is_new else old_records).append(fitted_record)
-
-    sort_key = lambda r: (
-        r.rating,
-        r.achievements,
-        r.level_value,
-        r.song_id,
-        r.level_index,
-    )
-    b35 = sorted(old_records, key=sort_key, reverse=True)[:35]
-    b15 = sorted(new_records, key=sort_key, reverse=True)[:15]
-    return Best50(
-        sd_total=sum(record.rating for record in b35),
-        dx_total=sum(record.rating for record in b15),
-        sd=b35,
-        dx=b15,
+    return select_b50_records(
+        records, fitted_filter(fitted_level_value_of, rating_of), is_new_song
     )
 
 
@@ -530,15 +606,17 @@ async def get_records(
     """获取全部成绩（统一 PlayedResult）。
 
     水鱼优先开发者全量 records；无 token / 失败时回退 plate（全版本）。
+    两者的全量成绩均取自 `get_records_snapshot`。
     """
     from .. import plate_to_dx_version
     if is_lxns(qqid, username):
-        return await _lxns_records_raw(qqid, exact=exact)
+        snapshot = await get_records_snapshot(qqid, exact=exact)
+        return list(snapshot.records)
 
     try:
-        dev = await maiApi.query_user_get_dev(qqid=qqid, username=username)
-        if dev.records:
-            return [playinfo_to_played(r) for r in dev.records]
+        snapshot = await get_records_snapshot(qqid, username)
+        if snapshot.records:
+            return list(snapshot.records)
     except Exception:
         pass
 
@@ -656,6 +734,19 @@ async def get_music_record(
 # ---------------------------------------------------------------------------
 # 落雪取数（兼容旧导出：仍返回水鱼模型）
 # ---------------------------------------------------------------------------
+async def _lxns_player_raw(qqid: Union[int, str]) -> Player:
+    """取落雪玩家信息：已授权用个人接口，否则按 QQ 查询"""
+    user = userstore.get(int(qqid))
+    api = LxnsAPI(qqid=user.qqid, access_token=user.access_token)
+    if user.access_token:
+        player = await api.player_personal()
+    else:
+        if not maiApi.config.lxns_dev_token:
+            raise LxnsFeatureUnavailable('BOT 管理员未配置落雪开发者 Token，无法按 QQ 查询')
+        player = await api.player_by_qq(user.qqid)
+    return lxns_player_to_player(player)
+
+
 async def _lxns_best50_raw(
     qqid: Union[int, str], *, all_perfect: bool = False
 ) -> Tuple[Player, Best50]:
@@ -703,11 +794,13 @@ async def lxns_b50(qqid: Union[int, str], all_perfect: bool = False) -> UserInfo
 
 
 async def lxns_records(qqid: Union[int, str], *, exact: bool = False) -> List[PlayInfoDev]:
-    return played_list_to_records(await _lxns_records_raw(qqid, exact=exact))
+    snapshot = await get_records_snapshot(qqid, exact=exact)
+    return played_list_to_records(snapshot.records)
 
 
 async def lxns_plate(qqid: Union[int, str], *, exact: bool = False) -> List[PlayInfoDefault]:
-    return played_list_to_plate(await _lxns_records_raw(qqid, exact=exact))
+    snapshot = await get_records_snapshot(qqid, exact=exact)
+    return played_list_to_plate(snapshot.records)
 
 
 async def lxns_music_record(qqid: Union[int, str], music_id: Union[int, str]) -> List[PlayInfoDev]:
@@ -734,7 +827,13 @@ async def lxns_music_record(qqid: Union[int, str], music_id: Union[int, str]) ->
 __all__ = [
     'get_service',
     'is_lxns',
+    'RecordsSnapshot',
+    'get_records_snapshot',
     'get_best50',
+    'b50_sort_key',
+    'top_records',
+    'select_b50_records',
+    'partition_b50_records',
     'select_ap50_records',
     'select_ap_plus50_records',
     'achievement_matches_mode',
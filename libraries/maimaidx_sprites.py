@@ -0,0 +1,145 @@
+"""成绩图素材缓存：类型标、评级、FC/FS、DX 星等小图按 (路径, 尺寸) 解码并缩放一次后复用。"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from PIL import Image
+
+from .. import fcl, fsl, maimaidir, score_Rank_l
+from .maimaidx_thumbnails import thumbnails
+from .maimaidx_user import Theme
+
+Size = Tuple[int, int]
+
+COVER_SIZE: Size = (75, 75)
+TYPE_BADGE_SIZE: Size = (37, 14)
+RANK_SIZE: Size = (63, 28)
+COMBO_SIZE: Size = (34, 34)
+DX_STAR_SIZE: Size = (47, 26)
+
+
+def themed_path(theme: Theme, name: str) -> Path:
+    """按主题返回素材路径，主题目录不存在时回退到 mai/pic 根目录。"""
+    path = maimaidir / theme.value / name
+    if path.exists():
+        return path
+    return maimaidir / name
+
+
+def rank_asset_name(rate: str) -> str:
+    """评级图标素材名，小写评级（如 `sssp`）先映射为素材命名"""
+    if rate.islower():
+        rate = score_Rank_l[rate]
+    return f'UI_TTR_Rank_{rate}.png'
+
+
+class SpriteAtlas:
+    """
+    预缩放素材缓存
+
+    每个 (路径, 尺寸) 只解码、缩放一次，转为 RGBA 后按 LRU 保存，最多 `maxsize` 张。
+    返回的图块为共享对象，只可作为 `alpha_composite` 等操作的来源，不可原地修改。
+    `cache` 为 False 时不保存（对应配置 `saveinmem` 关闭）。
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.cache = True
+        self._tiles: 'OrderedDict[Tuple[str, Size], Image.Image]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    @staticmethod
+    def _load(path: Path, size: Size) -> Image.Image:
+        with Image.open(path) as im:
+            # 先缩放再转 RGBA，与原先 `Image.open(...).resize(...)` 的重采样结果一致
+            return im.resize(size).convert('RGBA')
+
+    def get(self, path: Path, size: Size) -> Image.Image:
+        """
+        获取缩放后的 RGBA 图块
+
+        Params:
+            `path`: 素材路径
+            `size`: 目标尺寸
+        Returns:
+            `Image.Image`
+        """
+        if not self.cache:
+            return self._load(path, size)
+        key = (str(path), size)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+        tile = self._load(path, size)
+        with self._lock:
+            self.misses += 1
+            self._tiles[key] = tile
+            while len(self._tiles) > self.maxsize:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def cover(self, song_id: int, size: Size = COVER_SIZE) -> Image.Image:
+        """曲绘，由缩略图存储提供"""
+        return thumbnails.get(song_id, size)
+
+    def type_badge(self, chart_type: str, size: Size = TYPE_BADGE_SIZE) -> Image.Image:
+        """SD / DX 类型标"""
+        return self.get(maimaidir / f'{chart_type.upper()}.png', size)
+
+    def rank(self, theme: Theme, rate: str, size: Size = RANK_SIZE) -> Image.Image:
+        """评级图标，随主题变化"""
+        return self.get(themed_path(theme, rank_asset_name(rate)), size)
+
+    def fc(self, fc: str) -> Optional[Image.Image]:
+        """FC / AP 图标，无连击评价时为 None"""
+        if not fc:
+            return None
+        return self.get(maimaidir / f'UI_MSS_MBase_Icon_{fcl[fc]}.png', COMBO_SIZE)
+
+    def fs(self, fs: str) -> Optional[Image.Image]:
+        """FS / FDX 图标，无同步评价时为 None"""
+        if not fs:
+            return None
+        return self.get(maimaidir / f'UI_MSS_MBase_Icon_{fsl[fs]}.png', COMBO_SIZE)
+
+    def dx_star(self, num: int) -> Image.Image:
+        """DX 星级图标，`num` 为 1~5"""
+        return self.get(maimaidir / f'UI_GAM_Gauge_DXScoreIcon_0{num}.png', DX_STAR_SIZE)
+
+    def preload(self, themes: Iterable[Theme] = tuple(Theme)) -> int:
+        """
+        预加载成绩格中的全部图标，缺失的素材跳过
+
+        Returns:
+            `int` 已缓存的图块数
+        """
+        loaders = [lambda t=t: self.type_badge(t) for t in ('SD', 'DX')]
+        loaders += [lambda fc=fc: self.fc(fc) for fc in fcl]
+        loaders += [lambda fs=fs: self.fs(fs) for fs in fsl]
+        loaders += [lambda num=num: self.dx_star(num) for num in range(1, 6)]
+        for theme in themes:
+            loaders += [lambda theme=theme, rate=rate: self.rank(theme, rate) for rate in score_Rank_l]
+        for loader in loaders:
+            try:
+                loader()
+            except (FileNotFoundError, KeyError):
+                continue
+        return len(self)
+
+    def clear(self) -> None:
+        """清空缓存，素材文件更新后调用"""
+        with self._lock:
+            self._tiles.clear()
+
+
+sprites = SpriteAtlas()
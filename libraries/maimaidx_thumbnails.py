@@ -0,0 +1,133 @@
+"""曲绘缩略图：各尺寸缩略图生成一次后保存在 `cover/thumb` 下，并在内存中按 LRU 保留解码结果。"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+
+from PIL import Image
+
+from .. import coverdir, log
+from .image import music_picture
+
+Size = Tuple[int, int]
+
+STANDARD_SIZES: Tuple[Size, ...] = ((55, 55), (75, 75), (80, 80), (242, 242), (300, 300))
+"""各绘图使用的曲绘尺寸：养成计划、B50 / 定数表、完成表 / 上分推荐、歌曲信息、游玩信息"""
+THUMB_DIR = 'thumb'
+
+
+class CoverThumbnails:
+    """
+    曲绘缩略图存储
+
+    缩略图按封面文件名（即 `music_id % 10000`，存在专用封面时为完整 ID）与尺寸保存为
+    `cover/thumb/{宽}x{高}/{编号}.png`；原封面比缩略图新时（如重新下载）自动重新生成。
+    解码后的 RGBA 图最多在内存中保留 `maxsize` 张，为共享对象，不可原地修改。
+    `cache` 为 False 时只使用磁盘缩略图（对应配置 `saveinmem` 关闭）。
+    """
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self.cache = True
+        self._images: 'OrderedDict[Tuple[str, Size], Tuple[int, Image.Image]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    @staticmethod
+    def thumb_path(cover_id: Union[int, str], size: Size) -> Path:
+        """缩略图保存路径"""
+        return coverdir / THUMB_DIR / f'{size[0]}x{size[1]}' / f'{cover_id}.png'
+
+    def _load(self, source: Path, mtime: int, size: Size) -> Image.Image:
+        """读取磁盘缩略图，不存在或已过期时由原封面生成"""
+        path = self.thumb_path(source.stem, size)
+        try:
+            if path.stat().st_mtime_ns >= mtime:
+                with Image.open(path) as im:
+                    return im.convert('RGBA')
+        except (OSError, ValueError):
+            pass
+        with Image.open(source) as im:
+            # 先缩放再转 RGBA，与原先 `Image.open(...).resize(...)` 的结果一致
+            thumb = im.resize(size).convert('RGBA')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_name(f'{path.stem}.{threading.get_ident()}.tmp')
+            thumb.save(temp, 'PNG')
+            os.replace(temp, path)
+            self.generated += 1
+        except OSError as e:
+            log.warning(f'保存曲绘缩略图失败（{path}）：{e}')
+        return thumb
+
+    def get(self, music_id: Union[int, str], size: Size) -> Image.Image:
+        """
+        获取曲绘缩略图
+
+        Params:
+            `music_id`: 谱面 ID
+            `size`: 目标尺寸
+        Returns:
+            `Image.Image` RGBA
+        """
+        source = music_picture(music_id)
+        mtime = source.stat().st_mtime_ns
+        key = (source.stem, size)
+        if self.cache:
+            with self._lock:
+                item = self._images.get(key)
+                if item is not None and item[0] == mtime:
+                    self._images.move_to_end(key)
+                    self.hits += 1
+                    return item[1]
+        thumb = self._load(source, mtime, size)
+        with self._lock:
+            self.misses += 1
+            if self.cache:
+                self._images[key] = (mtime, thumb)
+                self._images.move_to_end(key)
+                while len(self._images) > self.maxsize:
+                    self._images.popitem(last=False)
+        return thumb
+
+    def generate(
+        self,
+        sizes: Iterable[Size] = STANDARD_SIZES,
+        covers: Optional[Iterable[Path]] = None
+    ) -> int:
+        """
+        为本地已有封面补全磁盘缩略图，已是最新的跳过，不写入内存缓存
+
+        Params:
+            `sizes`: 需要的尺寸
+            `covers`: 封面文件，默认 `cover` 目录下全部 PNG
+        Returns:
+            `int` 新生成的缩略图数
+        """
+        sizes = tuple(sizes)
+        before = self.generated
+        for source in (coverdir.glob('*.png') if covers is None else covers):
+            try:
+                mtime = source.stat().st_mtime_ns
+                for size in sizes:
+                    path = self.thumb_path(source.stem, size)
+                    if not path.exists() or path.stat().st_mtime_ns < mtime:
+                        self._load(source, mtime, size)
+            except (OSError, ValueError) as e:
+                log.warning(f'生成曲绘缩略图失败（{source.name}）：{e}')
+        return self.generated - before
+
+    def clear(self) -> None:
+        """清空内存缓存，磁盘缩略图保留"""
+        with self._lock:
+            self._images.clear()
+
+
+thumbnails = CoverThumbnails()
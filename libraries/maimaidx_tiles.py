@@ -0,0 +1,132 @@
+"""成绩格缓存：b50 / 完成表中每个成绩格只由谱面与成绩决定，合成好的格子在不同用户、不同查询间复用。"""
+
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from PIL import Image
+
+from .. import log
+from .maimaidx_layers import LayerCache
+from .maimaidx_render_cache import DiskStore, fingerprint
+
+CACHE_DIR = 'tile_cache'
+
+
+class TileCache:
+    """
+    成绩格缓存
+
+    键为成绩格全部输入的指纹。内存中按 LRU 保留最多 `maxsize` 张；`disk_size`
+    大于 0 时同时以 PNG 保存在 `data/tile_cache` 下，最多 `disk_size` 个文件，
+    重启后仍可命中。`cache` 为 False 时不使用内存缓存（对应配置 `saveinmem` 关闭）。
+    """
+
+    def __init__(self, maxsize: int = 512, disk_size: int = 0) -> None:
+        self.memory = LayerCache(maxsize=maxsize)
+        self.disk = DiskStore(CACHE_DIR, disk_size, '.png')
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    @property
+    def cache(self) -> bool:
+        return self.memory.cache
+
+    @cache.setter
+    def cache(self, value: bool) -> None:
+        self.memory.cache = value
+
+    @property
+    def hits(self) -> int:
+        return self.memory.hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total else 0
+
+    @property
+    def disk_size(self) -> int:
+        return self.disk.maxfiles
+
+    @property
+    def cache_dir(self) -> Path:
+        return self.disk.path
+
+    def configure(self, maxsize: int, disk_size: int) -> None:
+        """修改容量，内存中超出容量的旧条目在下次写入时淘汰"""
+        self.memory.maxsize = max(maxsize, 0)
+        self.disk.maxfiles = max(disk_size, 0)
+        if not self.memory.maxsize:
+            self.memory.clear()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """生成缓存键，`parts` 需包含决定成绩格内容的全部输入"""
+        return fingerprint(*parts)
+
+    def get(self, key: str, factory: Callable[[], Image.Image]) -> Image.Image:
+        """
+        获取成绩格
+
+        Params:
+            `key`: 缓存键，见 `key`
+            `factory`: 绘制成绩格
+        Returns:
+            `Image.Image` 共享图片，不可原地修改
+        """
+        if self.cache and self.memory.maxsize:
+            return self.memory.get(key, lambda: self._load(key, factory))
+        return self._load(key, factory)
+
+    def _load(self, key: str, factory: Callable[[], Image.Image]) -> Image.Image:
+        tile = self._read_disk(key)
+        if tile is not None:
+            self.disk_hits += 1
+            return tile
+        self.misses += 1
+        tile = factory()
+        self._write_disk(key, tile)
+        return tile
+
+    def _read_disk(self, key: str) -> Optional[Image.Image]:
+        data = self.disk.read(key)
+        if data is None:
+            return None
+        try:
+            with Image.open(BytesIO(data)) as im:
+                return im.convert('RGBA')
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, tile: Image.Image) -> None:
+        if not self.disk_size:
+            return
+        try:
+            buffer = BytesIO()
+            tile.save(buffer, 'PNG', compress_level=1)
+            self.disk.write(key, buffer.getvalue())
+        except OSError as e:
+            log.warning(f'保存成绩格缓存失败：{e}')
+
+    def clear(self, disk: bool = False) -> int:
+        """
+        清空缓存，曲绘等素材更新后调用
+
+        Params:
+            `disk`: 是否同时删除磁盘缓存
+        Returns:
+            `int` 清除的内存条目数
+        """
+        count = len(self.memory)
+        self.memory.clear()
+        if disk:
+            self.disk.clear()
+        return count
+
+
+score_tiles = TileCache()
+"""b50 / 完成表成绩格，键为 (主题, 谱面, 成绩) 指纹"""
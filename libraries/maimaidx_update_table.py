@@ -1,106 +1,297 @@
+import asyncio
 import copy
+import json
+import os
 import time
-
-import aiofiles
+from functools import partial
+from typing import Callable, Dict, List, Tuple
 
 from .. import *
 from .image import (
     draw_text_with_font_fallback,
     generate_frosted_card,
+    music_picture,
     tricolor_gradient,
     tricolor_gradient_prism_plus,
 )
 from .maimai_best_50 import *
+from .maimaidx_covers import covers
+from .maimaidx_layers import backgrounds
+from .maimaidx_model import RaMusic
 from .maimaidx_music import Music, mai
+from .maimaidx_render import render_pool
+from .maimaidx_render_cache import fingerprint
+from .maimaidx_thumbnails import thumbnails
+
+TABLE_MANIFEST = 'table_manifest.json'
+"""各定数表 / 完成表上次生成时的输入指纹，保存在 data 目录"""
+BACKGROUND_ASSETS = ('aurora.png', 'bg_shines.png', 'pattern.png', 'rainbow.png', 'rainbow_bottom.png', 'separator.png')
+
+TableJob = Tuple[str, Callable[[], None]]
+"""(输入指纹, 生成并保存图片)"""
+
+
+def _load_manifest() -> Dict[str, Dict[str, str]]:
+    try:
+        return json.loads((data_dir / TABLE_MANIFEST).read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        log.warning(f'读取表格指纹失败，将重新生成全部表格：{e}')
+        return {}
+
+
+def _save_manifest(manifest: Dict[str, Dict[str, str]]) -> None:
+    path = data_dir / TABLE_MANIFEST
+    try:
+        temp = path.with_suffix('.tmp')
+        temp.write_text(json.dumps(manifest, ensure_ascii=False, indent=4), encoding='utf-8')
+        os.replace(temp, path)
+    except OSError as e:
+        log.warning(f'保存表格指纹失败：{e}')
+
+
+def _save_png(im: Image.Image, path: Path) -> None:
+    """写入临时文件后替换，生成中途失败不会留下半张图"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f'{path.stem}.tmp')
+    im.save(temp, 'PNG')
+    os.replace(temp, path)
+
+
+def _timed(job: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    job()
+    return time.perf_counter() - start
+
+
+def _table_background(sbi: ScoreBaseImage, height: int, separator_y: int) -> Image.Image:
+    """定数表与完成表共用的背景，返回缓存背景的副本"""
+    key = ('table', 1400, height, separator_y, get_botname())
+    return backgrounds.get(key, lambda: _draw_table_background(sbi, height, separator_y)).copy()
+
+
+def _draw_table_background(sbi: ScoreBaseImage, height: int, separator_y: int) -> Image.Image:
+    """绘制渐变、装饰、分隔线、毛玻璃卡片与署名"""
+    im = tricolor_gradient_prism_plus(1400, height)
+
+    im.alpha_composite(sbi.aurora_bg)
+    im.alpha_composite(sbi.shines_bg, (11, 6))
+    im.alpha_composite(sbi.rainbow_bg, (318, height - 545))
+    im.alpha_composite(sbi.rainbow_bottom_bg, (122, height - 305))
+    for h in range((height // 358) + 1):
+        im.alpha_composite(sbi.pattern_bg, (0, (358 + 7) * h))
+    # 分隔线
+    separator = maimaidir / 'separator.png'
+    if separator.exists():
+        im.alpha_composite(Image.open(separator).convert('RGBA'), (100, separator_y))
+    # 毛玻璃卡片
+    im = generate_frosted_card(im, (50, separator_y + 44, 1350, height - 120))
+
+    draw_text_with_font_fallback(
+        ImageDraw.Draw(im),
+        700,
+        height - 75,
+        30,
+        f'Designed by Yuri-YuzuChaN & BlueDeer233. Generated by {get_botname()} BOT',
+        sbi.text_color,
+        FOTNEWRODIN,
+        SIYUAN,
+    )
+    return im
+
+
+def _render_rating_table_image(
+    lvlist: Dict[str, List[RaMusic]],
+    sbi: ScoreBaseImage,
+    table_diff_bg: List[Image.Image],
+    picname: Path
+) -> None:
+    """生成单个等级的定数表底图"""
+    # 计算高度（仿原项目：START_Y 450 起，逐组累加）
+    current_y = 450
+    for songs in lvlist.values():
+        if not songs:
+            continue
+        rows = (len(songs) - 1) // 14 + 1
+        current_y += rows * 85 + 30
+    height = current_y + 230
+
+    im = _table_background(sbi, height, 360)
+    dr = ImageDraw.Draw(im)
+    fn = DrawText(dr, FOTNEWRODIN)
+    tb = DrawText(dr, TBFONT)
+    START_Y = 450
+    for _lv, songs in lvlist.items():
+        if not songs:
+            continue
+        _ds = _lv.split('.')[-1]
+        fn.draw(70, START_Y + 35, 40, f'.{_ds}', sbi.text_color, 'lm', 4, (255, 255, 255, 255))
+        max_row = 0
+        for num, music in enumerate(songs):
+            row, col = divmod(num, 14)
+            max_row = max(max_row, row)
+            x = 140 + col * 85
+            cover_y = START_Y + row * 85
+            cover = thumbnails.get(music.id, (75, 75))
+            im.alpha_composite(cover, (x, cover_y))
+            im.alpha_composite(table_diff_bg[int(music.lv)], (x - 5, cover_y - 5))
+            tb.draw(x + 56, cover_y + 4, 13, music.id, sbi.t_color[int(music.lv)], 'mm')
+        START_Y += (max_row + 1) * 85 + 30
+
+    _save_png(im, picname)
 
 
-async def update_rating_table() -> str:
-    """更新定数表"""
+def _render_plate_table_image(
+    _v: str,
+    ralv: Dict[str, List[Music]],
+    sbi: ScoreBaseImage,
+    plate_border: Image.Image,
+    picname: Path
+) -> None:
+    """生成单个版本的完成表底图"""
+    # 计算高度（仿原项目：START_Y 490 起，逐组累加）
+    current_y = 490
+    for songs in ralv.values():
+        if not songs:
+            continue
+        rows = (len(songs) - 1) // 12 + 1
+        current_y += rows * 96 + 30
+    height = current_y + 180
+
+    im = _table_background(sbi, height, 400)
+    dr = ImageDraw.Draw(im)
+    fn = DrawText(dr, FOTNEWRODIN)
+    tb = DrawText(dr, TBFONT)
+    START_Y = 490
+    for r, songs in ralv.items():
+        if not songs:
+            continue
+        fn.draw(72, START_Y + 40, 40, r, sbi.text_color, 'lm', 4, (255, 255, 255, 255))
+        max_row = 0
+        for num, music in enumerate(songs):
+            row, col = divmod(num, 12)
+            max_row = max(max_row, row)
+            x = 180 + col * 96
+            cover_y = START_Y + row * 96
+            im.alpha_composite(thumbnails.get(music.id, (80, 80)), (x, cover_y))
+            # ID 背景框（使用原项目 border_table_base.png）
+            im.alpha_composite(plate_border, (x - 5, cover_y - 5))
+            # 曲目 ID
+            tb.draw(x + 56, cover_y + 4, 16, music.id, (255, 255, 255, 255), 'mm')
+        START_Y += (max_row + 1) * 96 + 30
+
+    _save_png(im, picname)
+
+
+def _table_fingerprint(name: str, groups: Dict[str, list], assets: List[str]) -> str:
+    """表格输入指纹：各组曲目及顺序、难度色、曲绘文件、底图素材与署名，任一变化时重新生成"""
+    layout = {k: [[m.id, getattr(m, 'lv', None)] for m in songs] for k, songs in groups.items()}
+    covers_used = [music_picture(m.id) for songs in groups.values() for m in songs]
+    return fingerprint(name, layout, covers_used, [maimaidir / a for a in assets], get_botname())
+
+
+async def _update_tables(
+    kind: str,
+    label: str,
+    jobs: Dict[str, TableJob],
+    targets: Dict[str, Path],
+    force: bool
+) -> str:
+    """
+    并行生成输入有变化的表格
+
+    Params:
+        `kind`: 指纹分类，`rating` / `plate`
+        `label`: 日志与回复中的名称
+        `jobs`: 表格名 -> (输入指纹, 生成函数)
+        `targets`: 表格名 -> 输出路径
+        `force`: 是否忽略指纹全部重新生成
+    Returns:
+        `str` 更新结果
+    """
+    start = time.perf_counter()
+    manifest = _load_manifest()
+    saved = manifest.setdefault(kind, {})
+    pending = {
+        name: job for name, job in jobs.items()
+        if force or saved.get(name) != job[0] or not targets[name].exists()
+    }
+    timings: Dict[str, float] = {}
+    failed: List[str] = []
+
+    async def run(name: str, digest: str, job: Callable[[], None]) -> None:
+        try:
+            timings[name] = await render_pool.run(_timed, job)
+        except Exception as e:
+            log.error(f'{label}「{name}」生成失败：{type(e).__name__}: {e}')
+            failed.append(name)
+            return
+        saved[name] = digest
+        log.info(f'{label}「{name}」更新完成，耗时：{timings[name]:.1f}s')
+
+    await asyncio.gather(*(run(name, digest, job) for name, (digest, job) in pending.items()))
+    _save_manifest(manifest)
+
+    elapsed = time.perf_counter() - start
+    msg = (
+        f'{label}更新完成：生成 {len(timings)} 张，未变化跳过 {len(jobs) - len(pending)} 张，'
+        f'共耗时 {elapsed:.1f}s'
+    )
+    if timings:
+        msg += '\n' + '，'.join(f'{name} {t:.1f}s' for name, t in timings.items())
+    if failed:
+        msg += f'\n生成失败：{"，".join(failed)}'
+    log.info(msg.replace('\n', '；'))
+    return msg
+
+
+async def update_rating_table(force: bool = False) -> str:
+    """
+    更新定数表，只重新生成曲目、定数、曲绘或素材有变化的等级
+
+    Params:
+        `force`: 是否全部重新生成
+    """
     try:
+        await covers.ensure(music.id for music in mai.total_list)
         if maiApi.config.saveinmem and not ScoreBaseImage.aurora_bg:
             ScoreBaseImage._load_image()
         sbi = ScoreBaseImage if maiApi.config.saveinmem else ScoreBaseImage()
         # 难度色框
         border_names = ['border_basic', 'border_advanced', 'border_expert', 'border_master', 'border_remaster']
         table_diff_bg = [Image.open(maimaidir / f'{n}.png').convert('RGBA') for n in border_names]
-        atime = 0
-        for lv in levelList[6:]:
-            _otime = time.time()
-            picname = ratingdir / f'{lv}.png'
-            lvlist = mai.total_level_data[lv]
-
-            # 计算高度（仿原项目：START_Y 450 起，逐组累加）
-            current_y = 450
-            for songs in lvlist.values():
-                if not songs:
-                    continue
-                rows = (len(songs) - 1) // 14 + 1
-                current_y += rows * 85 + 30
-            height = current_y + 230
-
-            im = tricolor_gradient_prism_plus(1400, height)
-            
-            im.alpha_composite(sbi.aurora_bg)
-            im.alpha_composite(sbi.shines_bg, (11, 6))
-            im.alpha_composite(sbi.rainbow_bg, (318, height - 545))
-            im.alpha_composite(sbi.rainbow_bottom_bg, (122, height - 305))
-            for h in range((height // 358) + 1):
-                im.alpha_composite(sbi.pattern_bg, (0, (358 + 7) * h))
-            # 分隔线
-            separator = maimaidir / 'separator.png'
-            if separator.exists():
-                im.alpha_composite(Image.open(separator).convert('RGBA'), (100, 360))
-            # 毛玻璃卡片
-            im = generate_frosted_card(im, (50, 404, 1350, height - 120))
-
-            dr = ImageDraw.Draw(im)
-            fn = DrawText(dr, FOTNEWRODIN)
-            tb = DrawText(dr, TBFONT)
-            draw_text_with_font_fallback(
-                dr,
-                700,
-                height - 75,
-                30,
-                f'Designed by Yuri-YuzuChaN & BlueDeer233. Generated by {get_botname()} BOT',
-                sbi.text_color,
-                FOTNEWRODIN,
-                SIYUAN,
-            )
-            START_Y = 450
-            for _lv, songs in lvlist.items():
-                if not songs:
-                    continue
-                _ds = _lv.split('.')[-1]
-                fn.draw(70, START_Y + 35, 40, f'.{_ds}', sbi.text_color, 'lm', 4, (255, 255, 255, 255))
-                max_row = 0
-                for num, music in enumerate(songs):
-                    row, col = divmod(num, 14)
-                    max_row = max(max_row, row)
-                    x = 140 + col * 85
-                    cover_y = START_Y + row * 85
-                    cover = Image.open(music_picture(music.id)).resize((75, 75))
-                    im.alpha_composite(cover, (x, cover_y))
-                    im.alpha_composite(table_diff_bg[int(music.lv)], (x - 5, cover_y - 5))
-                    tb.draw(x + 56, cover_y + 4, 13, music.id, sbi.t_color[int(music.lv)], 'mm')
-                START_Y += (max_row + 1) * 85 + 30
-
-            by = BytesIO()
-            im.save(by, 'PNG')
-            async with aiofiles.open(picname, 'wb') as f:
-                await f.write(by.getbuffer())
-            _ntime = int(time.time() - _otime)
-            atime += _ntime
-            log.info(f'lv.{lv} 定数表更新完成，耗时：{_ntime}s')
-        log.info(f'定数表更新完成，共耗时{atime}s')
-        return f'定数表更新完成，共耗时{atime}s'
+        assets = [*BACKGROUND_ASSETS, *(f'{n}.png' for n in border_names)]
+
+        def plan() -> Dict[str, TableJob]:
+            jobs = {}
+            for lv in levelList[6:]:
+                lvlist = mai.total_level_data[lv]
+                jobs[lv] = (
+                    _table_fingerprint(lv, lvlist, assets),
+                    partial(_render_rating_table_image, lvlist, sbi, table_diff_bg, ratingdir / f'{lv}.png'),
+                )
+            return jobs
+
+        # 指纹需读取全部曲绘的修改时间，在线程中计算
+        jobs = await asyncio.to_thread(plan)
+        return await _update_tables(
+            'rating', '定数表', jobs, {lv: ratingdir / f'{lv}.png' for lv in jobs}, force
+        )
     except Exception as e:
         log.error(traceback.format_exc())
         return f'定数表更新失败，Error: {e}'
 
 
-async def update_plate_table() -> str:
-    """更新完成表"""
+async def update_plate_table(force: bool = False) -> str:
+    """
+    更新完成表，只重新生成曲目、定数、曲绘或素材有变化的版本
+
+    Params:
+        `force`: 是否全部重新生成
+    """
     try:
+        await covers.ensure(music.id for music in mai.total_list)
         version = list(_ for _ in plate_to_dx_version.keys())[1:]
         # version.append('霸')
         # version.append('舞')
@@ -112,88 +303,39 @@ async def update_plate_table() -> str:
         sbi = ScoreBaseImage if maiApi.config.saveinmem else ScoreBaseImage()
         # 完成表封面边框
         plate_border = Image.open(maimaidir / 'border_table_base.png').convert('RGBA')
-        for _v in version:
-            if _v in platecn:
-                _v = platecn[_v]
-            ver, _ver = version_map.get(_v, ([plate_to_dx_version.get(_v)], _v))
-            
-            music_id_list = mai.total_plate_id_list.get(_ver)
-            if not music_id_list:
-                log.warning(f'牌子「{_v}」的完成表数据（{_ver}）暂未在服务器提供，已跳过')
-                continue
-            music = mai.total_list.by_id_list(music_id_list)
-            ralv = copy.deepcopy(rlv)
-
-            for m in music:
-                ralv[m.level[3]].append(m)
-
-            # 计算高度（仿原项目：START_Y 490 起，逐组累加）
-            current_y = 490
-            for songs in ralv.values():
-                if not songs:
-                    continue
-                rows = (len(songs) - 1) // 12 + 1
-                current_y += rows * 96 + 30
-            height = current_y + 180
-
-            im = tricolor_gradient_prism_plus(1400, height)
-            
-            im.alpha_composite(sbi.aurora_bg)
-            im.alpha_composite(sbi.shines_bg, (11, 6))
-            im.alpha_composite(sbi.rainbow_bg, (318, height - 545))
-            im.alpha_composite(sbi.rainbow_bottom_bg, (122, height - 305))
-            for h in range((height // 358) + 1):
-                im.alpha_composite(sbi.pattern_bg, (0, (358 + 7) * h))
-            # 分隔线
-            separator = maimaidir / 'separator.png'
-            if separator.exists():
-                im.alpha_composite(Image.open(separator).convert('RGBA'), (100, 400))
-            # 毛玻璃卡片
-            im = generate_frosted_card(im, (50, 444, 1350, height - 120))
-            
-            dr = ImageDraw.Draw(im)
-            fn = DrawText(dr, FOTNEWRODIN)
-            tb = DrawText(dr, TBFONT)
-            draw_text_with_font_fallback(
-                dr,
-                700,
-                height - 75,
-                30,
-                f'Designed by Yuri-YuzuChaN & BlueDeer233. Generated by {get_botname()} BOT',
-                sbi.text_color,
-                FOTNEWRODIN,
-                SIYUAN,
-            )
-            START_Y = 490
-            for r in ralv:
-                songs = ralv[r]
-                if not songs:
+        assets = [*BACKGROUND_ASSETS, 'border_table_base.png']
+
+        def plan() -> Dict[str, TableJob]:
+            jobs = {}
+            for _v in version:
+                if _v in platecn:
+                    _v = platecn[_v]
+                ver, _ver = version_map.get(_v, ([plate_to_dx_version.get(_v)], _v))
+
+                music_id_list = mai.total_plate_id_list.get(_ver)
+                if not music_id_list:
+                    log.warning(f'牌子「{_v}」的完成表数据（{_ver}）暂未在服务器提供，已跳过')
                     continue
-                if _v in ['霸', '舞']:
-                    songs.sort(key=lambda x: x.ds[-1], reverse=True)
-                else:
-                    songs.sort(key=lambda x: x.ds[3], reverse=True)
-                fn.draw(72, START_Y + 40, 40, r, sbi.text_color, 'lm', 4, (255, 255, 255, 255))
-                max_row = 0
-                for num, music in enumerate(songs):
-                    row, col = divmod(num, 12)
-                    max_row = max(max_row, row)
-                    x = 180 + col * 96
-                    cover_y = START_Y + row * 96
-                    cover = music_picture(music.id)
-                    im.alpha_composite(Image.open(cover).resize((80, 80)), (x, cover_y))
-                    # ID 背景框（使用原项目 border_table_base.png）
-                    im.alpha_composite(plate_border, (x - 5, cover_y - 5))
-                    # 曲目 ID
-                    tb.draw(x + 56, cover_y + 4, 16, music.id, (255, 255, 255, 255), 'mm')
-                START_Y += (max_row + 1) * 96 + 30
-
-            by = BytesIO()
-            im.save(by, 'PNG')
-            async with aiofiles.open(platedir / f'{_v}.png', 'wb') as f:
-                await f.write(by.getbuffer())
-            log.info(f'{_v}代牌子更新完成')
-        return f'完成表更新完成'
+                music = mai.total_list.by_id_list(music_id_list)
+                ralv = copy.deepcopy(rlv)
+
+                for m in music:
+                    ralv[m.level[3]].append(m)
+                for songs in ralv.values():
+                    if _v in ['霸', '舞']:
+                        songs.sort(key=lambda x: x.ds[-1], reverse=True)
+                    else:
+                        songs.sort(key=lambda x: x.ds[3], reverse=True)
+                jobs[_v] = (
+                    _table_fingerprint(_v, ralv, assets),
+                    partial(_render_plate_table_image, _v, ralv, sbi, plate_border, platedir / f'{_v}.png'),
+                )
+            return jobs
+
+        jobs = await asyncio.to_thread(plan)
+        return await _update_tables(
+            'plate', '完成表', jobs, {_v: platedir / f'{_v}.png' for _v in jobs}, force
+        )
     except Exception as e:
         log.error(traceback.format_exc())
         return f'完成表更新失败，Error: {e}'
@@ -13,7 +13,14 @@ from pathlib import Path
 from . import Root, log, loga, plate_to_dx_version, platecn, _BOTNAME, init_static_dir
 from .libraries.maimai_best_50 import ScoreBaseImage
 from .libraries.maimaidx_api_data import maiApi
+from .libraries.maimaidx_covers import covers
+from .libraries.maimaidx_http import session_manager
+from .libraries.maimaidx_layers import backgrounds, music_info_layers
 from .libraries.maimaidx_music import mai
+from .libraries.maimaidx_render import render_pool
+from .libraries.maimaidx_sprites import sprites
+from .libraries.maimaidx_thumbnails import thumbnails
+from .libraries.maimaidx_tiles import score_tiles
 from .command.mai_alias import ws_alias_server
 import sys
 
@@ -72,6 +79,18 @@ class MaimaiDXPlugin(Star):
         maiApi.config.maimaidxaliaswhitelist = bool(self.config.get('maimaidxaliaswhitelist', False))
         maiApi.config.saveinmem = bool(self.config.get('saveinmem', True))
         maiApi.config.assets_online = bool(self.config.get('assets_online', True))
+        maiApi.config.response_cache_ttl = int(self.config.get('response_cache_ttl', 60))
+        maiApi.config.response_cache_size = int(self.config.get('response_cache_size', 256))
+        maiApi.config.render_workers = int(self.config.get('render_workers', 2))
+        maiApi.config.render_cache_size = int(self.config.get('render_cache_size', 32))
+        maiApi.config.render_cache_disk_size = int(self.config.get('render_cache_disk_size', 0))
+        maiApi.config.tile_cache_size = int(self.config.get('tile_cache_size', 512))
+        maiApi.config.tile_cache_disk_size = int(self.config.get('tile_cache_disk_size', 0))
+        maiApi.config.image_format = str(self.config.get('image_format', 'PNG') or 'PNG').strip()
+        maiApi.config.image_quality = int(self.config.get('image_quality', 85))
+        maiApi.config.image_compress_level = int(self.config.get('image_compress_level', 6))
+        maiApi.config.image_quantize = int(self.config.get('image_quantize', 0))
+        maiApi.config.image_format_overrides = str(self.config.get('image_format_overrides', '') or '').strip()
 
         # 注入落雪（lxns）相关配置
         for _key in ('lxns_dev_token', 'lx_client_id', 'lx_client_secret', 'lx_redirect_uri'):
@@ -114,6 +133,9 @@ class MaimaiDXPlugin(Star):
             
             # 加载图片到内存（如果配置了）
             self._load_images_to_memory()
+
+            # 后台补全曲绘缩略图
+            self._thumbnail_task = asyncio.create_task(self._generate_thumbnails())
             
             # 执行初始检查
             self._perform_initial_checks()
@@ -206,7 +228,7 @@ class MaimaiDXPlugin(Star):
         if maiApi.config.maimaidxaliaspush:
             log.info('别名推送为「开启」状态')
             # 启动别名推送 WebSocket 服务器
-            asyncio.ensure_future(ws_alias_server(self.context))
+            self._alias_ws_task = asyncio.ensure_future(ws_alias_server(self.context))
         else:
             log.info('别名推送为「关闭」状态')
 
@@ -251,7 +273,23 @@ class MaimaiDXPlugin(Star):
         """如果配置了，将图片加载到内存中"""
         if maiApi.config.saveinmem:
             ScoreBaseImage._load_image()
-            log.info('已将图片保存在内存中')
+            count = sprites.preload()
+            log.info(f'已将图片保存在内存中，预缩放素材 {count} 张')
+        else:
+            sprites.cache = False
+            thumbnails.cache = False
+            music_info_layers.cache = False
+            backgrounds.cache = False
+            score_tiles.cache = False
+
+    async def _generate_thumbnails(self):
+        """在线程中为本地封面生成各尺寸缩略图，避免请求时缩放原图"""
+        try:
+            count = await asyncio.to_thread(thumbnails.generate)
+            if count:
+                log.info(f'曲绘缩略图生成完成，新增 {count} 张')
+        except Exception as e:
+            log.error(f'曲绘缩略图生成失败: {e}')
 
     def _perform_initial_checks(self):
         """执行对目录和数据的初始检查"""
@@ -306,6 +344,14 @@ class MaimaiDXPlugin(Star):
             misfire_grace_time=300
         )
         
+        # 每周一凌晨4点半向 CDN 校验曲绘更新（每日更新曲目后已自动补全缺失的曲绘）
+        self.scheduler.add_job(
+            self._cover_sync,
+            trigger=CronTrigger(day_of_week='mon', hour=4, minute=30),
+            name="maimai_cover_sync",
+            misfire_grace_time=300
+        )
+        
         # 添加机厅数据每日更新定时任务（每天凌晨3点）
         try:
             from .libraries.maimaidx_arcade import arcade
@@ -328,6 +374,13 @@ class MaimaiDXPlugin(Star):
         except Exception as e:
             log.error(f'定时更新数据失败: {e}')
     
+    async def _cover_sync(self):
+        """定时任务：同步曲绘"""
+        try:
+            await covers.sync((music.id for music in mai.total_list), full=True)
+        except Exception as e:
+            log.error(f'曲绘同步失败: {e}')
+    
     async def _arcade_daily_update(self):
         """机厅数据每日更新 - 每天凌晨3点执行"""
         try:
@@ -337,6 +390,22 @@ class MaimaiDXPlugin(Star):
         except Exception as e:
             loga.error(f'机厅数据更新失败: {e}')
 
+    async def terminate(self):
+        """插件卸载 / 停用：停止定时任务与别名推送，关闭共享 HTTP 会话与绘图线程池"""
+        try:
+            if self.scheduler.running:
+                self.scheduler.shutdown(wait=False)
+            alias_ws_task = getattr(self, '_alias_ws_task', None)
+            if alias_ws_task and not alias_ws_task.done():
+                alias_ws_task.cancel()
+            # 先停止曲绘下载，否则在途请求会在会话关闭后重新创建会话
+            await covers.close()
+            await session_manager.close()
+            render_pool.shutdown()
+        except Exception as e:
+            log.error(f'插件卸载清理失败: {e}')
+            log.error(traceback.format_exc())
+
     # 注册命令处理函数
     # 群组开关命令（管理员专用）
     @filter.regex(r'^/?(开启|关闭)舞萌功能$')
@@ -380,6 +449,36 @@ class MaimaiDXPlugin(Star):
         async for result in update_data_handler(event, self.superusers):
             yield result
 
+    @filter.regex(r'^/?(刷新成绩|清空成绩缓存)$')
+    async def refresh_score_cache(self, event: AstrMessageEvent):
+        """刷新成绩 / 清空成绩缓存"""
+        group_id = event.message_obj.group_id
+        if group_id and not self._is_group_enabled(str(group_id)):
+            return
+        from .command.mai_base import refresh_score_cache_handler
+        async for result in refresh_score_cache_handler(event, self.superusers):
+            yield result
+
+    @filter.regex(r'^/?同步曲绘( 全部)?$')
+    async def cover_sync(self, event: AstrMessageEvent):
+        """同步曲绘（管理员）"""
+        group_id = event.message_obj.group_id
+        if group_id and not self._is_group_enabled(str(group_id)):
+            return
+        from .command.mai_base import cover_sync_handler
+        async for result in cover_sync_handler(event, self.superusers):
+            yield result
+
+    @filter.regex(r'^/?渲染状态$')
+    async def render_status(self, event: AstrMessageEvent):
+        """渲染状态（管理员）"""
+        group_id = event.message_obj.group_id
+        if group_id and not self._is_group_enabled(str(group_id)):
+            return
+        from .command.mai_base import render_status_handler
+        async for result in render_status_handler(event, self.superusers):
+            yield result
+
     @filter.regex(r'^/?(帮助maimaiDX|帮助maimaidx|helpmaimai|helpmaimaiDX|helpmaimaidx)$')
     async def maimaidxhelp(self, event: AstrMessageEvent):
         """帮助maimaiDX"""
@@ -877,7 +976,7 @@ class MaimaiDXPlugin(Star):
         async for result in level_process_handler(event):
             yield result
 
-    @filter.regex(r'^/?([0-9]+\.?[0-9]?\+?)分数列表\s?([0-9]+)?\s?(.+)?$')
+    @filter.regex(r'^/?([0-9]+\.?[0-9]?\+?)分数列表\s?([0-9]+|全部)?\s?(.+)?$')
     async def level_achievement_list(self, event: AstrMessageEvent):
         """分数列表命令"""
         group_id = event.message_obj.group_id
@@ -8,6 +8,7 @@ from ..command.mai_score import (
     DIFFICULTY_B50_COMMAND_PATTERN,
 )
 from ..libraries.maimai_best_50 import format_best50_summary
+from ..libraries.maimaidx_cache import response_cache
 from ..libraries.maimaidx_play_result import Best50, PlayedResult, Player
 from ..libraries.maimaidx_source import (
     achievement_matches_mode,
@@ -135,6 +136,9 @@ class AchievementBest50CommandTest(unittest.TestCase):
 
 
 class AchievementBest50SourceTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        response_cache.invalidate()
+
     async def test_divingfish_uses_full_records_and_filtered_rating(self):
         player = Player(name='player', rating=15000)
         records = [
@@ -170,7 +174,7 @@ class AchievementBest50SourceTest(unittest.IsolatedAsyncioTestCase):
 
     async def test_lxns_requests_exact_achievements(self):
         player = Player(name='player', rating=15000)
-        query_b50 = AsyncMock(return_value=(player, Best50()))
+        query_player = AsyncMock(return_value=player)
         query_records = AsyncMock(
             return_value=[make_record(1, 100, 100.4999)]
         )
@@ -181,8 +185,11 @@ class AchievementBest50SourceTest(unittest.IsolatedAsyncioTestCase):
                 return_value=True,
             ),
             patch(
-                'data.plugins.astrbot_plugin_maimaidx.libraries.maimaidx_source._lxns_best50_raw',
-                query_b50,
+                'data.plugins.astrbot_plugin_maimaidx.libraries.maimaidx_source._lxns_player_raw',
+                query_player,
+            ),
+            patch(
+                'data.plugins.astrbot_plugin_maimaidx.libraries.maimaidx_source.userstore.get',
             ),
             patch(
                 'data.plugins.astrbot_plugin_maimaidx.libraries.maimaidx_source._lxns_records_raw',
@@ -328,6 +335,9 @@ class AllSongsBest50Test(unittest.TestCase):
 
 
 class AllSongsBest50SourceTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        response_cache.invalidate()
+
     async def test_divingfish_uses_full_records_and_selected_total(self):
         player = Player(name='player', rating=15000)
         records = [
@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from ..libraries.maimaidx_play_result import PlayedResult
+from ..libraries.maimaidx_source import (
+    ap50_filter,
+    ap_plus50_filter,
+    b50_sort_key,
+    difficulty_filter,
+    fitted_filter,
+    partition_b50_records,
+    select_all_songs_b50_records,
+    select_b50_records,
+    top_records,
+)
+
+RECORD_COUNT = 4000
+
+
+def make_records(count: int) -> list:
+    rng = random.Random(20240601)
+    records = []
+    for index in range(count):
+        song_id = rng.randint(1, 12000)
+        level_index = rng.randint(0, 4)
+        records.append(PlayedResult(
+            song_id=song_id,
+            song_name=f'song-{song_id}',
+            level='13',
+            level_index=level_index,
+            level_value=rng.choice([12.5, 13.0, 13.5, 14.0]),
+            type='DX',
+            # 大量同分，检验并列时的顺序
+            rating=rng.randint(250, 320),
+            achievements=rng.choice([99.5, 100.0, 100.5, 100.8]),
+            rate='sss',
+            fc=rng.choice(['', 'fc', 'ap', 'app']),
+        ))
+    return records
+
+
+def sorted_best50(records, record_filter, is_new_song):
+    """逐个条件全量排序的参考实现"""
+    old, new = [], []
+    for record in records:
+        selected = record_filter(record)
+        if selected is None:
+            continue
+        is_new = is_new_song(record.song_id)
+        if is_new is None:
+            continue
+        (new if is_new else old).append(selected)
+    return (
+        sorted(old, key=b50_sort_key, reverse=True)[:35],
+        sorted(new, key=b50_sort_key, reverse=True)[:15],
+    )
+
+
+class B50SelectionBenchmarkTest(unittest.TestCase):
+    def setUp(self):
+        self.records = make_records(RECORD_COUNT)
+        self.is_new = lambda song_id: None if song_id % 97 == 0 else song_id > 10000
+        self.filters = {
+            'ap50': ap50_filter,
+            'ap_plus50': ap_plus50_filter,
+            **{f'difficulty{index}': difficulty_filter(index) for index in range(5)},
+        }
+        self.fitted = fitted_filter(lambda r: r.level_value + 0.1, lambda ds, ach: int(ds * ach))
+
+    def test_top_records_matches_full_sort(self):
+        for k in (1, 15, 35, 50, RECORD_COUNT + 1):
+            with self.subTest(k=k):
+                self.assertEqual(
+                    top_records(self.records, k),
+                    sorted(self.records, key=b50_sort_key, reverse=True)[:k],
+                )
+        self.assertEqual(
+            select_all_songs_b50_records(self.records).sd,
+            sorted(self.records, key=b50_sort_key, reverse=True)[:35],
+        )
+
+    def test_partition_matches_per_variant_sort(self):
+        filters = {**self.filters, 'fitted': self.fitted}
+        result = partition_b50_records(self.records, filters, self.is_new)
+        for name, record_filter in filters.items():
+            with self.subTest(variant=name):
+                old, new = sorted_best50(self.records, record_filter, self.is_new)
+                self.assertEqual(result[name].sd, old)
+                self.assertEqual(result[name].dx, new)
+                self.assertEqual(result[name].sd_total, sum(r.rating for r in old))
+
+    def test_select_matches_per_variant_sort(self):
+        for name, record_filter in {**self.filters, 'fitted': self.fitted}.items():
+            with self.subTest(variant=name):
+                best50 = select_b50_records(self.records, record_filter, self.is_new)
+                old, new = sorted_best50(self.records, record_filter, self.is_new)
+                self.assertEqual((best50.sd, best50.dx), (old, new))
+
+
+if __name__ == '__main__':
+    unittest.main()
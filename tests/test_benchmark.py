@@ -0,0 +1,111 @@
+"""
+性能对比，默认跳过，设置环境变量 `MAIMAIDX_BENCHMARK=1` 后运行
+
+只记录耗时，不做断言；结果写入 `maimaidx.benchmark` 日志，
+如 `MAIMAIDX_BENCHMARK=1 pytest tests/test_benchmark.py --log-cli-level=INFO`。
+"""
+
+import logging
+import os
+import time
+import unittest
+from typing import Callable, Tuple
+
+from ..libraries import image
+from ..libraries.image import tricolor_gradient, tricolor_gradient_prism_plus
+from ..libraries.maimaidx_source import (
+    ap50_filter,
+    ap_plus50_filter,
+    b50_sort_key,
+    difficulty_filter,
+    partition_b50_records,
+    top_records,
+)
+from .test_b50_selection_benchmark import RECORD_COUNT, make_records, sorted_best50
+from .test_gradient_benchmark import loop_prism_plus, loop_tricolor_gradient
+
+BENCHMARK = bool(os.environ.get('MAIMAIDX_BENCHMARK'))
+log = logging.getLogger('maimaidx.benchmark')
+
+
+def best_of(func: Callable[[], object], repeat: int = 5) -> float:
+    """多次执行取最短耗时（秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compare(
+    label: str,
+    baseline: Callable[[], object],
+    optimized: Callable[[], object],
+    repeat: int = 5
+) -> Tuple[float, float]:
+    """对比优化前后的耗时并写入日志"""
+    before, after = best_of(baseline, repeat), best_of(optimized, repeat)
+    log.info(f'{label}：优化前 {before * 1000:.1f} ms，优化后 {after * 1000:.1f} ms')
+    return before, after
+
+
+@unittest.skipUnless(BENCHMARK, '设置 MAIMAIDX_BENCHMARK=1 后运行')
+class B50SelectionBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.records = make_records(RECORD_COUNT)
+        self.is_new = lambda song_id: None if song_id % 97 == 0 else song_id > 10000
+        self.filters = {
+            'ap50': ap50_filter,
+            'ap_plus50': ap_plus50_filter,
+            **{f'difficulty{index}': difficulty_filter(index) for index in range(5)},
+        }
+
+    def test_heap_selection(self):
+        compare(
+            f'{RECORD_COUNT} 条成绩取前 35（全量排序 / 堆选择）',
+            lambda: sorted(self.records, key=b50_sort_key, reverse=True)[:35],
+            lambda: top_records(self.records, 35),
+        )
+
+    def test_single_pass_partition(self):
+        compare(
+            f'{RECORD_COUNT} 条成绩 / {len(self.filters)} 种 B50（逐个排序 / 单次遍历）',
+            lambda: [
+                sorted_best50(self.records, record_filter, self.is_new)
+                for record_filter in self.filters.values()
+            ],
+            lambda: partition_b50_records(self.records, self.filters, self.is_new),
+        )
+
+
+@unittest.skipUnless(BENCHMARK, '设置 MAIMAIDX_BENCHMARK=1 后运行')
+class GradientBenchmark(unittest.TestCase):
+    # rise_score_data / update_rating_table 实际使用的尺寸
+    SIZES = [(1400, 1000), (1400, 2500), (1400, 4000)]
+
+    @staticmethod
+    def uncached(func: Callable[[int, int], object]) -> Callable[[int, int], object]:
+        """清空单列缓存后再绘制，计时不含缓存命中"""
+        def draw(width: int, height: int) -> object:
+            image._tricolor_column.cache_clear()
+            image._prism_plus_column.cache_clear()
+            return func(width, height)
+        return draw
+
+    def test_vectorised_gradients(self):
+        for name, baseline, optimized in [
+            ('三色渐变', loop_tricolor_gradient, self.uncached(tricolor_gradient)),
+            ('PRiSM PLUS', loop_prism_plus, self.uncached(tricolor_gradient_prism_plus)),
+        ]:
+            for width, height in self.SIZES:
+                compare(
+                    f'{name} {width}x{height}（逐行 / 向量化）',
+                    lambda: baseline(width, height),
+                    lambda: optimized(width, height),
+                    repeat=3,
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
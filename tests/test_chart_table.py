@@ -0,0 +1,63 @@
+import math
+import unittest
+
+from ..libraries.maimaidx_chart_table import ChartTable
+from ..libraries.maimaidx_model import Music
+
+
+def make_music(song_id: int, ds: list, level: list, version: str = 'maimai') -> Music:
+    return Music.model_validate({
+        'id': str(song_id),
+        'title': f'song-{song_id}',
+        'type': 'DX' if song_id >= 10000 else 'SD',
+        'ds': ds,
+        'level': level,
+        'charts': [{'notes': [100, 10, 20, 5, 15], 'charter': '-'}] * len(ds),
+        'basic_info': {
+            'title': f'song-{song_id}',
+            'artist': 'artist',
+            'genre': 'genre',
+            'bpm': 150,
+            'from': version,
+            'is_new': False,
+        },
+        'stats': [None, None, None, {'fit_diff': 13.85}],
+    })
+
+
+class ChartTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = ChartTable(
+            [
+                make_music(11451, [5.0, 8.0, 12.7, 13.8], ['5', '8', '12+', '13+']),
+                make_music(8, [3.0, 7.0, 10.0, 13.7], ['3', '7', '10', '13+'], 'maimai PLUS'),
+                make_music(100001, [13.7], ['13+']),
+            ],
+            {'8-3': 13.75},
+        )
+
+    def test_rows_follow_catalog_order(self):
+        self.assertEqual(len(self.table), 9)
+        self.assertEqual(self.table.song_id[:4].tolist(), [11451] * 4)
+        self.assertEqual(self.table.level_index[4:8].tolist(), [0, 1, 2, 3])
+        self.assertEqual(self.table.level_of(3), '13+')
+
+    def test_columns(self):
+        self.assertEqual(self.table.level_value[7], 13.75)
+        self.assertEqual(self.table.level_value[6], 10.0)
+        self.assertEqual(self.table.fit_diff[3], 13.85)
+        self.assertTrue(math.isnan(self.table.fit_diff[0]))
+        self.assertEqual(self.table.dx_max[0], 450)
+
+    def test_mask_combines_conditions(self):
+        mask = self.table.mask(level='13+', ds=(13.7, 13.8), max_song_id=100000)
+        self.assertEqual(self.table.rows(mask).tolist(), [3, 7])
+
+        mask = self.table.mask(level='13+', version=['maimai PLUS'], exclude_song_ids=[11451])
+        self.assertEqual(self.table.rows(mask).tolist(), [7])
+
+        self.assertFalse(self.table.mask(level='14').any())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from ..libraries import maimaidx_covers
+from ..libraries.maimaidx_covers import CoverFetcher
+
+
+def png_bytes(color=(255, 0, 0)) -> bytes:
+    buffer = BytesIO()
+    Image.new('RGB', (4, 4), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: bytes = b'png') -> None:
+        self.status = status
+        self._body = body
+        self.headers = {'ETag': '"v1"'} if status == 200 else {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, statuses) -> None:
+        self.statuses = statuses
+        self.urls = []
+        self.headers = []
+        self.active = 0
+        self.max_active = 0
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        self.headers.append(kwargs.get('headers', {}))
+        status = self.statuses(url) if callable(self.statuses) else self.statuses.pop(0)
+        session = self
+
+        class Response(FakeResponse):
+            async def __aenter__(self):
+                session.active += 1
+                session.max_active = max(session.max_active, session.active)
+                await asyncio.sleep(0.01)
+                return self
+
+            async def __aexit__(self, *exc):
+                session.active -= 1
+                return False
+
+        return Response(status, png_bytes())
+
+
+class CoverFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        root = Path(self._tmp.name)
+        self.cover_dir = root / 'cover'
+        self.data_dir = root / 'data'
+        for name, value in (('coverdir', self.cover_dir), ('data_dir', self.data_dir), ('BACKOFF', 0)):
+            patcher = patch.object(maimaidx_covers, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.fetcher = CoverFetcher(concurrency=3)
+
+    def run_with(self, session, coro):
+        with patch.object(maimaidx_covers.session_manager, 'get', return_value=session):
+            return asyncio.run(coro)
+
+    def test_downloads_once_per_cover(self):
+        session = FakeSession(lambda url: 200)
+        count = self.run_with(session, self.fetcher.ensure([834, 10834, 11]))
+        self.assertEqual(count, 2)
+        self.assertEqual(len(session.urls), 2)
+        self.assertTrue((self.cover_dir / '834.png').exists())
+        self.assertEqual(self.run_with(session, self.fetcher.ensure([834, 11])), 0)
+
+    def test_concurrency_is_bounded(self):
+        session = FakeSession(lambda url: 200)
+        self.run_with(session, self.fetcher.ensure(range(1, 20)))
+        self.assertEqual(len(session.urls), 19)
+        self.assertLessEqual(session.max_active, 3)
+
+    def test_retries_server_errors(self):
+        session = FakeSession([503, 500, 200])
+        path = self.run_with(session, self.fetcher.fetch(834))
+        self.assertEqual(path, self.cover_dir / '834.png')
+        self.assertEqual(len(session.urls), 3)
+
+    def test_failed_retries_are_not_marked_missing(self):
+        session = FakeSession(lambda url: 503)
+        self.assertIsNone(self.run_with(session, self.fetcher.fetch(834)))
+        self.assertEqual(self.fetcher.failed, 1)
+        self.assertFalse(self.fetcher.is_missing(834))
+
+    def test_missing_covers_are_persisted(self):
+        session = FakeSession(lambda url: 404)
+        self.run_with(session, self.fetcher.ensure([834, 835]))
+        saved = json.loads((self.data_dir / 'missing_covers.json').read_text(encoding='utf-8'))
+        self.assertEqual(sorted(saved), ['834', '835'])
+
+        restarted = CoverFetcher()
+        self.run_with(session, restarted.ensure([834, 835]))
+        self.assertEqual(len(session.urls), 2)
+
+    def test_expired_missing_entries_are_dropped(self):
+        self.data_dir.mkdir(parents=True)
+        (self.data_dir / 'missing_covers.json').write_text(
+            json.dumps({'834': time.time() - 1, '835': time.time() + 60}), encoding='utf-8'
+        )
+        self.assertEqual(list(self.fetcher.missing), [835])
+
+    def test_close_cancels_inflight_downloads(self):
+        session = FakeSession(lambda url: 200)
+
+        async def main():
+            task = asyncio.ensure_future(self.fetcher.ensure(range(1, 10)))
+            await asyncio.sleep(0.001)
+            await self.fetcher.close()
+            requested = len(session.urls)
+            await asyncio.sleep(0.05)
+            return task, requested
+
+        task, requested = self.run_with(session, main())
+        self.assertTrue(task.cancelled())
+        self.assertEqual(len(session.urls), requested)
+        self.assertLess(requested, 9)
+        self.assertEqual(self.fetcher._inflight, {})
+
+    def test_sync_downloads_absent_and_repairs_corrupt(self):
+        self.cover_dir.mkdir(parents=True)
+        (self.cover_dir / '1.png').write_bytes(png_bytes())
+        (self.cover_dir / '2.png').write_bytes(b'not a png')
+        session = FakeSession(lambda url: 200)
+        report = self.run_with(session, self.fetcher.sync([1, 2, 10003]))
+        self.assertEqual((report.total, report.unchanged, report.repaired, report.downloaded), (3, 1, 1, 1))
+        self.assertEqual(sorted(url.rsplit('/', 1)[1] for url in session.urls), ['2.png', '3.png'])
+        manifest = json.loads((self.cover_dir / 'manifest.json').read_text(encoding='utf-8'))
+        self.assertEqual(sorted(manifest), ['1', '2', '3'])
+        self.assertEqual(manifest['3']['etag'], '"v1"')
+
+        report = self.run_with(session, self.fetcher.sync([1, 2, 3]))
+        self.assertEqual(report.unchanged, 3)
+        self.assertEqual(len(session.urls), 2)
+
+    def test_full_sync_revalidates_with_etag(self):
+        session = FakeSession(lambda url: 200)
+        self.run_with(session, self.fetcher.sync([1]))
+        session = FakeSession([304])
+        report = self.run_with(session, CoverFetcher().sync([1], full=True))
+        self.assertEqual(report.unchanged, 1)
+        self.assertEqual(session.headers[0].get('If-None-Match'), '"v1"')
+
+    def test_full_sync_waits_for_running_incremental_sync(self):
+        session = FakeSession(lambda url: 200)
+        self.run_with(session, self.fetcher.sync([1]))
+
+        async def main():
+            prefetch = self.fetcher.schedule_prefetch([1, 2])
+            self.assertEqual(self.fetcher.syncing, 'incremental')
+            full = await self.fetcher.sync([1, 2], full=True)
+            return await prefetch, full
+
+        incremental, full = self.run_with(session, main())
+        self.assertEqual((incremental.downloaded, incremental.unchanged), (1, 1))
+        # 全量校验在增量同步之后进行，已有的两张都带条件请求
+        self.assertEqual(full.total, 2)
+        self.assertEqual(len(session.urls), 4)
+        self.assertIsNone(self.fetcher.syncing)
+
+    def test_sync_keeps_entries_recorded_while_checking(self):
+        self.cover_dir.mkdir(parents=True)
+        (self.cover_dir / '1.png').write_bytes(png_bytes())
+        session = FakeSession(lambda url: 200)
+
+        async def main():
+            sync = asyncio.ensure_future(self.fetcher.sync([1, 2]))
+            await self.fetcher.ensure([2])
+            return await sync
+
+        report = self.run_with(session, main())
+        self.assertEqual(sorted(self.fetcher.manifest.entries), [1, 2])
+        self.assertEqual(report.failed, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ..libraries import maimaidx_render_cache
+from ..libraries.maimaidx_render_cache import DiskStore
+
+
+class DiskStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = patch.object(maimaidx_render_cache, 'data_dir', Path(self._tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def age(self, store: DiskStore, key: str, seconds: int) -> None:
+        path = store.path / f'{key}{store.suffix}'
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 10 ** 9))
+
+    def test_read_write(self):
+        store = DiskStore('store', 4, '.png')
+        self.assertIsNone(store.read('a'))
+        store.write('a', b'data')
+        self.assertEqual(store.read('a'), b'data')
+        self.assertEqual([p.name for p in store.path.iterdir()], ['a.png'])
+
+    def test_bounded_by_least_recently_used(self):
+        store = DiskStore('store', 2)
+        for index, key in enumerate('abc'):
+            store.write(key, key.encode())
+            self.age(store, key, 10 - index)
+        self.assertEqual(sorted(p.name for p in store.path.iterdir()), ['b', 'c'])
+        # 读取刷新修改时间，之后淘汰的是 c
+        store.read('b')
+        store.write('d', b'd')
+        self.assertEqual(sorted(p.name for p in store.path.iterdir()), ['b', 'd'])
+
+    def test_disabled_and_clear(self):
+        store = DiskStore('store', 0)
+        store.write('a', b'data')
+        self.assertFalse(store.path.exists())
+        store.maxfiles = 2
+        store.write('a', b'data')
+        store.clear()
+        self.assertEqual(list(store.path.iterdir()), [])
+        self.assertIsNone(store.read('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
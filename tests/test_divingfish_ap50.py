@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import AsyncMock, patch
 
 from ..libraries.maimai_best_50 import format_best50_summary
+from ..libraries.maimaidx_cache import response_cache
 from ..libraries.maimaidx_api_data import maiApi
 from ..libraries.maimaidx_model import Data, UserInfo, UserInfoDev
 from ..libraries.maimaidx_play_result import (
@@ -228,6 +229,9 @@ class Best50SummaryTest(unittest.TestCase):
 
 
 class Best50RoutingTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        response_cache.invalidate()
+
     async def test_divingfish_ap_plus50_uses_player_dev_records(self):
         old_app = make_record(1, 100, fc='app', achievements=100.75)
         new_app = make_record(2, 200, fc='app', achievements=101.0)
@@ -273,6 +277,41 @@ class Best50RoutingTest(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(best50.dx[0].achievements, 101.0)
         self.assertEqual(player.rating, 300)
 
+    async def test_filtered_variants_share_one_records_snapshot(self):
+        user = UserInfoDev(
+            additional_rating=0,
+            nickname='player',
+            plate=None,
+            rating=15000,
+            username='player',
+            records=[
+                played_to_playinfodev(make_record(1, 100, fc='app')),
+                played_to_playinfodev(make_record(2, 200, fc='ap')),
+            ],
+        )
+        query_dev = AsyncMock(return_value=user)
+
+        with (
+            patch(
+                'data.plugins.astrbot_plugin_maimaidx.libraries.maimaidx_source.is_lxns',
+                return_value=False,
+            ),
+            patch(
+                'data.plugins.astrbot_plugin_maimaidx.libraries.maimaidx_source._is_new_song',
+                return_value=False,
+            ),
+            patch.object(maiApi, 'token', 'developer-token'),
+            patch.object(maiApi, 'query_user_get_dev', query_dev),
+        ):
+            _, ap50 = await get_best50(qqid=123456, all_perfect=True)
+            _, ap_plus50 = await get_best50(qqid=123456, all_perfect_plus=True)
+            _, all_songs = await get_best50(qqid=123456, all_songs=True)
+
+        query_dev.assert_awaited_once_with(qqid=123456, username=None)
+        self.assertEqual([record.song_id for record in ap50.sd], [2, 1])
+        self.assertEqual([record.song_id for record in ap_plus50.sd], [1])
+        self.assertEqual(len(all_songs.sd), 2)
+
     async def test_regular_divingfish_b50_keeps_public_query_path(self):
         user = UserInfo(
             additional_rating=0,
@@ -0,0 +1,65 @@
+import base64
+import unittest
+from io import BytesIO
+
+from PIL import Image
+
+from ..libraries.maimaidx_encoding import ImageEncoder, flatten_alpha
+
+
+def decode(data: bytes) -> Image.Image:
+    im = Image.open(BytesIO(data))
+    im.load()
+    return im
+
+
+class ImageEncoderTest(unittest.TestCase):
+    def setUp(self):
+        self.encoder = ImageEncoder()
+        self.opaque = Image.new('RGBA', (64, 48), (10, 200, 30, 255))
+
+    def test_default_is_png_without_unused_alpha(self):
+        im = decode(self.encoder.encode(self.opaque))
+        self.assertEqual((im.format, im.mode, im.size), ('PNG', 'RGB', (64, 48)))
+
+    def test_transparent_png_keeps_alpha(self):
+        transparent = Image.new('RGBA', (8, 8), (0, 0, 0, 0))
+        self.assertEqual(decode(self.encoder.encode(transparent)).mode, 'RGBA')
+
+    def test_jpeg_flattens_onto_white(self):
+        self.encoder.configure('jpg', quality=95)
+        im = decode(self.encoder.encode(Image.new('RGBA', (8, 8), (0, 0, 0, 0))))
+        self.assertEqual(im.format, 'JPEG')
+        self.assertGreater(min(im.getpixel((4, 4))), 240)
+
+    def test_overrides_per_kind_and_text_stays_png(self):
+        self.encoder.configure('WEBP', overrides='table=JPEG, bogus=PNG')
+        self.assertEqual(self.encoder.profile('best').format, 'WEBP')
+        self.assertEqual(self.encoder.profile('table').format, 'JPEG')
+        self.assertEqual(self.encoder.profile('text').format, 'PNG')
+        self.encoder.configure('WEBP', overrides='text=WEBP')
+        self.assertEqual(self.encoder.profile('text').format, 'WEBP')
+
+    def test_unknown_format_falls_back_to_png(self):
+        self.encoder.configure('GIF')
+        self.assertEqual(self.encoder.default.format, 'PNG')
+
+    def test_quantize_produces_palette_png(self):
+        self.encoder.configure('PNG', quantize=16)
+        self.assertEqual(decode(self.encoder.encode(self.opaque)).mode, 'P')
+
+    def test_base64_and_stats(self):
+        result = self.encoder.to_base64(self.opaque, 'best')
+        self.assertTrue(result.startswith('base64://'))
+        data = base64.b64decode(result[len('base64://'):])
+        stats = self.encoder.stats()['best']
+        self.assertEqual(stats['count'], 1)
+        self.assertAlmostEqual(stats['avg_kb'], len(data) / 1024)
+
+    def test_flatten_alpha_returns_rgb_unchanged(self):
+        rgb = Image.new('RGB', (4, 4))
+        self.assertIs(flatten_alpha(rgb), rgb)
+
+
+if __name__ == '__main__':
+    unittest.main()
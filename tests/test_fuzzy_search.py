@@ -0,0 +1,57 @@
+import unittest
+
+from ..libraries.maimaidx_fuzzy import (
+    FuzzySearchIndex,
+    edit_distance,
+    normalize_search_text,
+    similarity,
+)
+
+
+class FuzzyTextTest(unittest.TestCase):
+    def test_normalize_folds_width_case_and_kana(self):
+        self.assertEqual(normalize_search_text('ＰＡＮＤＯＲＡ Paranoia!'), 'pandoraparanoia')
+        self.assertEqual(normalize_search_text('パンドラ'), normalize_search_text('ぱんどら'))
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance('kitten', 'sitting'), 3)
+        self.assertEqual(edit_distance('', 'abc'), 3)
+        self.assertEqual(edit_distance('kitten', 'sitting', limit=1), 2)
+
+    def test_similarity(self):
+        self.assertEqual(similarity('oshama', 'oshama'), 1.0)
+        self.assertGreater(similarity('pandra', 'pandora'), similarity('pandra', 'oshama'))
+        self.assertGreaterEqual(similarity('潘多', '潘多拉'), 0.8)
+
+
+class FuzzySearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = FuzzySearchIndex()
+        self.index.add(834, 'title', 'PANDORA PARADOXXX')
+        self.index.add(834, 'alias', '潘多拉')
+        self.index.add(8, 'title', 'True Love Song')
+        self.index.add(8, 'artist', 'Kai')
+        self.index.add(11451, 'title', 'パンドラ')
+
+    def test_ranks_closest_song_first(self):
+        result = self.index.search('pandora paradox')
+        self.assertEqual(result[0].song_id, 834)
+        self.assertEqual(result[0].field, 'title')
+
+    def test_kana_and_cjk_queries(self):
+        self.assertEqual(self.index.search('ぱんどら')[0].song_id, 11451)
+        self.assertEqual(self.index.search('潘多')[0].song_id, 834)
+
+    def test_one_match_per_song_and_field_filter(self):
+        result = self.index.search('true love')
+        self.assertEqual([m.song_id for m in result], [8])
+        self.assertEqual(self.index.search('kai', fields=['title']), [])
+
+    def test_remove(self):
+        self.index.remove(834, 'alias', '潘多拉')
+        self.assertEqual(self.index.search('潘多拉'), [])
+        self.assertEqual(len(self.index), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
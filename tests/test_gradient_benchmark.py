@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from ..libraries.image import PRISM_PLUS_STOPS, tricolor_gradient, tricolor_gradient_prism_plus
+
+
+def loop_tricolor_gradient(
+    width, height, color1=(124, 129, 255), color2=(193, 247, 225), color3=(255, 255, 255)
+):
+    """逐行计算的参考实现"""
+    array = np.zeros((height, width, 3), dtype=np.uint8)
+    for y in range(height):
+        if y < height * 0.4:
+            ratio = y / (height * 0.4)
+            color = (1 - ratio) * np.array(color1) + ratio * np.array(color2)
+        else:
+            ratio = (y - height * 0.4) / (height * 0.6)
+            color = (1 - ratio) * np.array(color2) + ratio * np.array(color3)
+        array[y, :] = np.clip(color, 0, 255)
+    return Image.fromarray(array).convert('RGBA')
+
+
+def loop_prism_plus(width, height):
+    """逐像素 putpixel 的参考实现"""
+    line = Image.new('RGBA', (1, height))
+    for y in range(height):
+        t = 1.0 - (y / (height - 1)) if height > 1 else 0
+        for i in range(len(PRISM_PLUS_STOPS) - 1):
+            p1, c1 = PRISM_PLUS_STOPS[i]
+            p2, c2 = PRISM_PLUS_STOPS[i + 1]
+            if p1 <= t <= p2:
+                rel_t = (t - p1) / (p2 - p1)
+                rgb = tuple(int(c1[j] + (c2[j] - c1[j]) * rel_t) for j in range(3))
+                line.putpixel((0, y), rgb)
+                break
+    return line.resize((width, height), resample=Image.Resampling.BICUBIC)
+
+
+class GradientBenchmarkTest(unittest.TestCase):
+    def assertSameImage(self, actual: Image.Image, expected: Image.Image):
+        self.assertEqual((actual.mode, actual.size), (expected.mode, expected.size))
+        self.assertEqual(actual.tobytes(), expected.tobytes())
+
+    def test_tricolor_matches_loop(self):
+        for width, height in [(1, 1), (7, 2), (40, 13), (1400, 1000), (1400, 2500)]:
+            with self.subTest(size=(width, height)):
+                self.assertSameImage(tricolor_gradient(width, height), loop_tricolor_gradient(width, height))
+        colors = ((0, 0, 0), (255, 0, 128), (10, 200, 30))
+        self.assertSameImage(tricolor_gradient(64, 301, *colors), loop_tricolor_gradient(64, 301, *colors))
+
+    def test_prism_plus_matches_loop(self):
+        for width, height in [(1, 1), (7, 2), (40, 13), (1400, 1000), (1400, 2500)]:
+            with self.subTest(size=(width, height)):
+                self.assertSameImage(tricolor_gradient_prism_plus(width, height), loop_prism_plus(width, height))
+
+    def test_result_is_writable_copy(self):
+        im = tricolor_gradient_prism_plus(4, 4)
+        im.putpixel((0, 0), (0, 0, 0, 255))
+        self.assertNotEqual(tricolor_gradient_prism_plus(4, 4).getpixel((0, 0)), (0, 0, 0, 255))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import astrbot.api.message_components as Comp
+
+from .. import MessageSegment
+from ..command.mai_base import convert_message_segment_to_chain
+
+
+class ImageDeliveryTest(unittest.TestCase):
+    def test_base64_image_is_passed_through(self):
+        with patch.object(Comp.Image, 'fromBase64', return_value='image') as from_base64, \
+                patch.object(Comp.Image, 'fromFileSystem') as from_file, \
+                patch.object(tempfile, 'NamedTemporaryFile') as temp_file:
+            chain = convert_message_segment_to_chain(MessageSegment.image('base64://aGVsbG8='))
+        self.assertEqual(chain, ['image'])
+        from_base64.assert_called_once_with('aGVsbG8=')
+        from_file.assert_not_called()
+        temp_file.assert_not_called()
+
+    def test_local_path_uses_file_system(self):
+        with patch.object(Comp.Image, 'fromFileSystem', return_value='file') as from_file:
+            chain = convert_message_segment_to_chain(MessageSegment.image('/tmp/cover.png'))
+        self.assertEqual(chain, ['file'])
+        from_file.assert_called_once_with('/tmp/cover.png')
+
+
+if __name__ == '__main__':
+    unittest.main()
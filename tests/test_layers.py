@@ -0,0 +1,53 @@
+import unittest
+
+from PIL import Image
+
+from ..libraries.maimaidx_layers import LayerCache
+
+
+class LayerCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.layers = LayerCache(maxsize=2)
+        self.calls = 0
+
+    def draw(self, color=(255, 0, 0, 255)) -> Image.Image:
+        self.calls += 1
+        return Image.new('RGBA', (8, 8), color)
+
+    def test_layer_is_drawn_once(self):
+        layer = self.layers.get(('song', 1), self.draw)
+        self.assertIs(self.layers.get(('song', 1), self.draw), layer)
+        self.assertEqual((self.calls, self.layers.hits, self.layers.misses), (1, 1, 1))
+
+    def test_copies_do_not_touch_cached_layer(self):
+        canvas = self.layers.get('base', self.draw).copy()
+        canvas.putpixel((0, 0), (0, 0, 0, 255))
+        self.assertEqual(self.layers.get('base', self.draw).getpixel((0, 0)), (255, 0, 0, 255))
+
+    def test_lru_bound(self):
+        first = self.layers.get(1, self.draw)
+        self.layers.get(2, self.draw)
+        self.layers.get(1, self.draw)
+        self.layers.get(3, self.draw)
+        self.assertEqual(len(self.layers), 2)
+        self.assertIs(self.layers.get(1, self.draw), first)
+        self.assertEqual(self.calls, 3)
+
+    def test_byte_budget(self):
+        layers = LayerCache(maxsize=8, maxbytes=8 * 8 * 4 * 2)
+        for key in range(3):
+            layers.get(key, self.draw)
+        self.assertEqual(len(layers), 2)
+        self.assertEqual(layers.nbytes, 8 * 8 * 4 * 2)
+        layers.clear()
+        self.assertEqual((len(layers), layers.nbytes), (0, 0))
+
+    def test_cache_disabled(self):
+        self.layers.cache = False
+        self.layers.get(1, self.draw)
+        self.layers.get(1, self.draw)
+        self.assertEqual((self.calls, len(self.layers)), (2, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+from ..libraries.maimaidx_model import Alias, Music
+from ..libraries.maimaidx_music import AliasList, MusicList
+
+
+def make_music(song_id: int, title: str) -> Music:
+    return Music.model_validate({
+        'id': str(song_id),
+        'title': title,
+        'type': 'DX' if song_id >= 10000 else 'SD',
+        'ds': [5.0, 7.5, 10.0, 13.0],
+        'level': ['5', '7+', '10', '13'],
+        'charts': [{'notes': [1, 2, 3, 4, 5], 'charter': '-'}] * 4,
+        'basic_info': {
+            'title': title,
+            'artist': 'artist',
+            'genre': 'genre',
+            'bpm': 150,
+            'from': 'maimai',
+            'is_new': False,
+        },
+    })
+
+
+class MusicListIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.musics = MusicList([
+            make_music(11451, 'A'),
+            make_music(8, 'B'),
+            make_music(834, 'A'),
+        ])
+
+    def test_by_id_accepts_str_and_int(self):
+        self.assertEqual(self.musics.by_id('8').title, 'B')
+        self.assertEqual(self.musics.by_id(11451).title, 'A')
+        self.assertIsNone(self.musics.by_id(1))
+
+    def test_by_title_returns_first_match(self):
+        self.assertEqual(self.musics.by_title('A').id, '11451')
+        self.assertIsNone(self.musics.by_title('C'))
+
+    def test_by_id_list_keeps_catalog_order(self):
+        result = self.musics.by_id_list([834, 8, 8, 1, 11451])
+        self.assertEqual([music.id for music in result], ['11451', '8', '834'])
+
+    def test_index_follows_mutation(self):
+        self.assertIsNone(self.musics.by_id(1))
+        self.musics.append(make_music(1, 'C'))
+        self.assertEqual(self.musics.by_id(1).title, 'C')
+        self.musics.remove(self.musics.by_id(8))
+        self.assertIsNone(self.musics.by_id(8))
+        self.assertEqual(
+            [music.id for music in self.musics.by_id_list([1, 834])],
+            ['834', '1'],
+        )
+
+
+class MusicListFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.musics = MusicList([
+            make_music(11451, 'Alpha'),
+            make_music(8, 'beta'),
+            make_music(834, 'ALPHA 2'),
+        ])
+
+    def test_chart_filters_intersect_matched_difficulties(self):
+        result = self.musics.filter(ds=(7.0, 13.0), level=['10', '13'])
+        self.assertEqual([music.id for music in result], ['11451', '8', '834'])
+        self.assertEqual(result[0].diff, [2, 3])
+
+        result = self.musics.filter(level='13', diff=[2])
+        self.assertEqual(len(result), 0)
+
+    def test_song_filters_and_title_search(self):
+        result = self.musics.filter(type='DX', title_search='alpha')
+        self.assertEqual([music.id for music in result], ['11451'])
+        self.assertEqual(len(self.musics.filter(bpm=(100, 140))), 0)
+
+    def test_results_do_not_modify_catalog(self):
+        result = self.musics.filter(ds=13.0)
+        self.assertEqual(result[0].diff, [3])
+        self.assertEqual(self.musics[0].diff, [])
+        self.assertIs(result[0].basic_info, self.musics[0].basic_info)
+
+
+class AliasListIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.aliases = AliasList([
+            Alias(SongID=8, Name='oshama', Alias=['oshama', '帝王']),
+            Alias(SongID=834, Name='PANDORA', Alias=['潘', 'pandora']),
+            Alias(SongID=11451, Name='潘多拉', Alias=['潘']),
+        ])
+
+    def test_lookup_ignores_case_and_width(self):
+        self.assertEqual([a.SongID for a in self.aliases.by_alias('ＰＡＮＤＯＲＡ')], [834])
+        self.assertEqual([a.SongID for a in self.aliases.by_alias('潘')], [834, 11451])
+        self.assertEqual([a.SongID for a in self.aliases.by_id('8')], [8])
+        self.assertEqual(self.aliases.by_alias('none'), [])
+
+    def test_add_and_remove_update_index(self):
+        self.assertTrue(self.aliases.add_alias('8', 'Scatman'))
+        self.assertEqual([a.SongID for a in self.aliases.by_alias('scatman')], [8])
+        self.assertIn('scatman', self.aliases.by_id(8)[0].Alias)
+
+        self.assertTrue(self.aliases.remove_alias(8, 'scatman'))
+        self.assertEqual(self.aliases.by_alias('scatman'), [])
+        self.assertFalse(self.aliases.remove_alias(8, 'scatman'))
+
+    def test_add_creates_entry_when_name_given(self):
+        self.assertFalse(self.aliases.add_alias(1, 'new'))
+        self.assertTrue(self.aliases.add_alias(1, 'new', 'song-1'))
+        self.assertEqual(self.aliases.by_alias('new')[0].Name, 'song-1')
+
+
+if __name__ == '__main__':
+    unittest.main()
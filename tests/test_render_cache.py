@@ -0,0 +1,96 @@
+import asyncio
+import base64
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ..libraries import maimaidx_render_cache
+from ..libraries.maimaidx_render_cache import RenderCache, fingerprint
+from ..libraries.maimaidx_user import Theme
+
+
+def image(data: bytes) -> str:
+    return 'base64://' + base64.b64encode(data).decode()
+
+
+class RenderCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = patch.object(maimaidx_render_cache, 'data_dir', Path(self._tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    async def render(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return image(f'render-{self.calls}'.encode())
+
+    def test_same_input_renders_once(self):
+        cache = RenderCache(maxsize=4)
+        key = cache.key('b50', 'best', 1, Theme.PRISM_PLUS, {'a': [1, 2]})
+
+        async def main():
+            return await asyncio.gather(*(cache.fetch(key, self.render) for _ in range(3)))
+
+        results = asyncio.run(main())
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(set(results)), 1)
+        asyncio.run(cache.fetch(cache.key('b50', 'best', 1, Theme.PRISM_PLUS, {'a': [1, 2]}), self.render))
+        self.assertEqual((self.calls, cache.hits), (1, 1))
+
+    def test_changed_input_or_catalog_misses(self):
+        cache = RenderCache(maxsize=4)
+        key = cache.key('b50', 'best', {'a': 1})
+        self.assertNotEqual(key, cache.key('b50', 'best', {'a': 2}))
+        cache.set_catalog('v2')
+        self.assertNotEqual(key, cache.key('b50', 'best', {'a': 1}))
+
+    def test_avatar_and_botname_are_part_of_key(self):
+        cache = RenderCache(maxsize=4)
+        key = cache.key('b50', 'best', b'avatar-1')
+        self.assertNotEqual(key, cache.key('b50', 'best', b'avatar-2'))
+        with patch.object(maimaidx_render_cache, 'get_botname', return_value='another'):
+            self.assertNotEqual(key, cache.key('b50', 'best', b'avatar-1'))
+
+    def test_path_fingerprint_follows_mtime(self):
+        path = Path(self._tmp.name) / 'table.png'
+        path.write_bytes(b'1')
+        before = fingerprint(path)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertNotEqual(before, fingerprint(path))
+
+    def test_disk_cache_survives_restart(self):
+        cache = RenderCache(maxsize=0, disk_size=2)
+        keys = [cache.key('b50', 'best', i) for i in range(3)]
+        for key in keys:
+            asyncio.run(cache.fetch(key, self.render))
+
+        restarted = RenderCache(maxsize=4, disk_size=2)
+        result = asyncio.run(restarted.fetch(keys[2], self.render))
+        self.assertEqual(result, image(b'render-3'))
+        self.assertEqual((self.calls, restarted.disk_hits), (3, 1))
+
+    def test_byte_budget(self):
+        size = len(image(b'render-1'))
+        cache = RenderCache(maxsize=8, maxbytes=size * 2)
+        for i in range(3):
+            asyncio.run(cache.fetch(cache.key('b50', 'best', i), self.render))
+        self.assertEqual((len(cache), cache.nbytes), (2, size * 2))
+        cache.clear()
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_disabled_cache_always_renders(self):
+        cache = RenderCache(maxsize=0)
+        key = cache.key('b50', 'best', 1)
+        asyncio.run(cache.fetch(key, self.render))
+        asyncio.run(cache.fetch(key, self.render))
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
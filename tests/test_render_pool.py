@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from PIL import Image
+
+from ..libraries.maimaidx_render import RenderPool
+
+
+def current_thread_name() -> str:
+    return threading.current_thread().name
+
+
+class RenderPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = RenderPool(workers=2)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_runs_off_event_loop(self):
+        name = asyncio.run(self.pool.run(current_thread_name))
+        self.assertTrue(name.startswith('maimai-render'))
+        self.assertEqual(self.pool.stats()['completed'], 1)
+
+    def test_loop_stays_responsive(self):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.005)
+
+        async def main():
+            task = asyncio.create_task(ticker())
+            await asyncio.sleep(0)
+            await self.pool.run(time.sleep, 0.1)
+            task.cancel()
+
+        asyncio.run(main())
+        self.assertGreater(len(ticks), 5)
+
+    def test_queue_depth_and_failures(self):
+        async def main():
+            slow = [self.pool.run(time.sleep, 0.05) for _ in range(4)]
+            gathered = asyncio.gather(*slow, self.pool.run(int, 'x'), return_exceptions=True)
+            await asyncio.sleep(0.01)
+            depth = self.pool.stats()['queued']
+            return depth, await gathered
+
+        depth, results = asyncio.run(main())
+        self.assertGreater(depth, 0)
+        self.assertIsInstance(results[-1], ValueError)
+        stats = self.pool.stats()
+        self.assertEqual((stats['completed'], stats['failed'], stats['queued'], stats['running']), (4, 1, 0, 0))
+        self.assertGreater(stats['max_latency'], 0.05)
+
+    def test_encode_and_inline_mode(self):
+        self.pool.configure(0)
+        name = asyncio.run(self.pool.run(current_thread_name))
+        self.assertEqual(name, threading.current_thread().name)
+        encoded = asyncio.run(self.pool.encode(Image.new, 'RGBA', (4, 4)))
+        self.assertTrue(encoded.startswith('base64://'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from ..libraries.maimaidx_cache import ResponseCache, cache_key
+from ..libraries.maimaidx_http import SingleFlight, request_key
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(ttl=60, maxsize=2)
+
+    def test_key_ignores_param_order(self):
+        self.assertEqual(
+            cache_key('divingfish', 114514, '/query/plate', {'qq': 1, 'version': ['舞', '霸']}),
+            cache_key('divingfish', '114514', '/query/plate', {'version': ['舞', '霸'], 'qq': 1}),
+        )
+
+    def test_fetch_hits_within_ttl(self):
+        request = AsyncMock(return_value='b50')
+        key = cache_key('divingfish', 1, '/query/player')
+        self.assertEqual(asyncio.run(self.cache.fetch(key, request)), 'b50')
+        self.assertEqual(asyncio.run(self.cache.fetch(key, request)), 'b50')
+        self.assertEqual(request.await_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_expired_entry_is_refetched(self):
+        key = cache_key('divingfish', 1, '/query/player')
+        with patch('time.monotonic', return_value=0):
+            self.cache.set(key, 'old')
+        with patch('time.monotonic', return_value=61):
+            self.assertEqual(self.cache.get(key), (False, None))
+
+    def test_errors_are_not_cached(self):
+        key = cache_key('lxns', 1, '/bests')
+        request = AsyncMock(side_effect=[ValueError, 'ok'])
+        with self.assertRaises(ValueError):
+            asyncio.run(self.cache.fetch(key, request))
+        self.assertEqual(asyncio.run(self.cache.fetch(key, request)), 'ok')
+
+    def test_lru_eviction(self):
+        a, b, c = (cache_key('divingfish', user, '/query/player') for user in (1, 2, 3))
+        self.cache.set(a, 'a')
+        self.cache.set(b, 'b')
+        self.cache.get(a)
+        self.cache.set(c, 'c')
+        self.assertEqual(self.cache.get(b), (False, None))
+        self.assertEqual(self.cache.get(a), (True, 'a'))
+
+    def test_invalidate_by_user_and_service(self):
+        self.cache.maxsize = 8
+        self.cache.set(cache_key('divingfish', 1, '/query/player'), 1)
+        self.cache.set(cache_key('lxns', 1, '/bests'), 2)
+        self.cache.set(cache_key('lxns', 2, '/bests'), 3)
+        self.assertEqual(self.cache.invalidate(user=1, service='lxns'), 1)
+        self.assertEqual(self.cache.invalidate(user=1), 1)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.invalidate(), 1)
+
+    def test_zero_ttl_disables_cache(self):
+        self.cache.configure(0, 16)
+        self.cache.set(cache_key('divingfish', 1, '/query/player'), 1)
+        self.assertEqual(len(self.cache), 0)
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_identical_requests_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def request():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'rating': 15000}
+
+        async def main():
+            key = request_key('get', '/rating_ranking', headers=None)
+            other = request_key('GET', '/rating_ranking', headers={'developer-token': 'x'})
+            return await asyncio.gather(
+                flight.run(key, request),
+                flight.run(key, request),
+                flight.run(other, request),
+            )
+
+        result = asyncio.run(main())
+        self.assertEqual(len(calls), 2)
+        self.assertIs(result[0], result[1])
+        self.assertEqual(flight.shared, 1)
+        self.assertEqual(len(flight), 0)
+
+    def test_failure_is_shared_and_released(self):
+        flight = SingleFlight()
+        request = AsyncMock(side_effect=[ValueError, 'ok'])
+        key = request_key('GET', '/bests')
+
+        async def main():
+            return await asyncio.gather(
+                flight.run(key, request), flight.run(key, request), return_exceptions=True
+            )
+
+        first, second = asyncio.run(main())
+        self.assertIsInstance(first, ValueError)
+        self.assertIsInstance(second, ValueError)
+        self.assertEqual(asyncio.run(flight.run(key, request)), 'ok')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ..libraries import maimaidx_player_score
+from ..libraries.maimaidx_player_score import (
+    SCORELIST_PAGE_SIZE,
+    level_achievement_list_pages,
+    page_count,
+)
+
+
+def records(count: int, level: str = '13+') -> list:
+    return [SimpleNamespace(level=level, ds=13.7, achievements=100 - i / 1000) for i in range(count)]
+
+
+class ScorelistPagesTest(unittest.TestCase):
+    def setUp(self):
+        self.rendered = []
+
+        async def render(theme, rating, data, page, end_page):
+            self.rendered.append((page, end_page, len(data[(page - 1) * SCORELIST_PAGE_SIZE: page * SCORELIST_PAGE_SIZE])))
+            return f'page-{page}'
+
+        patcher = patch.object(maimaidx_player_score, '_render_scorelist_page', render)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch(self, data: list):
+        async def get_player_records(**kwargs):
+            return data
+        return patch.object(maimaidx_player_score, 'get_player_records', get_player_records)
+
+    def test_page_count(self):
+        self.assertEqual([page_count(n, 80) for n in (0, 1, 80, 81, 160)], [1, 1, 1, 2, 2])
+
+    def test_pages_are_rendered_one_at_a_time(self):
+        async def main():
+            pages = level_achievement_list_pages(None, 'player', '13+')
+            first = await pages.__anext__()
+            rendered_before_next = len(self.rendered)
+            rest = [page async for page in pages]
+            return first, rendered_before_next, rest
+
+        with self.fetch(records(170) + records(5, level='14')):
+            first, rendered_before_next, rest = asyncio.run(main())
+        self.assertEqual((first, rendered_before_next), ('page-1', 1))
+        self.assertEqual(rest, ['page-2', 'page-3'])
+        self.assertEqual(self.rendered, [(1, 3, 80), (2, 3, 80), (3, 3, 10)])
+
+    def test_error_is_yielded_as_message(self):
+        async def get_player_records(**kwargs):
+            raise maimaidx_player_score.UserNotFoundError
+
+        async def main():
+            return [page async for page in level_achievement_list_pages(None, 'player', '13+')]
+
+        with patch.object(maimaidx_player_score, 'get_player_records', get_player_records):
+            result = asyncio.run(main())
+        self.assertEqual(len(result), 1)
+        self.assertIsInstance(result[0], str)
+        self.assertEqual(self.rendered, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from ..libraries.maimaidx_sprites import SpriteAtlas, rank_asset_name
+
+
+class SpriteAtlasTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.paths = []
+        for index, mode in enumerate(('RGBA', 'RGB', 'P')):
+            path = Path(self._tmp.name) / f'{index}.png'
+            Image.new(mode, (150, 150)).save(path)
+            self.paths.append(path)
+        self.atlas = SpriteAtlas(maxsize=2)
+
+    def test_tiles_are_resized_rgba_and_reused(self):
+        tile = self.atlas.get(self.paths[1], (75, 75))
+        self.assertEqual((tile.mode, tile.size), ('RGBA', (75, 75)))
+        self.assertIs(self.atlas.get(self.paths[1], (75, 75)), tile)
+        self.assertIsNot(self.atlas.get(self.paths[1], (80, 80)), tile)
+        self.assertEqual((self.atlas.hits, self.atlas.misses), (1, 2))
+
+    def test_matches_direct_resize(self):
+        with Image.open(self.paths[2]) as im:
+            expected = im.resize((34, 34)).convert('RGBA')
+        self.assertEqual(self.atlas.get(self.paths[2], (34, 34)).tobytes(), expected.tobytes())
+
+    def test_lru_bound(self):
+        first = self.atlas.get(self.paths[0], (10, 10))
+        self.atlas.get(self.paths[1], (10, 10))
+        self.atlas.get(self.paths[0], (10, 10))
+        self.atlas.get(self.paths[2], (10, 10))
+        self.assertEqual(len(self.atlas), 2)
+        self.assertIs(self.atlas.get(self.paths[0], (10, 10)), first)
+
+    def test_cache_disabled(self):
+        self.atlas.cache = False
+        self.assertIsNot(self.atlas.get(self.paths[0], (10, 10)), self.atlas.get(self.paths[0], (10, 10)))
+        self.assertEqual(len(self.atlas), 0)
+
+    def test_rank_asset_name(self):
+        self.assertEqual(rank_asset_name('sssp'), 'UI_TTR_Rank_SSSp.png')
+        self.assertEqual(rank_asset_name('SSS'), 'UI_TTR_Rank_SSS.png')
+
+
+if __name__ == '__main__':
+    unittest.main()
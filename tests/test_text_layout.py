@@ -0,0 +1,81 @@
+import threading
+import unittest
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .. import SIYUAN, TBFONT
+from ..libraries.image import DrawText, draw_text_with_font_fallback, get_font
+from ..libraries.maimai_best_50 import changeColumnWidth, coloumWidth
+
+FONTS_AVAILABLE = SIYUAN.exists() and TBFONT.exists()
+
+
+def fallback_reference(image, pos_x, pos_y, size, text, color, primary_font, fallback_font, anchor='mm'):
+    """每次重新打开字体并逐段测量的参考实现"""
+    primary = ImageFont.truetype(str(primary_font), size)
+    fallback = ImageFont.truetype(str(fallback_font), size)
+    parts = []
+    for char in str(text):
+        font = primary if char.isascii() else fallback
+        if parts and parts[-1][1] is font:
+            parts[-1] = (parts[-1][0] + char, font)
+        else:
+            parts.append((char, font))
+    total_width = sum(image.textlength(part, font=font) for part, font in parts)
+    if anchor[0] == 'm':
+        x, part_anchor = pos_x - total_width / 2, 'lm'
+    elif anchor[0] == 'r':
+        x, part_anchor = pos_x - total_width, 'lm'
+    else:
+        x, part_anchor = pos_x, 'la' if len(anchor) > 1 and anchor[1] == 'a' else 'lm'
+    for part, font in parts:
+        image.text((x, pos_y), part, color, font=font, anchor=part_anchor)
+        x += image.textlength(part, font=font)
+
+
+class ColumnWidthTest(unittest.TestCase):
+    def test_width_and_truncate(self):
+        self.assertEqual(coloumWidth('ABC'), 3)
+        self.assertEqual(coloumWidth('舞萌DX'), 6)
+        self.assertEqual(changeColumnWidth('舞萌DX2024', 5), '舞萌D')
+        self.assertEqual(changeColumnWidth('abc', 10), 'abc')
+
+
+@unittest.skipUnless(FONTS_AVAILABLE, '缺少字体文件')
+class TextLayoutTest(unittest.TestCase):
+    def test_font_is_reused_per_thread(self):
+        font = get_font(SIYUAN, 28)
+        self.assertIs(get_font(str(SIYUAN), 28), font)
+        self.assertIsNot(get_font(SIYUAN, 29), font)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_font(SIYUAN, 28)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], font)
+
+    def test_fallback_matches_reference(self):
+        for anchor in ('mm', 'rm', 'lm', 'la'):
+            for text in ('Designed by maimai', '舞萌DX 2024', 'ＰＡＮＤＯＲＡ PARADOXXX', 12345):
+                with self.subTest(anchor=anchor, text=text):
+                    expected = Image.new('RGBA', (600, 80), (0, 0, 0, 0))
+                    fallback_reference(
+                        ImageDraw.Draw(expected), 300, 40, 24, text, (255, 255, 255, 255), TBFONT, SIYUAN, anchor
+                    )
+                    actual = Image.new('RGBA', (600, 80), (0, 0, 0, 0))
+                    for _ in range(2):
+                        actual.paste((0, 0, 0, 0), (0, 0, 600, 80))
+                        draw_text_with_font_fallback(
+                            ImageDraw.Draw(actual), 300, 40, 24, text, (255, 255, 255, 255), TBFONT, SIYUAN, anchor
+                        )
+                    self.assertEqual(actual.tobytes(), expected.tobytes())
+
+    def test_draw_text_matches_truetype(self):
+        expected = Image.new('RGBA', (300, 60))
+        ImageDraw.Draw(expected).text((10, 10), 'SSS+ 100.5000%', (0, 0, 0, 255), ImageFont.truetype(str(TBFONT), 20), 'lt')
+        actual = Image.new('RGBA', (300, 60))
+        DrawText(ImageDraw.Draw(actual), TBFONT).draw(10, 10, 20, 'SSS+ 100.5000%', (0, 0, 0, 255))
+        self.assertEqual(actual.tobytes(), expected.tobytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from ..libraries import image as image_module
+from ..libraries import maimaidx_thumbnails
+from ..libraries.maimaidx_thumbnails import CoverThumbnails
+
+
+class CoverThumbnailsTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.cover_dir = Path(self._tmp.name)
+        for target in (image_module, maimaidx_thumbnails):
+            patcher = patch.object(target, 'coverdir', self.cover_dir)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.source = self.cover_dir / '834.png'
+        Image.new('RGB', (200, 200), (255, 0, 0)).save(self.source)
+        self.store = CoverThumbnails(maxsize=4)
+
+    def test_dx_id_shares_standard_cover(self):
+        thumb = self.store.get(10834, (75, 75))
+        self.assertEqual((thumb.mode, thumb.size), ('RGBA', (75, 75)))
+        self.assertIs(self.store.get(834, (75, 75)), thumb)
+        self.assertTrue(CoverThumbnails.thumb_path(834, (75, 75)).exists())
+        self.assertEqual((self.store.hits, self.store.misses, self.store.generated), (1, 1, 1))
+
+    def test_matches_direct_resize(self):
+        with Image.open(self.source) as im:
+            expected = im.resize((242, 242)).convert('RGBA')
+        self.assertEqual(self.store.get(834, (242, 242)).tobytes(), expected.tobytes())
+
+    def test_persisted_thumbnail_is_reused(self):
+        self.store.get(834, (80, 80))
+        other = CoverThumbnails()
+        other.get(834, (80, 80))
+        self.assertEqual(other.generated, 0)
+
+    def test_changed_cover_is_regenerated(self):
+        self.store.get(834, (75, 75))
+        Image.new('RGB', (200, 200), (0, 0, 255)).save(self.source)
+        stamp = CoverThumbnails.thumb_path(834, (75, 75)).stat().st_mtime_ns + 10 ** 9
+        os.utime(self.source, ns=(stamp, stamp))
+        self.assertEqual(self.store.get(834, (75, 75)).getpixel((0, 0)), (0, 0, 255, 255))
+        self.assertEqual(self.store.generated, 2)
+
+    def test_generate_fills_missing_sizes(self):
+        self.store.get(834, (75, 75))
+        self.assertEqual(self.store.generate(((75, 75), (80, 80))), 1)
+        self.assertEqual(self.store.generate(((75, 75), (80, 80))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
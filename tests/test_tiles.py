@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from ..libraries import maimaidx_render_cache
+from ..libraries.maimaidx_tiles import TileCache
+from ..libraries.maimaidx_user import Theme
+
+
+class TileCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = patch.object(maimaidx_render_cache, 'data_dir', Path(self._tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    def draw(self) -> Image.Image:
+        self.calls += 1
+        return Image.new('RGBA', (276, 114), (self.calls, 0, 0, 255))
+
+    def test_same_score_is_drawn_once(self):
+        tiles = TileCache(maxsize=4)
+        key = tiles.key(Theme.PRISM_PLUS, 11451, 3, 'DX', 'song', 'sssp', 'ap', 'fsd', 100.5, 2500, 2600, 14.2, 320)
+        tile = tiles.get(key, self.draw)
+        self.assertIs(tiles.get(key, self.draw), tile)
+        self.assertEqual((self.calls, tiles.hits, tiles.misses), (1, 1, 1))
+        self.assertEqual(tiles.hit_rate, 0.5)
+        self.assertNotEqual(key, tiles.key(Theme.CIRCLE, 11451, 3, 'DX', 'song', 'sssp', 'ap', 'fsd', 100.5, 2500, 2600, 14.2, 320))
+
+    def test_key_follows_cover_file(self):
+        cover = Path(self._tmp.name) / '11451.png'
+        cover.write_bytes(b'placeholder')
+        key = TileCache.key(Theme.PRISM_PLUS, cover, 11451)
+        stat = cover.stat()
+        os.utime(cover, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertNotEqual(key, TileCache.key(Theme.PRISM_PLUS, cover, 11451))
+        self.assertNotEqual(key, TileCache.key(Theme.PRISM_PLUS, cover.with_name('0.png'), 11451))
+
+    def test_disk_cache_survives_restart(self):
+        tiles = TileCache(maxsize=0, disk_size=2)
+        keys = [tiles.key(i) for i in range(4)]
+        for key in keys:
+            tiles.get(key, self.draw)
+
+        restarted = TileCache(maxsize=4, disk_size=2)
+        tile = restarted.get(keys[3], self.draw)
+        self.assertEqual(tile.getpixel((0, 0)), (4, 0, 0, 255))
+        self.assertEqual((self.calls, restarted.disk_hits, restarted.misses), (4, 1, 0))
+        restarted.get(keys[3], self.draw)
+        self.assertEqual(restarted.hits, 1)
+
+    def test_disabled_memory_still_uses_disk(self):
+        tiles = TileCache(maxsize=4, disk_size=4)
+        tiles.cache = False
+        key = tiles.key(1)
+        tiles.get(key, self.draw)
+        tiles.get(key, self.draw)
+        self.assertEqual((self.calls, len(tiles), tiles.disk_hits), (1, 0, 1))
+
+    def test_clear(self):
+        tiles = TileCache(maxsize=4, disk_size=4)
+        tiles.get(tiles.key(1), self.draw)
+        self.assertEqual(tiles.clear(disk=True), 1)
+        self.assertEqual(list(tiles.cache_dir.iterdir()), [])
+        tiles.get(tiles.key(1), self.draw)
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
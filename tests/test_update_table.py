@@ -0,0 +1,64 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from ..libraries import maimaidx_update_table
+from ..libraries.maimaidx_update_table import _update_tables
+
+
+class UpdateTablesTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        patcher = patch.object(maimaidx_update_table, 'data_dir', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.generated = []
+
+    def jobs(self, digests, fail=()):
+        def job(name):
+            def run():
+                if name in fail:
+                    raise OSError('disk full')
+                self.generated.append(name)
+                (self.root / f'{name}.png').write_bytes(b'png')
+            return run
+        return {name: (digest, job(name)) for name, digest in digests.items()}
+
+    def update(self, digests, force=False, fail=()):
+        self.generated = []
+        targets = {name: self.root / f'{name}.png' for name in digests}
+        return asyncio.run(_update_tables('rating', '定数表', self.jobs(digests, fail), targets, force))
+
+    def test_only_changed_tables_are_regenerated(self):
+        msg = self.update({'13': 'a', '14': 'b'})
+        self.assertEqual(sorted(self.generated), ['13', '14'])
+        self.assertIn('生成 2 张', msg)
+
+        msg = self.update({'13': 'a', '14': 'b'})
+        self.assertEqual(self.generated, [])
+        self.assertIn('未变化跳过 2 张', msg)
+
+        self.update({'13': 'a', '14': 'c'})
+        self.assertEqual(self.generated, ['14'])
+
+    def test_missing_output_and_force_regenerate(self):
+        self.update({'13': 'a', '14': 'b'})
+        (self.root / '13.png').unlink()
+        self.update({'13': 'a', '14': 'b'})
+        self.assertEqual(self.generated, ['13'])
+        self.update({'13': 'a', '14': 'b'}, force=True)
+        self.assertEqual(sorted(self.generated), ['13', '14'])
+
+    def test_failed_table_is_retried_next_time(self):
+        msg = self.update({'13': 'a', '14': 'b'}, fail={'14'})
+        self.assertIn('生成失败：14', msg)
+        self.update({'13': 'a', '14': 'b'})
+        self.assertEqual(self.generated, ['14'])
+
+
+if __name__ == '__main__':
+    unittest.main()